@@ -29,11 +29,18 @@ fileConfig(config.config_file_name)
 # Set up target metadata for migrations
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leaves indexes out of autogenerate on databases where models.py does not create them."""
+    if type_ == "index" and not reflected:
+        return context.get_context().dialect.name not in object.info.get('skip_dialects', ())
+    return True
+
 # Run migrations for schema consistency
 def run_migrations_offline():
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
-    context.configure(url=url, target_metadata=target_metadata, literal_binds=True)
+    context.configure(url=url, target_metadata=target_metadata, literal_binds=True, include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -48,7 +55,7 @@ def run_migrations_online():
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
         with context.begin_transaction():
             context.run_migrations()
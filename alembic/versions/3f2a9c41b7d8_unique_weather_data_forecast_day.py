@@ -0,0 +1,37 @@
+"""unique weather_data forecast day
+
+Revision ID: 3f2a9c41b7d8
+Revises: 1d789e209e21
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c41b7d8'
+down_revision: Union[str, None] = '1d789e209e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remove duplicate forecast days left by earlier races, keeping the most recent row
+    op.execute(
+        "DELETE FROM weather_data WHERE weather_id NOT IN ("
+        " SELECT keep_id FROM ("
+        "  SELECT MAX(weather_id) AS keep_id FROM weather_data GROUP BY location, date, user_id"
+        " ) AS keep_rows"
+        ")"
+    )
+    # A plain unique constraint would not stop duplicates of shared (NULL user_id) forecasts,
+    # since NULLs never compare equal, so the key is built on coalesce(user_id, 0) (MySQL 8.0.13+)
+    op.create_index('uq_weather_data_location_date_user', 'weather_data',
+                    ['location', 'date', sa.text('(coalesce(user_id, 0))')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_weather_data_location_date_user', table_name='weather_data')
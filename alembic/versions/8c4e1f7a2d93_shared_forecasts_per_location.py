@@ -0,0 +1,137 @@
+"""shared forecasts per canonical location
+
+Revision ID: 8c4e1f7a2d93
+Revises: 3f2a9c41b7d8
+Create Date: 2026-10-16 14:37:05.902117
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e1f7a2d93'
+down_revision: Union[str, None] = '3f2a9c41b7d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of locations.normalize_location and constants.LOCATION_ALIASES as of this revision,
+# so later changes to the app code do not change what this migration does
+LOCATION_ALIASES = {
+    'nyc': 'new york',
+    'new york city': 'new york',
+    'new york, ny': 'new york',
+    'ny': 'new york',
+    'la': 'los angeles',
+    'los angeles, ca': 'los angeles',
+    'sf': 'san francisco',
+    'san francisco, ca': 'san francisco',
+    'dc': 'washington',
+    'washington dc': 'washington',
+    'washington, dc': 'washington',
+    'washington d.c.': 'washington',
+    'philly': 'philadelphia',
+    'vegas': 'las vegas',
+    'nola': 'new orleans',
+}
+
+
+def normalize_location(location: str) -> str:
+    name = re.sub(r"\s+", " ", (location or "").strip().lower())
+    name = re.sub(r"\s*,\s*", ", ", name)
+    return LOCATION_ALIASES.get(name, name)
+
+
+def _drop_foreign_keys(table: str, column: str) -> None:
+    # The original foreign keys were created without names, so look them up
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        return  # batch mode recreates the table without them
+    for fk in sa.inspect(bind).get_foreign_keys(table):
+        if fk['constrained_columns'] == [column] and fk.get('name'):
+            op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+
+def upgrade() -> None:
+    op.create_table('locations',
+    sa.Column('location_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('canonical_name', sa.String(length=255), nullable=False),
+    sa.Column('display_name', sa.String(length=255), nullable=False),
+    sa.PrimaryKeyConstraint('location_id')
+    )
+    op.create_index(op.f('ix_locations_canonical_name'), 'locations', ['canonical_name'], unique=True)
+    op.create_index(op.f('ix_locations_location_id'), 'locations', ['location_id'], unique=False)
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('location_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_users_location_id'), ['location_id'], unique=False)
+        batch_op.create_foreign_key('fk_users_location_id', 'locations', ['location_id'], ['location_id'])
+    with op.batch_alter_table('weather_data') as batch_op:
+        batch_op.add_column(sa.Column('location_id', sa.Integer(), nullable=True))
+
+    # Backfill one location per canonical name from the strings already stored
+    bind = op.get_bind()
+    raw_locations = [row[0] for row in bind.execute(sa.text(
+        "SELECT location FROM users WHERE location IS NOT NULL"
+        " UNION SELECT location FROM weather_data"
+    ))]
+    locations = {}
+    for raw in raw_locations:
+        if raw and raw.strip():
+            locations.setdefault(normalize_location(raw), raw.strip())
+    locations_table = sa.table('locations', sa.column('canonical_name', sa.String), sa.column('display_name', sa.String))
+    if locations:
+        op.bulk_insert(locations_table, [
+            {'canonical_name': canonical_name, 'display_name': display_name}
+            for canonical_name, display_name in locations.items()
+        ])
+
+    ids = dict(bind.execute(sa.text("SELECT canonical_name, location_id FROM locations")).fetchall())
+    for raw in raw_locations:
+        if raw and raw.strip():
+            params = {'location_id': ids[normalize_location(raw)], 'raw': raw}
+            bind.execute(sa.text("UPDATE users SET location_id = :location_id WHERE location = :raw"), params)
+            bind.execute(sa.text("UPDATE weather_data SET location_id = :location_id WHERE location = :raw"), params)
+
+    # Collapse the per-user copies into one row per (location, day), keeping the most recent
+    op.execute("DELETE FROM weather_data WHERE location_id IS NULL")
+    op.execute(
+        "DELETE FROM weather_data WHERE weather_id NOT IN ("
+        " SELECT keep_id FROM ("
+        "  SELECT MAX(weather_id) AS keep_id FROM weather_data GROUP BY location_id, date"
+        " ) AS keep_rows"
+        ")"
+    )
+
+    _drop_foreign_keys('weather_data', 'user_id')
+    op.drop_index('uq_weather_data_location_date_user', table_name='weather_data')
+    with op.batch_alter_table('weather_data') as batch_op:
+        batch_op.drop_column('user_id')
+        batch_op.alter_column('location_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_weather_data_location_id', 'locations', ['location_id'], ['location_id'], ondelete='CASCADE')
+        batch_op.create_unique_constraint('uq_weather_data_location_date', ['location_id', 'date'])
+
+
+def downgrade() -> None:
+    # Per-user copies are not restored; forecasts are reattached without a user
+    with op.batch_alter_table('weather_data') as batch_op:
+        batch_op.drop_constraint('uq_weather_data_location_date', type_='unique')
+        batch_op.drop_constraint('fk_weather_data_location_id', type_='foreignkey')
+        batch_op.drop_column('location_id')
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_weather_data_user_id', 'users', ['user_id'], ['user_id'], ondelete='SET NULL')
+    op.create_index('uq_weather_data_location_date_user', 'weather_data',
+                    ['location', 'date', sa.text('(coalesce(user_id, 0))')], unique=True)
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_constraint('fk_users_location_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_users_location_id'))
+        batch_op.drop_column('location_id')
+
+    op.drop_index(op.f('ix_locations_location_id'), table_name='locations')
+    op.drop_index(op.f('ix_locations_canonical_name'), table_name='locations')
+    op.drop_table('locations')
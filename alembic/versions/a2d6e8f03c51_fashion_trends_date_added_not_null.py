@@ -0,0 +1,33 @@
+"""fashion_trends.date_added not null
+
+Revision ID: a2d6e8f03c51
+Revises: f4c9a2e7b318
+Create Date: 2026-10-17 12:20:09.412557
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2d6e8f03c51'
+down_revision: Union[str, None] = 'f4c9a2e7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # date_added is the trend listing's pagination key, and a NULL key cannot be put in a cursor.
+    # Undated trends are given the oldest possible date, so they keep their place at the end of the listing.
+    op.execute("UPDATE fashion_trends SET date_added = '1970-01-01 00:00:00' WHERE date_added IS NULL")
+    with op.batch_alter_table('fashion_trends') as batch_op:
+        batch_op.alter_column('date_added', existing_type=sa.DateTime(), existing_server_default=sa.text('now()'),
+                              nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('fashion_trends') as batch_op:
+        batch_op.alter_column('date_added', existing_type=sa.DateTime(), existing_server_default=sa.text('now()'),
+                              nullable=True)
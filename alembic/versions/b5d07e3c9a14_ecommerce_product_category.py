@@ -0,0 +1,122 @@
+"""ecommerce_products category column
+
+Revision ID: b5d07e3c9a14
+Revises: 8c4e1f7a2d93
+Create Date: 2026-10-16 17:02:51.476033
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import inflect
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d07e3c9a14'
+down_revision: Union[str, None] = '8c4e1f7a2d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of taxonomy's item type -> category mapping as of this revision, so later changes
+# to the taxonomy do not change what this migration backfills
+CATEGORY_PRIORITY = ['Top', 'Bottom', 'Shoes', 'Outerwear', 'Accessories', 'Set']
+TYPE_TO_CATEGORY = {
+    't-shirt': 'Top',
+    'tank top': 'Top',
+    'blouse': 'Top',
+    'sweater': 'Top',
+    'hoodie': 'Top',
+    'cardigan': 'Top',
+    'shirt': 'Top',
+    'crop top': 'Top',
+    'camisole': 'Top',
+    'polo shirt': 'Top',
+    'long sleeve shirt': 'Top',
+    'turtleneck': 'Top',
+    'thermal wear': 'Top',
+    'jeans': 'Bottom',
+    'shorts': 'Bottom',
+    'skirt': 'Bottom',
+    'pants': 'Bottom',
+    'trouser': 'Bottom',
+    'cargo pants': 'Bottom',
+    'corduroy pants': 'Bottom',
+    'leggings': 'Bottom',
+    'capri pants': 'Bottom',
+    'sweatpants': 'Bottom',
+    'jumpsuit': 'Bottom',
+    'culottes': 'Bottom',
+    'tights': 'Bottom',
+    'sneakers': 'Shoes',
+    'sandals': 'Shoes',
+    'boots': 'Shoes',
+    'heavy boot': 'Shoes',
+    'shoe': 'Shoes',
+    'loafers': 'Shoes',
+    'flats': 'Shoes',
+    'slippers': 'Shoes',
+    'heels': 'Shoes',
+    'jacket': 'Outerwear',
+    'coat': 'Outerwear',
+    'blazer': 'Outerwear',
+    'raincoat': 'Outerwear',
+    'windbreaker': 'Outerwear',
+    'denim jacket': 'Outerwear',
+    'leather jacket': 'Outerwear',
+    'trench coat': 'Outerwear',
+    'poncho': 'Outerwear',
+    'winter coat': 'Outerwear',
+    'gloves': 'Accessories',
+    'necklace': 'Accessories',
+    'scarf': 'Accessories',
+    'sunglasses': 'Accessories',
+    'hat': 'Accessories',
+    'belt': 'Accessories',
+    'watch': 'Accessories',
+    'earrings': 'Accessories',
+    'bracelet': 'Accessories',
+    'handbag': 'Accessories',
+    'set': 'Set',
+    'suit set': 'Set',
+    'complete suit': 'Set',
+    'dress': 'Set',
+}
+
+
+_inflect = inflect.engine()
+
+
+def map_product_to_category(item_type: str) -> Optional[str]:
+    singular_type = (_inflect.singular_noun(item_type) or item_type).strip().lower()
+    matches = [
+        category for category in (TYPE_TO_CATEGORY.get(singular_type), TYPE_TO_CATEGORY.get(item_type.strip().lower()))
+        if category
+    ]
+    return min(matches, key=CATEGORY_PRIORITY.index) if matches else None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('ecommerce_products') as batch_op:
+        batch_op.add_column(sa.Column('category', sa.String(length=50), nullable=True))
+        batch_op.create_index('ix_ecommerce_products_category_gender', ['category', 'gender'], unique=False)
+
+    # Backfill once per distinct item type rather than once per product
+    bind = op.get_bind()
+    item_types = [row[0] for row in bind.execute(sa.text(
+        "SELECT DISTINCT suggested_item_type FROM ecommerce_products WHERE suggested_item_type IS NOT NULL"
+    ))]
+    for item_type in item_types:
+        category = map_product_to_category(item_type)
+        if category:
+            bind.execute(
+                sa.text("UPDATE ecommerce_products SET category = :category WHERE suggested_item_type = :item_type"),
+                {'category': category, 'item_type': item_type}
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('ecommerce_products') as batch_op:
+        batch_op.drop_index('ix_ecommerce_products_category_gender')
+        batch_op.drop_column('category')
@@ -0,0 +1,43 @@
+"""indexes for hot queries
+
+Revision ID: c8e2a5f61d47
+Revises: b5d07e3c9a14
+Create Date: 2026-10-16 18:24:10.693518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2a5f61d47'
+down_revision: Union[str, None] = 'b5d07e3c9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# weather_data lookups by (location_id, date) are already served by uq_weather_data_location_date
+
+
+def _has_fk_indexes() -> bool:
+    # InnoDB already indexes every foreign key column, so a second index on user_id would be a duplicate
+    return op.get_bind().dialect.name == 'mysql'
+
+
+def upgrade() -> None:
+    if not _has_fk_indexes():
+        op.create_index(op.f('ix_wardrobe_items_user_id'), 'wardrobe_items', ['user_id'], unique=False)
+        op.create_index(op.f('ix_outfits_user_id'), 'outfits', ['user_id'], unique=False)
+    op.create_index('ix_outfit_suggestions_user_id_date_suggested', 'outfit_suggestions', ['user_id', 'date_suggested'], unique=False)
+    op.create_index('ix_ecommerce_products_item_type_gender', 'ecommerce_products', ['suggested_item_type', 'gender'], unique=False)
+    op.create_index(op.f('ix_fashion_trends_date_added'), 'fashion_trends', ['date_added'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_fashion_trends_date_added'), table_name='fashion_trends')
+    op.drop_index('ix_ecommerce_products_item_type_gender', table_name='ecommerce_products')
+    op.drop_index('ix_outfit_suggestions_user_id_date_suggested', table_name='outfit_suggestions')
+    if not _has_fk_indexes():
+        op.drop_index(op.f('ix_outfits_user_id'), table_name='outfits')
+        op.drop_index(op.f('ix_wardrobe_items_user_id'), table_name='wardrobe_items')
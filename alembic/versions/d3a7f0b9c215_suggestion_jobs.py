@@ -0,0 +1,43 @@
+"""suggestion_jobs table
+
+Revision ID: d3a7f0b9c215
+Revises: c8e2a5f61d47
+Create Date: 2026-10-16 23:52:18.204771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7f0b9c215'
+down_revision: Union[str, None] = 'c8e2a5f61d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('suggestion_jobs',
+    sa.Column('job_id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('suggestion_id', sa.Integer(), nullable=True),
+    sa.Column('error', sa.String(length=255), nullable=True),
+    sa.Column('error_status', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['suggestion_id'], ['outfit_suggestions.suggestion_id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_index(op.f('ix_suggestion_jobs_finished_at'), 'suggestion_jobs', ['finished_at'], unique=False)
+    op.create_index(op.f('ix_suggestion_jobs_user_id'), 'suggestion_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_suggestion_jobs_user_id'), table_name='suggestion_jobs')
+    op.drop_index(op.f('ix_suggestion_jobs_finished_at'), table_name='suggestion_jobs')
+    op.drop_table('suggestion_jobs')
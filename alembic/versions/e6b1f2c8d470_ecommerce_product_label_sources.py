@@ -0,0 +1,31 @@
+"""ecommerce_products label source columns
+
+Revision ID: e6b1f2c8d470
+Revises: d3a7f0b9c215
+Create Date: 2026-10-17 10:14:36.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1f2c8d470'
+down_revision: Union[str, None] = 'd3a7f0b9c215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows keep NULL: whether their labels came from GPT-4 or the local cascade is not recorded
+    with op.batch_alter_table('ecommerce_products') as batch_op:
+        batch_op.add_column(sa.Column('category_source', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('gender_source', sa.String(length=10), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('ecommerce_products') as batch_op:
+        batch_op.drop_column('gender_source')
+        batch_op.drop_column('category_source')
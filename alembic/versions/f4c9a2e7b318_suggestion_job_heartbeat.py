@@ -0,0 +1,29 @@
+"""suggestion_jobs heartbeat
+
+Revision ID: f4c9a2e7b318
+Revises: e6b1f2c8d470
+Create Date: 2026-10-17 11:02:47.610935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c9a2e7b318'
+down_revision: Union[str, None] = 'e6b1f2c8d470'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Unfinished jobs without a heartbeat fall back to created_at, so jobs queued before this revision still expire
+    with op.batch_alter_table('suggestion_jobs') as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('suggestion_jobs') as batch_op:
+        batch_op.drop_column('heartbeat_at')
@@ -0,0 +1,213 @@
+# article_crawler.py
+
+import asyncio
+import logging
+import time
+import traceback
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from http_client import MAX_RETRIES, RETRY_STATUS_CODES, backoff_delay, http_client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Setup headers for web scraping
+headers = {'User-Agent': 'Mozilla/5.0'}
+
+# Constants
+MAX_CONCURRENT_REQUESTS = 8       # Global cap on in-flight fetches
+PER_HOST_DELAY = 2.0              # Minimum seconds between two requests to the same host
+REQUEST_TIMEOUT = 10              # Seconds, matches the synchronous fetcher
+
+
+class HostThrottle:
+    """
+    Enforces per-host politeness: requests to one host are serialized and spaced
+    at least `delay` seconds apart, while different hosts proceed independently.
+    """
+
+    def __init__(self, delay: float = PER_HOST_DELAY):
+        self.delay = delay
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_request: Dict[str, float] = {}
+
+    def _lock_for(self, host: str) -> asyncio.Lock:
+        lock = self._locks.get(host)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[host] = lock
+        return lock
+
+    async def wait(self, host: str):
+        """
+        Waits until a request to `host` is allowed and records it as started.
+        """
+        async with self._lock_for(host):
+            last = self._last_request.get(host)
+            if last is not None:
+                remaining = self.delay - (time.monotonic() - last)
+                if remaining > 0:
+                    logger.debug(f"Throttling {host} for {remaining:.2f}s.")
+                    await asyncio.sleep(remaining)
+            self._last_request[host] = time.monotonic()
+
+
+def parse_article_html(content: bytes) -> str:
+    """
+    Extracts the visible text from an HTML document.
+
+    Args:
+        content (bytes): Raw HTML.
+
+    Returns:
+        str: Extracted text.
+    """
+    soup = BeautifulSoup(content, "html.parser")
+    return soup.get_text(separator=' ', strip=True)
+
+
+async def fetch_article(
+    session: aiohttp.ClientSession,
+    url: str,
+    semaphore: asyncio.Semaphore,
+    throttle: HostThrottle,
+    retries: int = MAX_RETRIES,
+) -> str:
+    """
+    Fetches and extracts text content from a single URL.
+    Uses the shared HTTP retry policy (http_client): 429/5xx responses and connection errors are retried
+    with jittered exponential backoff, other failures are not, and every attempt is counted in
+    http_client.get_stats(). The request itself goes through aiohttp because the crawl runs on an event loop,
+    where the blocking shared session would stall every other fetch.
+
+    Args:
+        session (aiohttp.ClientSession): Shared HTTP session.
+        url (str): The URL to fetch.
+        semaphore (asyncio.Semaphore): Global concurrency limit.
+        throttle (HostThrottle): Per-host politeness gate.
+        retries (int): Number of retries after the first attempt.
+
+    Returns:
+        str: Extracted text or empty string if failed.
+    """
+    host = urlsplit(url).netloc
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                # Throttle only once a fetch slot is held, so the request goes out when the host allows it
+                # rather than after a wait in the queue, and the recorded latency excludes that wait
+                await throttle.wait(host)
+                start = time.perf_counter()
+                logger.info(f"Fetching URL: {url} (Attempt {attempt + 1})")
+                async with session.get(url) as response:
+                    status = response.status
+                    retry_after = response.headers.get('Retry-After')
+                    content = await response.read() if status == 200 else None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            should_retry = attempt < retries
+            http_client.record(host, time.perf_counter() - start, error=True, retry=should_retry)
+            logger.error(f"Error fetching {url} on attempt {attempt + 1}: {e}")
+            logger.debug(traceback.format_exc())
+            if not should_retry:
+                break
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+
+        should_retry = status in RETRY_STATUS_CODES and attempt < retries
+        http_client.record(host, time.perf_counter() - start, error=status >= 400, retry=should_retry)
+        if status == 200:
+            try:
+                # Parse outside the semaphore so a slow parse does not hold a fetch slot
+                text = await asyncio.get_running_loop().run_in_executor(None, parse_article_html, content)
+            except Exception as e:
+                logger.error(f"Error parsing {url}: {e}")
+                logger.debug(traceback.format_exc())
+                return ""
+            logger.info(f"Successfully fetched and parsed URL: {url}")
+            return text
+        logger.warning(f"Failed to retrieve {url}, attempt {attempt + 1}, status code: {status}")
+        if not should_retry:
+            break
+        await asyncio.sleep(backoff_delay(attempt, retry_after))
+    logger.error(f"Failed to fetch {url} after {attempt + 1} attempts.")
+    return ""
+
+
+async def crawl_urls(
+    urls: List[str],
+    max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+    per_host_delay: float = PER_HOST_DELAY,
+    retries: int = MAX_RETRIES,
+    timeout: float = REQUEST_TIMEOUT,
+) -> List[str]:
+    """
+    Fetches all URLs concurrently with a global concurrency cap and per-host politeness.
+
+    Args:
+        urls (List[str]): URLs to fetch.
+        max_concurrency (int): Maximum number of requests in flight at once.
+        per_host_delay (float): Minimum delay in seconds between requests to the same host.
+        retries (int): Number of retries per URL after the first attempt.
+        timeout (float): Total timeout in seconds for a single request.
+
+    Returns:
+        List[str]: Extracted text per URL, in input order ("" for failures).
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    throttle = HostThrottle(per_host_delay)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    connector = aiohttp.TCPConnector(limit=max_concurrency)
+
+    async with aiohttp.ClientSession(headers=headers, timeout=client_timeout, connector=connector) as session:
+        tasks = [fetch_article(session, url, semaphore, throttle, retries) for url in urls]
+        return await asyncio.gather(*tasks)
+
+
+async def fetch_articles_async(
+    urls: List[str],
+    max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+    per_host_delay: float = PER_HOST_DELAY,
+    retries: int = MAX_RETRIES,
+) -> List[str]:
+    """
+    Crawls the URLs on the running event loop, for callers that are already async
+    (e.g. FastAPI handlers or an asyncio scheduler).
+
+    Args:
+        urls (List[str]): URLs to fetch.
+        max_concurrency (int): Maximum number of requests in flight at once.
+        per_host_delay (float): Minimum delay in seconds between requests to the same host.
+        retries (int): Number of retries per URL after the first attempt.
+
+    Returns:
+        List[str]: Extracted text per URL, in input order ("" for failures).
+    """
+    start = time.perf_counter()
+    articles = await crawl_urls(urls, max_concurrency, per_host_delay, retries)
+    elapsed = time.perf_counter() - start
+    fetched = sum(1 for article in articles if article)
+    logger.info(f"Crawled {fetched}/{len(urls)} URLs in {elapsed:.2f}s.")
+    return articles
+
+
+def fetch_articles(
+    urls: List[str],
+    max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+    per_host_delay: float = PER_HOST_DELAY,
+    retries: int = MAX_RETRIES,
+) -> List[str]:
+    """
+    Synchronous entry point for the trend pipeline, which runs on worker threads without an event loop.
+
+    Raises:
+        RuntimeError: If called from a thread with a running event loop; await fetch_articles_async there instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_articles_async(urls, max_concurrency, per_host_delay, retries))
+    raise RuntimeError("fetch_articles() cannot block a running event loop; await fetch_articles_async() instead.")
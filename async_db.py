@@ -0,0 +1,85 @@
+# async_db.py
+
+import logging
+import os
+from typing import AsyncIterator, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+
+from db import engine_options, instrumented_pool_class, request_session_slot
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+ASYNC_DB_ENABLED = os.getenv("ASYNC_DB_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Async driver used for each backend when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_engine = None
+_session_factory = None
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Swaps the driver of a sync database URL for its async counterpart,
+    e.g. mysql+pymysql://... -> mysql+aiomysql://...
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'; set ASYNC_DATABASE_URL.")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> Optional[str]:
+    async_url = os.getenv("ASYNC_DATABASE_URL")
+    if async_url:
+        return async_url
+    database_url = os.getenv("DATABASE_URL")
+    return to_async_url(database_url) if database_url else None
+
+
+def get_async_session_factory():
+    """
+    Creates the async engine and session factory on first use, so the sync app does not need the
+    async drivers or greenlet installed.
+    """
+    global _engine, _session_factory
+    if _session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        database_url = get_async_database_url()
+        if not database_url:
+            raise ValueError("DATABASE_URL is not set in the environment variables.")
+        options = engine_options(database_url)
+        if "pool_size" in options:
+            from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+            options["poolclass"] = instrumented_pool_class(AsyncAdaptedQueuePool, "async")
+        _engine = create_async_engine(database_url, **options)
+        # Objects stay usable after commit, since the routes return them for serialization
+        _session_factory = async_sessionmaker(_engine, expire_on_commit=False, autoflush=False)
+        logger.info(f"Async database engine created for {_engine.url.render_as_string(hide_password=True)}")
+    return _session_factory
+
+
+async def get_async_db() -> AsyncIterator:
+    # Dependency to get an async DB session; shares the DB_REQUEST_SESSIONS limit with get_db
+    async with request_session_slot():
+        async with get_async_session_factory()() as session:
+            yield session
+
+
+async def dispose_async_engine():
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+        _engine, _session_factory = None, None
@@ -0,0 +1,385 @@
+# async_routes.py
+
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Body, Depends, FastAPI, HTTPException, Query, Response, status
+from fastapi.routing import APIRoute
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from async_db import get_async_db
+from auth_tokens import authorize_user, get_token_user_id, require_path_user
+from db import session_scope
+from locations import get_or_create_location
+from models import Outfit, OutfitSuggestion, User, WardrobeItem
+from pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursorError, paginate_async
+from password_service import hash_password_async
+from schemas import (
+    OutfitCreate,
+    OutfitResponse,
+    OutfitSuggestionResponse,
+    OutfitUpdate,
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+    WardrobeItemCreate,
+    WardrobeItemResponse,
+    WardrobeItemUpdate,
+)
+from weather_service import WeatherServiceError, get_forecast, save_forecast
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Async versions of the user, wardrobe item, outfit and suggestion CRUD routes in main.py.
+# They await the database instead of holding a threadpool thread per request.
+router = APIRouter()
+
+
+async def fetch_page_async(db: AsyncSession, statement, columns, limit: Optional[int], cursor: Optional[str], response: Response,
+                           descending: bool = False) -> list:
+    """
+    Returns one keyset page of a select and sets the next page's cursor header when there is one.
+    """
+    try:
+        rows, next_cursor = await paginate_async(db, statement, columns, limit, cursor, descending)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
+
+
+async def get_or_404(db: AsyncSession, model, primary_key: int, detail: str):
+    instance = await db.get(model, primary_key)
+    if not instance:
+        logger.warning(f"{model.__name__} with ID {primary_key} not found.")
+        raise HTTPException(status_code=404, detail=detail)
+    return instance
+
+
+async def get_owned_or_404(db: AsyncSession, model, primary_key: int, detail: str, token_user_id: Optional[int]):
+    instance = await get_or_404(db, model, primary_key, detail)
+    authorize_user(instance.user_id, token_user_id)
+    return instance
+
+
+async def authorize_owners(db: AsyncSession, owner_column, key_column, keys: List[int], token_user_id: Optional[int]):
+    """
+    Rejects the request unless every row with one of the keys belongs to the token's user.
+    """
+    for owner_id in (await db.execute(select(owner_column).where(key_column.in_(keys)).distinct())).scalars():
+        authorize_user(owner_id, token_user_id)
+
+
+async def commit_or_500(db: AsyncSession, detail: str):
+    try:
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"{detail}: {e}")
+        raise HTTPException(status_code=500, detail=f"{detail}: {str(e)}")
+
+
+## Users
+
+@router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    logger.info(f"Creating user with email: {user.email}")
+
+    existing_user = (await db.execute(select(User.user_id).where(User.email == user.email))).first()
+    if existing_user:
+        logger.warning(f"Email {user.email} already registered.")
+        raise HTTPException(status_code=400, detail="Email already registered.")
+
+    if not user.location:
+        logger.warning("Location not provided during user creation.")
+        raise HTTPException(status_code=400, detail="Location is required.")
+
+    hashed_password = await hash_password_async(user.password)
+    location = await db.run_sync(lambda session: get_or_create_location(session, user.location))
+
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        password=hashed_password,
+        location=user.location,
+        location_id=location.location_id,
+        preferences=user.preferences,
+        gender=user.gender,
+        height=user.height,
+        weight=user.weight
+    )
+    db.add(db_user)
+    await commit_or_500(db, "Failed to create user")
+    await db.refresh(db_user)
+    logger.info(f"User {user.email} created successfully.")
+    return db_user
+
+
+@router.get("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(require_path_user)])
+async def read_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    logger.info(f"Fetching user with ID: {user_id}")
+    return await get_or_404(db, User, user_id, "User not found.")
+
+
+@router.put("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(require_path_user)])
+async def update_user(user_id: int, user_update: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+    logger.info(f"Updating user with ID: {user_id}")
+    user = await get_or_404(db, User, user_id, "User not found.")
+
+    location_updated = bool(user_update.location) and user_update.location != user.location
+    if location_updated:
+        logger.info(f"User ID {user_id} location updated from '{user.location}' to '{user_update.location}'.")
+
+    if user_update.password:
+        user.password = await hash_password_async(user_update.password)
+
+    update_data = user_update.dict(exclude_unset=True, exclude={"password"})
+    logger.debug(f"Updating fields: {update_data}")
+    for key, value in update_data.items():
+        setattr(user, key, value)
+    if location_updated:
+        location = await db.run_sync(lambda session: get_or_create_location(session, user.location))
+        user.location_id = location.location_id
+
+    await commit_or_500(db, "Failed to update user")
+    await db.refresh(user)
+    logger.info(f"User with ID {user_id} updated successfully.")
+
+    if location_updated:
+        try:
+            await run_in_threadpool(store_forecast, user.location)
+        except WeatherServiceError as we:
+            logger.error(f"Error during weather data fetch: {we.detail}")
+            raise HTTPException(status_code=500, detail="Failed to fetch and insert weather data after location update.")
+    return user
+
+
+def store_forecast(location: str):
+    """
+    Makes sure the forecast for a user's new location is stored, as the sync route does. The weather
+    service is sync, so this runs on a worker thread with a session of its own.
+    """
+    with session_scope() as session:
+        get_forecast(session, location, on_fetched=lambda weather_data: save_forecast(session, weather_data))
+
+
+@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_path_user)])
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    logger.info(f"Deleting user with ID: {user_id}")
+    user = await get_or_404(db, User, user_id, "User not found.")
+    await db.delete(user)
+    await commit_or_500(db, "Failed to delete user")
+    logger.info(f"User with ID {user_id} deleted successfully.")
+
+
+## Wardrobe Items
+
+@router.post("/wardrobe_item/", response_model=WardrobeItemResponse, status_code=status.HTTP_201_CREATED)
+async def create_wardrobe_item(item: WardrobeItemCreate, db: AsyncSession = Depends(get_async_db),
+                               token_user_id: Optional[int] = Depends(get_token_user_id)):
+    logger.info(f"Adding wardrobe item for user ID: {item.user_id}")
+    authorize_user(item.user_id, token_user_id)
+
+    db_item = WardrobeItem(
+        user_id=item.user_id,
+        clothing_type=item.clothing_type,
+        for_weather=item.for_weather,
+        color=item.color,
+        size=item.size,
+        tags=item.tags,
+        image_url=item.image_url
+    )
+    db.add(db_item)
+    await commit_or_500(db, "Failed to create wardrobe item")
+    await db.refresh(db_item)
+    logger.info(f"Wardrobe item with ID {db_item.item_id} created successfully.")
+    return db_item
+
+
+@router.get("/wardrobe_item/user/{user_id}", response_model=List[WardrobeItemResponse],
+            dependencies=[Depends(require_path_user)])
+async def get_all_wardrobe_items(user_id: int, response: Response,
+                                 limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                                 cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    logger.info(f"Fetching wardrobe item for user ID: {user_id}")
+    items = await fetch_page_async(
+        db, select(WardrobeItem).where(WardrobeItem.user_id == user_id), [WardrobeItem.item_id], limit, cursor, response
+    )
+    if not items and cursor is None:
+        raise HTTPException(status_code=404, detail="No wardrobe items found for this user.")
+    return items
+
+
+@router.get("/wardrobe_item/{item_id}", response_model=WardrobeItemResponse)
+async def read_wardrobe_item(item_id: int, db: AsyncSession = Depends(get_async_db),
+                             token_user_id: Optional[int] = Depends(get_token_user_id)):
+    logger.info(f"Fetching wardrobe item with ID: {item_id}")
+    return await get_owned_or_404(db, WardrobeItem, item_id, "Wardrobe item not found.", token_user_id)
+
+
+@router.put("/wardrobe_item/{item_id}", response_model=WardrobeItemResponse)
+async def update_wardrobe_item(item_id: int, item_update: WardrobeItemUpdate, db: AsyncSession = Depends(get_async_db),
+                               token_user_id: Optional[int] = Depends(get_token_user_id)):
+    logger.info(f"Updating wardrobe item with ID: {item_id}")
+    wardrobe_item = await get_owned_or_404(db, WardrobeItem, item_id, "Wardrobe item not found.", token_user_id)
+
+    update_data = item_update.dict(exclude_unset=True)
+    logger.debug(f"Updating fields: {update_data}")
+    for key, value in update_data.items():
+        setattr(wardrobe_item, key, value)
+
+    await commit_or_500(db, "Failed to update wardrobe item")
+    await db.refresh(wardrobe_item)
+    logger.info(f"Wardrobe item with ID {item_id} updated successfully.")
+    return wardrobe_item
+
+
+@router.delete("/wardrobe_item/", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_wardrobe_item(item_ids: List[int] = Body(..., embed=True), db: AsyncSession = Depends(get_async_db),
+                               token_user_id: Optional[int] = Depends(get_token_user_id)):
+    logger.info(f"Deleting wardrobe item with IDs: {item_ids}")
+    await authorize_owners(db, WardrobeItem.user_id, WardrobeItem.item_id, item_ids, token_user_id)
+
+    found = set((await db.execute(select(WardrobeItem.item_id).where(WardrobeItem.item_id.in_(item_ids)))).scalars())
+    if found:
+        await db.execute(delete(WardrobeItem).where(WardrobeItem.item_id.in_(found)))
+        await commit_or_500(db, "Failed to delete wardrobe items")
+        logger.info(f"Wardrobe items with IDs {sorted(found)} deleted successfully.")
+
+    not_found_items = [item_id for item_id in item_ids if item_id not in found]
+    if not_found_items:
+        raise HTTPException(status_code=404, detail=f"Wardrobe items with IDs {', '.join(map(str, not_found_items))} not found.")
+
+
+## Outfits
+
+@router.post("/outfit/", response_model=OutfitResponse, status_code=status.HTTP_201_CREATED)
+async def create_outfit(outfit: OutfitCreate, db: AsyncSession = Depends(get_async_db),
+                        token_user_id: Optional[int] = Depends(get_token_user_id)):
+    authorize_user(outfit.user_id, token_user_id)
+    db_outfit = Outfit(
+        user_id=outfit.user_id,
+        occasion=outfit.occasion,
+        for_weather=outfit.for_weather,
+        clothings=outfit.clothings
+    )
+    db.add(db_outfit)
+    try:
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to create outfit: {e}")
+        raise HTTPException(status_code=400, detail="Failed to create outfit")
+    await db.refresh(db_outfit)
+    logger.info(f"Outfit with ID {db_outfit.outfit_id} created successfully.")
+    return db_outfit
+
+
+@router.get("/outfit/user/{user_id}", response_model=List[OutfitResponse], dependencies=[Depends(require_path_user)])
+async def get_all_outfits(user_id: int, response: Response, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                          cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    logger.info(f"Fetching outfits for user ID: {user_id}")
+    return await fetch_page_async(
+        db, select(Outfit).where(Outfit.user_id == user_id), [Outfit.outfit_id], limit, cursor, response
+    )
+
+
+@router.get("/outfit/{outfit_id}", response_model=OutfitResponse)
+async def read_outfit(outfit_id: int, db: AsyncSession = Depends(get_async_db),
+                      token_user_id: Optional[int] = Depends(get_token_user_id)):
+    logger.info(f"Fetching outfit with ID: {outfit_id}")
+    return await get_owned_or_404(db, Outfit, outfit_id, "Outfit not found.", token_user_id)
+
+
+@router.put("/outfit/{outfit_id}", response_model=OutfitResponse)
+async def update_outfit(outfit_id: int, outfit_update: OutfitUpdate, db: AsyncSession = Depends(get_async_db),
+                        token_user_id: Optional[int] = Depends(get_token_user_id)):
+    logger.info(f"Updating outfit with ID: {outfit_id}")
+    outfit = await get_owned_or_404(db, Outfit, outfit_id, "Outfit not found.", token_user_id)
+
+    update_data = outfit_update.dict(exclude_unset=True)
+    logger.debug(f"Updating fields: {update_data}")
+    for key, value in update_data.items():
+        setattr(outfit, key, value)
+
+    await commit_or_500(db, "Failed to update outfit")
+    await db.refresh(outfit)
+    logger.info(f"Outfit with ID {outfit_id} updated successfully.")
+    return outfit
+
+
+@router.delete("/outfit/{outfit_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_outfit(outfit_id: int, db: AsyncSession = Depends(get_async_db),
+                        token_user_id: Optional[int] = Depends(get_token_user_id)):
+    logger.info(f"Deleting outfit with ID: {outfit_id}")
+    outfit = await get_owned_or_404(db, Outfit, outfit_id, "Outfit not found.", token_user_id)
+    await db.delete(outfit)
+    await commit_or_500(db, f"Failed to delete outfit with ID {outfit_id}")
+    logger.info(f"Outfit with ID {outfit_id} deleted successfully.")
+
+
+## Outfit Suggestions
+
+@router.get("/outfits/suggestions/{user_id}", response_model=List[OutfitSuggestionResponse],
+            dependencies=[Depends(require_path_user)])
+async def get_outfit_suggestions(user_id: int, response: Response,
+                                 limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                                 cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    logger.info(f"Fetching outfit suggestions for user ID: {user_id}")
+    suggestions = await fetch_page_async(
+        db, select(OutfitSuggestion).where(OutfitSuggestion.user_id == user_id),
+        [OutfitSuggestion.date_suggested, OutfitSuggestion.suggestion_id], limit, cursor, response,
+        descending=True
+    )
+    if not suggestions and cursor is None:
+        logger.warning(f"No outfit suggestions found for user ID: {user_id}")
+        raise HTTPException(status_code=404, detail="No outfit suggestions found for this user.")
+    return suggestions
+
+
+@router.delete("/outfits/suggestions/all", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_path_user)])
+async def delete_all_outfit_suggestions(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    logger.info(f"Deleting all outfit suggestions for user_id={user_id}")
+    await get_or_404(db, User, user_id, "User not found.")
+
+    result = await db.execute(delete(OutfitSuggestion).where(OutfitSuggestion.user_id == user_id))
+    await commit_or_500(db, "Failed to delete outfit suggestions")
+    logger.info(f"Deleted {result.rowcount} outfit suggestion(s) for user_id={user_id}.")
+
+
+@router.delete("/outfits/suggestions/", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_outfit_suggestions(suggestion_id: List[int] = Body(..., embed=True),
+                                    db: AsyncSession = Depends(get_async_db),
+                                    token_user_id: Optional[int] = Depends(get_token_user_id)):
+    logger.info(f"Deleting outfit suggestions with IDs: {suggestion_id}")
+    await authorize_owners(db, OutfitSuggestion.user_id, OutfitSuggestion.suggestion_id, suggestion_id, token_user_id)
+
+    found = set((await db.execute(
+        select(OutfitSuggestion.suggestion_id).where(OutfitSuggestion.suggestion_id.in_(suggestion_id))
+    )).scalars())
+    if found:
+        await db.execute(delete(OutfitSuggestion).where(OutfitSuggestion.suggestion_id.in_(found)))
+        await commit_or_500(db, "Failed to delete outfit suggestions")
+        logger.info(f"Outfit suggestions with IDs {sorted(found)} deleted successfully.")
+
+    not_found_items = [id for id in suggestion_id if id not in found]
+    if not_found_items:
+        raise HTTPException(status_code=404, detail=f"Outfit suggestions with IDs {', '.join(map(str, not_found_items))} not found.")
+
+
+def use_async_routes(app: FastAPI):
+    """
+    Replaces the app's sync routes with the async versions defined here (same paths and methods).
+    Call after all sync routes are registered.
+    """
+    replaced = {(route.path, method) for route in router.routes for method in route.methods}
+    app.router.routes = [
+        route for route in app.router.routes
+        if not (isinstance(route, APIRoute) and any((route.path, method) in replaced for method in route.methods))
+    ]
+    app.include_router(router)
+    logger.info(f"Serving {len(router.routes)} routes with the async database layer.")
@@ -0,0 +1,128 @@
+# auth_tokens.py
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+AUTH_TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL", "86400"))  # Seconds an access token stays valid
+# User-scoped routes reject requests without a token; only disable for local development
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "true").lower() in ("1", "true", "yes")
+
+# Every instance must share the secret, or tokens issued by one are rejected by the others and after a restart
+_secret = os.getenv("AUTH_TOKEN_SECRET")
+if not _secret:
+    raise ValueError("AUTH_TOKEN_SECRET is not set in the environment variables.")
+AUTH_TOKEN_SECRET = _secret.encode()
+
+# Tokens are compact HS256 JWTs, so clients can read the claims with any JWT library
+_HEADER = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b'=')
+
+
+class InvalidTokenError(Exception):
+    """Raised when an access token is malformed, has a bad signature or has expired."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+
+def _sign(signing_input: bytes) -> bytes:
+    return _b64encode(hmac.new(AUTH_TOKEN_SECRET, signing_input, hashlib.sha256).digest())
+
+
+def create_access_token(user_id: int, ttl: int = AUTH_TOKEN_TTL) -> Tuple[str, int]:
+    """
+    Issues a signed access token for a user.
+
+    Args:
+        user_id (int): The authenticated user's ID, stored in the `sub` claim.
+        ttl (int): Seconds until the token expires.
+
+    Returns:
+        Tuple[str, int]: The token and its expiry as a Unix timestamp.
+    """
+    issued_at = int(time.time())
+    expires_at = issued_at + ttl
+    payload = _b64encode(json.dumps({"sub": str(user_id), "iat": issued_at, "exp": expires_at},
+                                    separators=(',', ':')).encode())
+    signing_input = _HEADER + b'.' + payload
+    return (signing_input + b'.' + _sign(signing_input)).decode(), expires_at
+
+
+def decode_access_token(token: str) -> int:
+    """
+    Validates an access token without touching the database.
+
+    Returns:
+        int: The user ID the token was issued to.
+
+    Raises:
+        InvalidTokenError: If the token is malformed, tampered with or expired.
+    """
+    try:
+        header, payload, signature = token.encode().split(b'.')
+    except ValueError:
+        raise InvalidTokenError("Malformed token.")
+    if header != _HEADER or not hmac.compare_digest(signature, _sign(header + b'.' + payload)):
+        raise InvalidTokenError("Invalid token signature.")
+    try:
+        claims = json.loads(_b64decode(payload))
+        user_id, expires_at = int(claims["sub"]), int(claims["exp"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidTokenError("Malformed token claims.")
+    if expires_at <= time.time():
+        raise InvalidTokenError("Token has expired.")
+    return user_id
+
+
+# FastAPI dependencies shared by the sync and async routes; being async, they run on the event loop
+# instead of taking a threadpool slot
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_token_user_id(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Optional[int]:
+    """
+    Returns the user ID of the request's bearer token, checked by signature and expiry only (no database lookup).
+    Requests without a token are rejected with 401; with AUTH_REQUIRED disabled they get None instead.
+    """
+    if credentials is None:
+        if AUTH_REQUIRED:
+            raise HTTPException(status_code=401, detail="Not authenticated.", headers={"WWW-Authenticate": "Bearer"})
+        return None
+    try:
+        return decode_access_token(credentials.credentials)
+    except InvalidTokenError as e:
+        logger.warning(f"Rejected access token: {e}")
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+
+def authorize_user(user_id: int, token_user_id: Optional[int]):
+    if token_user_id is not None and token_user_id != user_id:
+        logger.warning(f"Token for user ID {token_user_id} used to access user ID {user_id}.")
+        raise HTTPException(status_code=403, detail="Not allowed to access another user's data.")
+
+
+async def require_path_user(user_id: int, token_user_id: Optional[int] = Depends(get_token_user_id)):
+    """
+    Route dependency: the request's bearer token must belong to the user in the path.
+    """
+    authorize_user(user_id, token_user_id)
@@ -0,0 +1,116 @@
+# benchmarks/bench_async_db.py
+#
+# Fires concurrent GET /wardrobe_item/user/{id} and GET /users/{id} requests at one in-process
+# app instance, once with the sync routes and once with ASYNC_DB_ENABLED, and reports throughput
+# and latency. Uses a temporary SQLite database unless BENCH_DATABASE_URL points at a real server.
+# Usage: python benchmarks/bench_async_db.py [--requests 2000] [--concurrency 200]
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+async def run_load(requests: int, concurrency: int) -> dict:
+    import logging
+
+    import httpx
+
+    import main
+    from auth_tokens import create_access_token
+    logging.disable(logging.INFO)  # Per-request logging would dominate the timings
+    from models import Base, User, WardrobeItem
+
+    Base.metadata.create_all(main.engine)
+    db = main.SessionLocal()
+    if not db.query(User).first():
+        user = User(username="bench", email="bench@example.com", password="x", location="Boston")
+        db.add(user)
+        db.flush()
+        db.add_all([WardrobeItem(user_id=user.user_id, clothing_type="jacket", for_weather="cold", color=["black"],
+                                 size="M", tags=["bench"]) for _ in range(20)])
+        db.commit()
+    user_id = db.query(User.user_id).scalar()
+    db.close()
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)[0]}"}
+
+    latencies = []
+    errors = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        async def one(index: int):
+            url = f"/wardrobe_item/user/{user_id}" if index % 2 else f"/users/{user_id}"
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except Exception as e:
+                    # Typically the connection pool timing out under load
+                    errors.append(type(e).__name__)
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        await one(0)  # Warm up connections
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*[one(index) for index in range(requests)])
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latencies) or [float("nan")]
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "errors": len(errors),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sync and async database layers under concurrent load.")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests per mode.")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight at once.")
+    parser.add_argument("--timeout", type=int, default=60, help="Seconds before a mode's run is abandoned.")
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        sys.path.insert(0, ROOT)
+        result = asyncio.run(run_load(args.requests, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        print(f"{args.requests} requests, {args.concurrency} in flight")
+        for mode in ("sync", "async"):
+            # Each mode runs in a fresh interpreter because main reads its configuration at import
+            env = dict(os.environ, DATABASE_URL=database_url, ASYNC_DB_ENABLED="true" if mode == "async" else "false")
+            env.setdefault("AUTH_TOKEN_SECRET", "bench")
+            try:
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--mode", mode,
+                     "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+                    env=env, capture_output=True, text=True, timeout=args.timeout
+                )
+            except subprocess.TimeoutExpired:
+                # Threadpool workers all waiting on an exhausted connection pool never recover
+                print(f"  {mode:<6} did not finish within {args.timeout}s")
+                continue
+            if output.returncode != 0:
+                sys.exit(f"{mode} run failed:\n{output.stderr}")
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            print(f"  {mode:<6} {result['requests_per_second']:8.1f} req/s   p50 {result['p50_ms']:7.1f} ms"
+                  f"   p99 {result['p99_ms']:7.1f} ms   errors {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
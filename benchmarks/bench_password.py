@@ -0,0 +1,84 @@
+# benchmarks/bench_password.py
+#
+# Simulates a login burst against FastAPI's bounded request threadpool and compares the old
+# per-call CryptContext run on request threads with password_service's dedicated worker pool.
+# Reports login throughput and the latency of light requests served during the burst.
+# Usage: BCRYPT_ROUNDS=10 python benchmarks/bench_password.py [--logins 200] [--light 200] [--threads 40]
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import password_service  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def legacy_verify_password(plain_password: str, hashed_password: str) -> bool:
+    # The old main.verify_password: build a context and verify on the request thread
+    from passlib.context import CryptContext
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def light_request():
+    time.sleep(0.001)  # A cheap sync endpoint, e.g. a primary key lookup
+
+
+async def timed_light_request(loop, threadpool, latencies):
+    start = time.perf_counter()
+    await loop.run_in_executor(threadpool, light_request)
+    latencies.append(time.perf_counter() - start)
+
+
+async def run_burst(mode: str, hashed: str, logins: int, light: int, threads: int):
+    loop = asyncio.get_running_loop()
+    threadpool = ThreadPoolExecutor(max_workers=threads)  # Stands in for the request threadpool
+    latencies = []
+
+    async def login():
+        if mode == "legacy":
+            assert await loop.run_in_executor(threadpool, legacy_verify_password, PASSWORD, hashed)
+        else:
+            valid, _ = await password_service.verify_and_update_async(PASSWORD, hashed)
+            assert valid
+
+    start = time.perf_counter()
+    login_tasks = [asyncio.ensure_future(login()) for _ in range(logins)]
+    await asyncio.sleep(0.05)  # Let the burst occupy the pool before the light requests arrive
+    await asyncio.gather(*[timed_light_request(loop, threadpool, latencies) for _ in range(light)])
+    await asyncio.gather(*login_tasks)
+    elapsed = time.perf_counter() - start
+    threadpool.shutdown()
+
+    latencies.sort()
+    print(f"{mode:<8} {logins / elapsed:8.1f} logins/s   light requests p50 {statistics.median(latencies) * 1000:8.1f} ms"
+          f"   p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login throughput under concurrency.")
+    parser.add_argument("--logins", type=int, default=200, help="Concurrent logins in the burst.")
+    parser.add_argument("--light", type=int, default=200, help="Light requests issued during the burst.")
+    parser.add_argument("--threads", type=int, default=40, help="Size of the request threadpool (AnyIO's default is 40).")
+    args = parser.parse_args()
+
+    print(f"bcrypt rounds {password_service.BCRYPT_ROUNDS}, {password_service.PASSWORD_HASH_WORKERS} hashing workers, "
+          f"{args.threads} request threads, {os.cpu_count()} CPUs")
+    hashed = password_service.hash_password(PASSWORD)  # Also starts the worker pool
+    try:
+        asyncio.run(run_burst("legacy", hashed, args.logins, args.light, args.threads))
+        asyncio.run(run_burst("service", hashed, args.logins, args.light, args.threads))
+    finally:
+        password_service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_startup.py
+#
+# Imports each module in a fresh interpreter and reports its import time and the process's peak RSS,
+# plus which heavy third-party packages importing main:app pulls in. Defaults to a temporary SQLite
+# database when DATABASE_URL is unset, so no server is needed.
+# Usage: python benchmarks/bench_startup.py [module ...]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules an API worker should only load when a route needs them
+HEAVY_PACKAGES = ["spacy", "sklearn", "scipy", "numpy", "pandas", "openai", "fal_client", "bs4", "aiohttp",
+                  "inflect", "joblib"]
+DEFAULT_MODULES = ["main", "fashion_trends", "outfit_suggester", "taxonomy", "sklearn", "openai", "inflect"]
+
+# Run in the child interpreter: import one module and print its cost as JSON
+PROBE = """
+import importlib, json, resource, sys, time
+sys.path.insert(0, {root!r})
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+try:
+    importlib.import_module({module!r})
+    error = None
+except BaseException as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": peak * scale / 2 ** 20,
+    "added_mb": (peak - baseline) * scale / 2 ** 20,
+    "heavy": sorted(name for name in {heavy!r} if name in sys.modules),
+    "error": error,
+}}))
+"""
+
+
+def measure(module: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(root=ROOT, module=module, heavy=HEAVY_PACKAGES)],
+        env=env, capture_output=True, text=True, cwd=ROOT
+    ).stdout.strip().splitlines()
+    return json.loads(output[-1]) if output else {"error": "no output"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and RSS per module.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import, each in a fresh interpreter.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is reported.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ)
+        env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        env.setdefault("OPENAI_API_KEY", "bench")
+        env.setdefault("EBAY_APP_ID", "bench")
+        env.setdefault("AUTH_TOKEN_SECRET", "bench")
+
+        print(f"{'module':<20} {'import s':>9} {'peak RSS MB':>12} {'added MB':>9}  heavy packages loaded")
+        for module in args.modules:
+            runs = [measure(module, env) for _ in range(max(1, args.repeat))]
+            best = min(runs, key=lambda run: run.get("seconds", float("inf")))
+            if best.get("error"):
+                print(f"{module:<20} failed: {best['error']}")
+                continue
+            print(f"{module:<20} {best['seconds']:9.3f} {best['rss_mb']:12.1f} {best['added_mb']:9.1f}  "
+                  f"{', '.join(best['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
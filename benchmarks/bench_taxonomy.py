@@ -0,0 +1,102 @@
+# benchmarks/bench_taxonomy.py
+#
+# Compares the compiled taxonomy against the per-call implementations it replaced.
+# The keyword scan is also timed against growing vocabularies: the substring scan costs
+# O(keywords x text) per description while the matcher stays O(text).
+# Usage: python benchmarks/bench_taxonomy.py [--descriptions 20000] [--products 50000]
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import taxonomy  # noqa: E402
+
+MODIFIERS = ['black', 'white', 'red', 'navy', 'denim', 'leather', 'wool', 'linen', 'oversized', 'cropped', 'vintage', 'knit']
+
+FILLER = (
+    "this season designers are layering relaxed silhouettes with tailored pieces in muted earth tones "
+    "and sunset palettes while runway looks pair oversized knits with sleek leather accents"
+).split()
+
+
+def legacy_map_product_to_category(suggested_item_type: str):
+    # Rebuilds the mapping and singularizes without memoization on every call, as before
+    singular_type = (taxonomy._inflect_engine().singular_noun(suggested_item_type) or suggested_item_type).strip().lower()
+    suggested_item_type_lower = suggested_item_type.strip().lower()
+    categories = {category: list(items) for category, items in taxonomy.CATEGORY_ITEMS.items()}
+    for category, items in categories.items():
+        if singular_type in items or suggested_item_type_lower in items:
+            return category
+    return None
+
+
+def legacy_extract_clothing_types(description: str, keywords=taxonomy.TREND_KEYWORDS):
+    return [word.capitalize() for word in keywords if word in description.lower()]
+
+
+def make_vocabularies():
+    items = sorted({item for items in taxonomy.CATEGORY_ITEMS.values() for item in items} | set(taxonomy.TREND_KEYWORDS))
+    return {
+        'full taxonomy': items,
+        'taxonomy with modifiers': items + [f"{modifier} {item}" for modifier in MODIFIERS for item in items],
+    }
+
+
+def make_descriptions(count: int, keywords, words: int = 120):
+    rng = random.Random(42)
+    vocabulary = FILLER + list(keywords) + ['jackets', 'sunsets', 'boots']
+    return [' '.join(rng.choice(vocabulary) for _ in range(words)) for _ in range(count)]
+
+
+def make_item_types(count: int):
+    rng = random.Random(7)
+    types = [item.title() for items in taxonomy.CATEGORY_ITEMS.values() for item in items] + ['Widget', 'Dresses', 'Hats']
+    return [rng.choice(types) for _ in range(count)]
+
+
+def timed(label: str, func, inputs):
+    start = time.perf_counter()
+    results = [func(value) for value in inputs]
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {elapsed:8.3f}s  ({len(inputs) / elapsed:,.0f}/s)")
+    return elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the clothing taxonomy.")
+    parser.add_argument("--descriptions", type=int, default=20000, help="Number of trend descriptions to scan.")
+    parser.add_argument("--products", type=int, default=50000, help="Number of item types to map.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # Unmapped types would log on every call
+
+    item_types = make_item_types(args.products)
+    print(f"map_product_to_category over {len(item_types):,} item types")
+    legacy, legacy_results = timed("legacy", legacy_map_product_to_category, item_types)
+    compiled, compiled_results = timed("compiled", taxonomy.map_product_to_category, item_types)
+    mismatches = sum(1 for old, new in zip(legacy_results, compiled_results) if old != new)
+    print(f"  speedup    {legacy / compiled:8.1f}x, {mismatches} differing results")
+
+    descriptions = make_descriptions(args.descriptions, taxonomy.TREND_KEYWORDS)
+    print(f"extract_clothing_types over {len(descriptions):,} descriptions")
+    legacy, legacy_results = timed("substring", legacy_extract_clothing_types, descriptions)
+    compiled, compiled_results = timed("matcher", taxonomy.extract_clothing_types, descriptions)
+    differing = sum(1 for old, new in zip(legacy_results, compiled_results) if old != new)
+    print(f"  speedup    {legacy / compiled:8.1f}x, {differing} descriptions differ (substring hits inside other words)")
+
+    for name, keywords in make_vocabularies().items():
+        descriptions = make_descriptions(args.descriptions, keywords)
+        matcher = taxonomy.KeywordMatcher(keywords)
+        print(f"keyword scan, {name} ({len(keywords)} keywords)")
+        legacy, _ = timed("substring", lambda text: legacy_extract_clothing_types(text, keywords), descriptions)
+        compiled, _ = timed("matcher", matcher.find, descriptions)
+        print(f"  speedup    {legacy / compiled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
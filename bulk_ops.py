@@ -0,0 +1,123 @@
+# bulk_ops.py
+
+import logging
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Table, func, select, tuple_
+from sqlalchemy.orm import Session
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Stay well below the bind parameter limits of SQLite (32766) and Postgres (65535)
+MAX_BIND_PARAMS = 30000
+
+UPSERT_DIALECTS = ('mysql', 'mariadb', 'postgresql', 'sqlite')
+
+
+def dialect_name(session: Session) -> str:
+    return session.get_bind().dialect.name
+
+
+def supports_upsert(session: Session) -> bool:
+    """
+    Returns True if the session's database supports the native conflict handling used here.
+    """
+    return dialect_name(session) in UPSERT_DIALECTS
+
+
+def chunk_rows(rows: List[dict], batch_size: int) -> List[List[dict]]:
+    """
+    Splits rows into multi-row statement batches, respecting the bind parameter limit.
+    """
+    if not rows:
+        return []
+    columns = max(1, len(rows[0]))
+    size = max(1, min(batch_size, MAX_BIND_PARAMS // columns))
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def _dialect_insert(session: Session, table: Table):
+    name = dialect_name(session)
+    if name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+    elif name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported for dialect '{name}'.")
+    return insert(table)
+
+
+def insert_ignore_duplicates(session: Session, table: Table, rows: List[dict], index_elements: Sequence[str]) -> int:
+    """
+    Inserts rows in one multi-row statement, silently skipping rows that hit the unique key.
+    Uses a no-op ON DUPLICATE KEY UPDATE on MySQL and ON CONFLICT DO NOTHING on Postgres/SQLite.
+    Unlike INSERT IGNORE, only duplicate keys are skipped; truncation, NOT NULL and foreign key
+    errors still raise.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        table (Table): The target table.
+        rows (List[dict]): Rows to insert; all must have the same keys.
+        index_elements (Sequence[str]): Columns of the unique key that identifies duplicates.
+
+    Returns:
+        int: Number of rows actually inserted.
+    """
+    if not rows:
+        return 0
+    stmt = _dialect_insert(session, table).values(rows)
+    if dialect_name(session) in ('mysql', 'mariadb'):
+        key = index_elements[0]
+        stmt = stmt.on_duplicate_key_update({key: stmt.inserted[key]})
+        # SQLAlchemy connects with CLIENT_FOUND_ROWS, so the rowcount would include the skipped
+        # duplicates; count them up front instead
+        existing = _count_existing(session, table, rows, index_elements)
+        session.execute(stmt)
+        return max(len(rows) - existing, 0)
+    stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    result = session.execute(stmt)
+    return max(result.rowcount, 0)
+
+
+def _count_existing(session: Session, table: Table, rows: List[dict], index_elements: Sequence[str]) -> int:
+    columns = [table.c[column] for column in index_elements]
+    if len(columns) == 1:
+        condition = columns[0].in_({row[index_elements[0]] for row in rows})
+    else:
+        condition = tuple_(*columns).in_({tuple(row[column] for column in index_elements) for row in rows})
+    return session.execute(select(func.count()).select_from(table).where(condition)).scalar() or 0
+
+
+def upsert_rows(session: Session, table: Table, rows: List[dict], index_elements: Sequence[str],
+                update_columns: Optional[Sequence[str]] = None) -> int:
+    """
+    Inserts rows in one multi-row statement, updating the existing row when the unique key already exists.
+    Uses ON DUPLICATE KEY UPDATE on MySQL and ON CONFLICT DO UPDATE on Postgres/SQLite.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        table (Table): The target table.
+        rows (List[dict]): Rows to upsert; all must have the same keys.
+        index_elements (Sequence[str]): Columns of the unique key.
+        update_columns (Optional[Sequence[str]]): Columns to overwrite on conflict; defaults to all non-key columns.
+
+    Returns:
+        int: The driver-reported row count (dialect dependent).
+    """
+    if not rows:
+        return 0
+    if update_columns is None:
+        update_columns = [column for column in rows[0] if column not in index_elements]
+    stmt = _dialect_insert(session, table).values(rows)
+    if dialect_name(session) in ('mysql', 'mariadb'):
+        stmt = stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+    result = session.execute(stmt)
+    return max(result.rowcount, 0)
@@ -0,0 +1,169 @@
+# classification_cache.py
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from cachetools import LRUCache
+from dotenv import load_dotenv
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+# Relative paths resolve against the project directory, not the process's working directory
+CLASSIFICATION_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         os.getenv("CLASSIFICATION_CACHE_PATH", "classification_cache.sqlite3"))
+
+# Constants
+MEMORY_CACHE_SIZE = 4096
+# Bumped when normalize_title changes; older entries were keyed differently and are dropped on open
+CACHE_KEY_VERSION = 2
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalizes a product title into a cache key, so titles differing only in case, spacing or punctuation
+    share an entry. Word order, sizes and numbers are kept, since they can change what the product is
+    ("Dress Shirt" vs. "Shirt Dress").
+
+    Args:
+        title (str): The raw product title.
+
+    Returns:
+        str: The normalized cache key.
+    """
+    return ' '.join(re.findall(r'[^\W_]+', (title or '').lower()))
+
+
+class ClassificationCache:
+    """
+    Durable cache of GPT classification results backed by a local SQLite file,
+    with an in-memory LRU in front of it.
+    The SQLite file is shared by every process on the host (uvicorn workers, pipeline runs),
+    and is only opened (and created) on the first lookup.
+    """
+
+    def __init__(self, path: str = CLASSIFICATION_CACHE_PATH, memory_size: int = MEMORY_CACHE_SIZE):
+        self.path = path
+        self._memory = LRUCache(maxsize=memory_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._initialized = False
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared across threads, so keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                if not self._initialized:
+                    self._init_db(conn)
+                    self._initialized = True
+        return conn
+
+    def _init_db(self, conn: sqlite3.Connection):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS product_classifications ("
+            " kind TEXT NOT NULL,"
+            " title_key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL,"
+            " PRIMARY KEY (kind, title_key))"
+        )
+        if conn.execute("PRAGMA user_version").fetchone()[0] < CACHE_KEY_VERSION:
+            conn.execute("DELETE FROM product_classifications")
+            conn.execute(f"PRAGMA user_version = {CACHE_KEY_VERSION}")
+        conn.commit()
+
+    def get(self, kind: str, title: str) -> Optional[str]:
+        """
+        Looks up a cached classification.
+
+        Args:
+            kind (str): The classification kind (e.g. 'category', 'gender').
+            title (str): The product title.
+
+        Returns:
+            Optional[str]: The cached value or None on a miss.
+        """
+        key = (kind, normalize_title(title))
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self.stats['memory_hits'] += 1
+                return value
+
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM product_classifications WHERE kind = ? AND title_key = ?", key
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading classification cache: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+            self._memory[key] = row[0]
+        return row[0]
+
+    def set(self, kind: str, title: str, value: str):
+        """
+        Stores a classification result in memory and on disk.
+
+        Args:
+            kind (str): The classification kind (e.g. 'category', 'gender').
+            title (str): The product title.
+            value (str): The classification result.
+        """
+        key = (kind, normalize_title(title))
+        with self._lock:
+            self._memory[key] = value
+            self.stats['writes'] += 1
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO product_classifications (kind, title_key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (key[0], key[1], value, datetime.utcnow().isoformat())
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing classification cache: {e}")
+
+    def get_or_compute(self, kind: str, title: str, compute: Callable[[str], Optional[str]]) -> Optional[str]:
+        """
+        Returns the cached classification, calling `compute` and caching its result on a miss.
+        None results are not cached so failed classifications are retried later.
+        """
+        value = self.get(kind, title)
+        if value is not None:
+            return value
+        value = compute(title)
+        if value is not None:
+            self.set(kind, title, value)
+        return value
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Returns hit/miss counters and the overall hit rate.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+classification_cache = ClassificationCache()
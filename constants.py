@@ -32,3 +32,22 @@ ALLOWED_CATEGORIES = [
     # Coordinated Sets
     'Set'
 ]
+
+# Alternative spellings mapped to the canonical location name used to key forecasts
+LOCATION_ALIASES = {
+    'nyc': 'new york',
+    'new york city': 'new york',
+    'new york, ny': 'new york',
+    'ny': 'new york',
+    'la': 'los angeles',
+    'los angeles, ca': 'los angeles',
+    'sf': 'san francisco',
+    'san francisco, ca': 'san francisco',
+    'dc': 'washington',
+    'washington dc': 'washington',
+    'washington, dc': 'washington',
+    'washington d.c.': 'washington',
+    'philly': 'philadelphia',
+    'vegas': 'las vegas',
+    'nola': 'new orleans',
+}
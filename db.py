@@ -0,0 +1,346 @@
+# db.py
+
+import logging
+import os
+import threading
+import time
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+import anyio
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # Connections kept open per process
+# Extra connections opened under load and closed when returned. Size plus overflow matches the 40 threads
+# that serve sync routes, so a handler never waits on the pool while holding its thread.
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection before failing
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Reconnect after this many seconds, below MySQL's wait_timeout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Request sessions open at once; the rest of the pool is left to exports, background tasks and jobs.
+# Requests beyond the limit wait up to DB_POOL_TIMEOUT for a slot, then get a 503.
+DB_REQUEST_SESSIONS = int(os.getenv("DB_REQUEST_SESSIONS", "30"))
+DB_POOL_STATS_ENABLED = os.getenv("DB_POOL_STATS_ENABLED", "false").lower() in ("1", "true", "yes")  # Serve GET /db/pool-stats
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_engine_lock = threading.Lock()
+_request_sessions: Optional[anyio.CapacityLimiter] = None
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters for one connection pool: how long checkouts wait, and how often the pool runs out.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.saturated_checkouts = 0
+            self.timeouts = 0
+            self.peak_checked_out = 0
+
+    def record_checkout(self, wait: float, checked_out: int, capacity: int):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if checked_out >= capacity:
+                self.saturated_checkouts += 1
+
+    def record_timeout(self, wait: float):
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "saturated_checkouts": self.saturated_checkouts,
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+            }
+
+
+# Metrics for every instrumented pool in the process, by name
+POOL_METRICS: Dict[str, PoolMetrics] = {}
+# Waits for one of the DB_REQUEST_SESSIONS slots in get_db and get_async_db
+REQUEST_SESSION_METRICS = PoolMetrics("request_sessions")
+_instrumented_pools: Dict[str, QueuePool] = {}
+
+
+def instrumented_pool_class(base_class, name: str):
+    """
+    Returns a subclass of a QueuePool class that times every checkout into POOL_METRICS[name].
+    The wait includes opening a new connection when the pool has none idle.
+    """
+    metrics = POOL_METRICS.setdefault(name, PoolMetrics(name))
+
+    class InstrumentedPool(base_class):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # Pools are recreated on engine.dispose(); keep reporting on the live one
+            _instrumented_pools[name] = self
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_timeout(time.perf_counter() - start)
+                logger.warning(f"Connection pool '{name}' exhausted: {self.status()}")
+                raise
+            metrics.record_checkout(time.perf_counter() - start, self.checkedout(), self.size() + self._max_overflow)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base_class.__name__}"
+    return InstrumentedPool
+
+
+def engine_options(database_url: str) -> dict:
+    """
+    Pool settings shared by the sync and async engines. In-memory SQLite keeps its single-connection pool.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {"echo": DB_ECHO}
+    return {
+        "echo": DB_ECHO,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def create_db_engine(database_url: str, pool_name: Optional[str] = None) -> Engine:
+    """
+    Creates an engine with the configured pool settings.
+
+    Args:
+        database_url (str): SQLAlchemy database URL.
+        pool_name (Optional[str]): Name to record pool metrics under; None leaves the pool uninstrumented.
+
+    Returns:
+        Engine: The new engine.
+    """
+    options = engine_options(database_url)
+    if pool_name and "pool_size" in options:
+        options["poolclass"] = instrumented_pool_class(QueuePool, pool_name)
+    return create_engine(database_url, **options)
+
+
+def get_engine() -> Engine:
+    """
+    Returns the process-wide engine for DATABASE_URL, creating it on first use.
+
+    Raises:
+        ValueError: If DATABASE_URL is not set.
+    """
+    global _engine, _session_factory
+    with _engine_lock:
+        if _engine is None:
+            database_url = os.getenv("DATABASE_URL")
+            if not database_url:
+                raise ValueError("DATABASE_URL is not set in the environment variables.")
+            _engine = create_db_engine(database_url, pool_name="sync")
+            _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+            logger.info(f"Database engine created for {_engine.url.render_as_string(hide_password=True)} "
+                        f"(pool size {DB_POOL_SIZE}, overflow {DB_MAX_OVERFLOW})")
+        return _engine
+
+
+def get_session_factory() -> sessionmaker:
+    get_engine()
+    return _session_factory
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Opens a session for one unit of work outside a request, rolling back on error and always closing it.
+    Commits stay explicit, as in the request handlers.
+    """
+    db = get_session_factory()()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def request_session_slot() -> AsyncIterator[None]:
+    """
+    Holds one of the DB_REQUEST_SESSIONS slots shared by the sync and async request sessions, waiting for it
+    on the event loop. The wait is recorded under "request_sessions" in pool_stats() and bounded by
+    DB_POOL_TIMEOUT, after which the request gets a 503.
+    """
+    global _request_sessions
+    if _request_sessions is None:
+        _request_sessions = anyio.CapacityLimiter(DB_REQUEST_SESSIONS)
+    # A token per session rather than per task, so the slot is released wherever the dependency is closed
+    borrower = object()
+    start = time.perf_counter()
+    try:
+        with anyio.fail_after(DB_POOL_TIMEOUT):
+            await _request_sessions.acquire_on_behalf_of(borrower)
+    except TimeoutError:
+        REQUEST_SESSION_METRICS.record_timeout(time.perf_counter() - start)
+        logger.warning(f"No request session free after {DB_POOL_TIMEOUT}s ({DB_REQUEST_SESSIONS} in use).")
+        raise HTTPException(status_code=503, detail="The server is busy, please retry.")
+    try:
+        REQUEST_SESSION_METRICS.record_checkout(time.perf_counter() - start, int(_request_sessions.borrowed_tokens),
+                                                DB_REQUEST_SESSIONS)
+        yield
+    finally:
+        _request_sessions.release_on_behalf_of(borrower)
+
+
+async def get_db() -> AsyncIterator[Session]:
+    """
+    Dependency to get a DB session; helpers called by the route take this session instead of opening their own.
+
+    At most DB_REQUEST_SESSIONS sessions are open at once, and requests wait for a slot on the event loop.
+    A sync handler's session keeps its connection until the response has been serialized, which needs a
+    threadpool thread of its own; left to the pool alone, every thread could end up waiting for a connection
+    held by a finished request queued for serialization, and the app stalls.
+    """
+    async with request_session_slot():
+        db = get_session_factory()()
+        try:
+            yield db
+        finally:
+            await anyio.to_thread.run_sync(db.close)
+
+
+def pool_stats() -> dict:
+    """
+    Returns the current state and checkout metrics of every instrumented pool, and the waits for request sessions.
+    """
+    stats = {"request_sessions": {
+        "limit": DB_REQUEST_SESSIONS,
+        "in_use": int(_request_sessions.borrowed_tokens) if _request_sessions else 0,
+        **REQUEST_SESSION_METRICS.snapshot(),
+    }}
+    for name, metrics in POOL_METRICS.items():
+        pool = _instrumented_pools.get(name)
+        stats[name] = {
+            "size": pool.size() if pool else 0,
+            "max_overflow": pool._max_overflow if pool else 0,
+            "checked_out": pool.checkedout() if pool else 0,
+            "idle": pool.checkedin() if pool else 0,
+            **metrics.snapshot(),
+        }
+    return stats
+
+
+def dispose_engine():
+    global _engine, _session_factory
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine, _session_factory = None, None
+
+
+class AdvisoryLock:
+    """
+    Named database lock that at most one process holds at a time, across workers and hosts.
+    Uses GET_LOCK on MySQL and pg_try_advisory_lock on PostgreSQL. The lock belongs to a dedicated
+    connection, so it is released when the holder exits or crashes and its connection closes.
+    Other databases have no such lock; there acquire() always succeeds, so only one process may use it.
+    """
+
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        self.name = name
+        self.dialect = engine.dialect.name
+        self._key = zlib.crc32(name.encode())  # PostgreSQL advisory locks take an integer key
+        self._connection: Optional[Connection] = None
+        if self.dialect not in ("mysql", "postgresql"):
+            logger.warning(f"{self.dialect} has no advisory locks; lock '{name}' cannot keep other processes out.")
+
+    def acquire(self) -> bool:
+        """
+        Takes the lock without waiting, or checks that it is still held if it was taken before.
+        Call it periodically: the check keeps the connection alive and notices a lost connection.
+
+        Returns:
+            bool: True if this process holds the lock.
+        """
+        if self.dialect not in ("mysql", "postgresql"):
+            return True
+        try:
+            if self._connection is not None:
+                if self.dialect == "mysql":
+                    still_held = self._connection.execute(
+                        text("SELECT IS_USED_LOCK(:name) = CONNECTION_ID()"), {"name": self.name}).scalar()
+                else:
+                    still_held = self._connection.execute(text("SELECT 1")).scalar()
+                if still_held:
+                    return True
+                logger.warning(f"Lost database lock '{self.name}'.")
+                self._close()
+
+            connection = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            if self.dialect == "mysql":
+                acquired = connection.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": self.name}).scalar()
+            else:
+                acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self._key}).scalar()
+            if not acquired:
+                connection.close()
+                return False
+            self._connection = connection
+            logger.info(f"Acquired database lock '{self.name}'.")
+            return True
+        except exc.DBAPIError as e:
+            logger.warning(f"Could not check database lock '{self.name}': {e}")
+            self._close()
+            return False
+
+    def release(self):
+        if self._connection is None:
+            return
+        try:
+            if self.dialect == "mysql":
+                self._connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": self.name})
+            else:
+                self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self._key})
+            logger.info(f"Released database lock '{self.name}'.")
+        except exc.DBAPIError as e:
+            logger.warning(f"Could not release database lock '{self.name}': {e}")
+        self._close()
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except exc.DBAPIError:
+                pass
+            self._connection = None
@@ -0,0 +1,172 @@
+# ebay_finding.py
+
+import logging
+import math
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from dotenv import load_dotenv
+
+from http_client import http_client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+MAX_CONCURRENT_PAGES = int(os.getenv("EBAY_MAX_CONCURRENT_PAGES", "4"))
+
+# Constants
+FINDING_API_URL = "https://svcs.ebay.com/services/search/FindingService/v1"
+MAX_ENTRIES_PER_PAGE = 100  # eBay allows max 100 per page
+
+
+class EbayFindingError(Exception):
+    """Raised when the Finding API answers with an ack other than 'Success'."""
+
+
+def build_headers(app_id: str) -> Dict[str, str]:
+    return {
+        "X-EBAY-SOA-SECURITY-APPNAME": app_id,
+        "X-EBAY-SOA-OPERATION-NAME": "findItemsByKeywords",
+        "X-EBAY-SOA-SERVICE-VERSION": "1.0.0",
+        "X-EBAY-SOA-RESPONSE-DATA-FORMAT": "JSON",
+    }
+
+
+def fetch_page(app_id: str, params: dict, page_number: int) -> Tuple[List[dict], int]:
+    """
+    Fetches a single page of findItemsByKeywords results.
+
+    Args:
+        app_id (str): The eBay application id.
+        params (dict): Query parameters without the page number.
+        page_number (int): The 1-based page to fetch.
+
+    Returns:
+        Tuple[List[dict], int]: The raw items on the page and the total number of pages.
+
+    Raises:
+        requests.exceptions.RequestException: On transport or HTTP errors.
+        EbayFindingError: If the API acknowledges the request with an error.
+    """
+    page_params = dict(params)
+    page_params["paginationInput.pageNumber"] = page_number
+    response = http_client.get(FINDING_API_URL, headers=build_headers(app_id), params=page_params)
+    response.raise_for_status()
+    data = response.json()
+
+    # Check API response acknowledgment
+    search_response = data.get('findItemsByKeywordsResponse', [{}])[0]
+    ack = search_response.get('ack', [None])[0]
+    if ack != 'Success':
+        error_message = search_response.get('errorMessage', [{}])[0].get('error', [{}])[0].get('message', ['Unknown error'])[0]
+        raise EbayFindingError(error_message)
+
+    items = search_response.get('searchResult', [{}])[0].get('item', [])
+    pagination_output = search_response.get('paginationOutput', [{}])[0]
+    total_pages = int(pagination_output.get('totalPages', [1])[0])
+    return items, total_pages
+
+
+def _fetch_page_safe(app_id: str, params: dict, page_number: int) -> Optional[List[dict]]:
+    """
+    Fetches a page for the fan-out, logging errors. Returns None if the page failed.
+    """
+    try:
+        items, _ = fetch_page(app_id, params, page_number)
+        return items
+    except EbayFindingError as e:
+        logger.error(f"eBay API Error on page {page_number}: {e}")
+    except requests.exceptions.HTTPError as http_err:
+        logger.error(f"HTTP error occurred on page {page_number}: {http_err}")
+    except Exception as e:
+        logger.error(f"Error fetching page {page_number} from eBay: {e}")
+        logger.debug(traceback.format_exc())
+    return None
+
+
+def search_items(app_id: str, search_query: str, limit: int, parse_item: Callable[[dict], Optional[dict]],
+                 max_pages: Optional[int] = None, extra_params: Optional[dict] = None,
+                 max_concurrency: int = MAX_CONCURRENT_PAGES) -> List[dict]:
+    """
+    Searches the Finding API and returns up to `limit` parsed items.
+    Page 1 is fetched first to learn the number of pages; the pages still needed are then
+    requested concurrently and reassembled in page order, so results match a sequential walk.
+
+    Args:
+        app_id (str): The eBay application id.
+        search_query (str): The search keywords.
+        limit (int): Maximum number of parsed items to return.
+        parse_item (Callable[[dict], Optional[dict]]): Converts a raw item; returning None drops it.
+        max_pages (Optional[int]): Maximum number of pages to fetch; None means all available pages.
+        extra_params (Optional[dict]): Additional query parameters (item filters, output selectors).
+        max_concurrency (int): Maximum number of page requests in flight at once.
+
+    Returns:
+        List[dict]: The parsed items in result order.
+    """
+    entries_per_page = max(1, min(limit, MAX_ENTRIES_PER_PAGE))
+    params = {
+        "keywords": search_query,
+        "paginationInput.entriesPerPage": entries_per_page,
+    }
+    params.update(extra_params or {})
+
+    products = []
+
+    def add_items(items: List[dict]) -> bool:
+        # Returns True once the limit is reached
+        for item in items:
+            product = parse_item(item)
+            if product is None:
+                continue
+            products.append(product)
+            if len(products) >= limit:
+                return True
+        return False
+
+    try:
+        logger.info(f"Making request to eBay API with search query: '{search_query}'")
+        items, total_pages = fetch_page(app_id, params, 1)
+    except EbayFindingError as e:
+        logger.error(f"eBay API Error: {e}")
+        return products
+    except requests.exceptions.HTTPError as http_err:
+        logger.error(f"HTTP error occurred: {http_err}")
+        logger.debug(traceback.format_exc())
+        return products
+    except Exception as e:
+        logger.error(f"Error fetching products from eBay: {e}")
+        logger.debug(traceback.format_exc())
+        return products
+
+    logger.info(f"Fetched {len(items)} items from eBay for query '{search_query}'. Total pages: {total_pages}")
+    if add_items(items) or not items:
+        return products
+
+    last_page = total_pages if max_pages is None else min(total_pages, max_pages)
+    next_page = 2
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        while next_page <= last_page:
+            # Request as many pages as should cover the remaining items, all in one wave
+            pages_needed = math.ceil((limit - len(products)) / entries_per_page)
+            wave = list(range(next_page, min(last_page, next_page + pages_needed - 1) + 1))
+            logger.info(f"Fetching pages {wave[0]}-{wave[-1]} for query '{search_query}'")
+            results = executor.map(lambda page: _fetch_page_safe(app_id, params, page), wave)
+
+            # Reassemble in page order, stopping at the first failed or empty page
+            for page_number, page_items in zip(wave, results):
+                if page_items is None:
+                    return products
+                if not page_items:
+                    logger.info(f"No more items found on page {page_number}. Stopping pagination.")
+                    return products
+                if add_items(page_items):
+                    return products
+            next_page = wave[-1] + 1
+
+    return products
@@ -0,0 +1,80 @@
+# exports.py
+
+import json
+import logging
+import os
+import traceback
+from datetime import date, datetime
+from typing import Iterator
+
+from dotenv import load_dotenv
+from sqlalchemy import Select, select
+from sqlalchemy.orm import sessionmaker
+
+from models import OutfitSuggestion, WardrobeItem
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))  # Rows fetched from the server-side cursor at a time
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+WARDROBE_EXPORT_COLUMNS = [
+    WardrobeItem.item_id, WardrobeItem.user_id, WardrobeItem.clothing_type, WardrobeItem.for_weather,
+    WardrobeItem.color, WardrobeItem.size, WardrobeItem.tags, WardrobeItem.image_url, WardrobeItem.date_added,
+]
+SUGGESTION_EXPORT_COLUMNS = [
+    OutfitSuggestion.suggestion_id, OutfitSuggestion.user_id, OutfitSuggestion.outfit_details,
+    OutfitSuggestion.gender, OutfitSuggestion.date_suggested, OutfitSuggestion.image_url,
+]
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def wardrobe_export_statement(user_id: int) -> Select:
+    return select(*WARDROBE_EXPORT_COLUMNS).where(WardrobeItem.user_id == user_id).order_by(WardrobeItem.item_id)
+
+
+def suggestions_export_statement(user_id: int) -> Select:
+    return select(*SUGGESTION_EXPORT_COLUMNS).where(OutfitSuggestion.user_id == user_id).order_by(
+        OutfitSuggestion.date_suggested.desc(), OutfitSuggestion.suggestion_id.desc()
+    )
+
+
+def stream_ndjson(session_factory: sessionmaker, statement: Select, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Streams the rows of a statement as newline-delimited JSON, one chunk per batch.
+    Rows are read as plain column tuples through a server-side cursor, so memory use does not grow
+    with the number of rows. The generator owns its session because the request's session is
+    closed before a streaming response body is sent.
+
+    Args:
+        session_factory (sessionmaker): Creates the session held for the duration of the export.
+        statement (Select): Column select to export.
+        batch_size (int): Rows fetched per round trip and emitted per chunk.
+
+    Yields:
+        bytes: One or more NDJSON lines.
+    """
+    db = session_factory()
+    rows = 0
+    try:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.mappings().partitions():
+            rows += len(partition)
+            yield "".join(json.dumps(dict(row), default=_json_default) + "\n" for row in partition).encode()
+        logger.info(f"Exported {rows} rows.")
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated stream
+        logger.error(f"Export failed after {rows} rows: {e}")
+        logger.debug(traceback.format_exc())
+        raise
+    finally:
+        db.close()
@@ -1,30 +1,34 @@
 # fashion_trends.py
 
-import requests
-from bs4 import BeautifulSoup
 import os
 from dotenv import load_dotenv
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from datetime import datetime
 import time
-import openai
 import logging
-from typing import List, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import re
+import json
 import string
 import traceback
-from sqlalchemy import create_engine
-import spacy
-
-# Initialize SpaCy English model
-nlp = spacy.load("en_core_web_sm")
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 from models import FashionTrend, EcommerceProduct  
 from constants import ALLOWED_CATEGORIES
+from taxonomy import is_allowed_category
+from article_crawler import fetch_articles
+from classification_cache import classification_cache
+import product_classifier
+from product_ingest import ingest_products
+from product_gender import VALID_GENDERS, determine_product_gender_gpt, determine_product_gender_gpt_cached
+from ebay_finding import search_items
+from http_client import http_client
+
+if TYPE_CHECKING:
+    # Only needed for annotations; numpy is imported where embeddings are built
+    import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,20 +48,26 @@ if not EBAY_APP_ID:
     logger.error("EBAY_APP_ID is not set in the environment variables.")
     raise ValueError("EBAY_APP_ID is not set in the environment variables.")
 
-# Initialize OpenAI client
-openai.api_key = OPENAI_API_KEY
 
-# Setup headers for web scraping
-headers = {'User-Agent': 'Mozilla/5.0'}
+@lru_cache(maxsize=1)
+def _openai():
+    # The OpenAI SDK is only imported, and its key set, once a function calls the API
+    import openai
+    openai.api_key = OPENAI_API_KEY
+    return openai
+
 
 # Constants
 MAX_EMBEDDING_TOKENS = 8000
+MAX_EMBEDDING_BATCH_TOKENS = 100000  # Estimated tokens per batched embedding request
+MAX_EMBEDDING_BATCH_SIZE = 2048  # OpenAI limit on inputs per embedding request
 MAX_SUMMARY_TOKENS = 4000
 MAX_SEARCH_PHRASE_WORDS = 5
 SIMILARITY_THRESHOLD = 0.7
 ELBOW_METHOD_MAX_K = 10
-EBAY_API_MAX_ENTRIES_PER_PAGE = 100
 VALIDATION_LIMIT = 1  # Number of items to fetch for validation
+CLASSIFICATION_BATCH_SIZE = 20  # Product titles per batched GPT-4 classification request
+CLASSIFICATION_FIELDS = ('category', 'gender')
 
 def debug_ecommerce_product():
     """
@@ -76,6 +86,7 @@ def categorize_clothing_item_gpt(product_name: str) -> Optional[str]:
     Returns:
         Optional[str]: The categorized clothing type or None if categorization fails.
     """
+    openai = _openai()
     try:
         logger.info(f"Categorizing product: '{product_name}' using GPT-4.")
         prompt = (
@@ -110,7 +121,7 @@ def categorize_clothing_item_gpt(product_name: str) -> Optional[str]:
         category = category.split('\n')[0].strip()
 
         # Validate the category
-        if category in ALLOWED_CATEGORIES:
+        if is_allowed_category(category):
             logger.info(f"Categorized '{product_name}' as '{category}'.")
             return category
         else:
@@ -127,88 +138,164 @@ def categorize_clothing_item_gpt(product_name: str) -> Optional[str]:
 
 
 
-from functools import lru_cache
-
-@lru_cache(maxsize=1024)
 def categorize_clothing_item_gpt_cached(product_name: str) -> Optional[str]:
-    return categorize_clothing_item_gpt(product_name)
+    return product_classifier.predict_category(product_name) or \
+        classification_cache.get_or_compute('category', product_name, categorize_clothing_item_gpt)
 
-@lru_cache(maxsize=1024)
-def determine_product_gender_gpt_cached(product_name: str) -> str:
-    return determine_product_gender_gpt(product_name)
 
-
-def determine_product_gender_gpt(product_name: str) -> str:
+def _parse_batch_classification(content: str) -> List[dict]:
+    """
+    Parses the JSON array returned by the batch classifier, tolerating code fences and surrounding text.
     """
-    Determines the gender category using GPT-4 based on the product name.
-    Returns 'Male', 'Female', or 'Unisex'.
-    Ensures that 'Unisex' is only used if explicitly stated.
-    Discards the clothing if it cannot be determined as 'Male' or 'Female'.
+    start = content.find('[')
+    end = content.rfind(']')
+    if start == -1 or end == -1:
+        raise ValueError("No JSON array found in response.")
+    entries = json.loads(content[start:end + 1])
+    if not isinstance(entries, list):
+        raise ValueError("Response is not a JSON array.")
+    return [entry for entry in entries if isinstance(entry, dict)]
+
+
+def classify_products_batch_gpt(product_names: List[str], category_hints: Optional[List[Optional[str]]] = None,
+                                fields: Tuple[str, ...] = CLASSIFICATION_FIELDS) -> Dict[int, dict]:
     """
+    Classifies several products in a single GPT-4 request, returning the requested fields together.
+    Only entries that validate against ALLOWED_CATEGORIES and VALID_GENDERS are returned.
+
+    Args:
+        product_names (List[str]): Product titles to classify.
+        category_hints (Optional[List[Optional[str]]]): eBay category names, aligned with product_names.
+        fields (Tuple[str, ...]): Which of 'category' and 'gender' to ask for.
+
+    Returns:
+        Dict[int, dict]: Maps an input index to a value per requested field; a value is None if invalid.
+    """
+    openai = _openai()
+    lines = []
+    for idx, product_name in enumerate(product_names):
+        hint = category_hints[idx] if category_hints else None
+        lines.append(f"{idx}. {product_name}" + (f" (eBay category: {hint})" if hint else ""))
+
+    wanted = []
+    example = {"id": 0}
+    if 'category' in fields:
+        wanted.append("exactly one category from the predefined categories")
+        example['category'] = "Jacket"
+    if 'gender' in fields:
+        wanted.append("a gender of 'Male', 'Female' or 'Unisex'")
+        example['gender'] = "Male"
+    prompt = (
+        "Classify each clothing item below. For every item choose " + " and ".join(wanted) + "."
+        + (" Only use 'Unisex' if it is explicitly stated as such." if 'gender' in fields else "") + "\n\n"
+        + ("Predefined Categories: " + ", ".join(ALLOWED_CATEGORIES) + "\n\n" if 'category' in fields else "")
+        + "Respond with only a JSON array, one object per item, in the form "
+        + json.dumps([example]) + ".\n\n"
+        "Items:\n" + "\n".join(lines)
+    )
+
     try:
-        logger.info(f"Determining gender for product: '{product_name}' using GPT-4.")
+        logger.info(f"Classifying {len(product_names)} products ({', '.join(fields)}) in one GPT-4 request.")
         response = openai.ChatCompletion.create(
             model="gpt-4",
             messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert in fashion trends and gender categorization. "
-                        "Determine whether the following product is designed for 'Male', 'Female', or is 'Unisex'. "
-                        "Respond with only one of these three options. "
-                        "Only categorize as 'Unisex' if it is explicitly stated as such."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": f"Product Name: {product_name}"
-                }
+                {"role": "system", "content": "You are an expert fashion assistant with a deep understanding of various clothing categories."},
+                {"role": "user", "content": prompt}
             ],
-            max_tokens=10,
-            temperature=0.2,
+            max_tokens=20 * len(fields) * len(product_names) + 50,
+            temperature=0.0,  # Ensure deterministic output
         )
-        gender = response['choices'][0]['message']['content'].strip()
-        gender = gender.capitalize()
-        if gender not in ['Male', 'Female', 'Unisex']:
-            logger.warning(f"GPT-4 returned unexpected gender '{gender}' for product '{product_name}'. Defaulting to 'Unisex'.")
-            return 'Unisex'
-        logger.info(f"GPT-4 classified product '{product_name}' as '{gender}'.")
-        return gender
+        entries = _parse_batch_classification(response['choices'][0]['message']['content'])
     except Exception as e:
-        logger.error(f"Error determining gender with GPT-4 for product '{product_name}': {e}")
+        logger.error(f"Error in batch classification of {len(product_names)} products: {e}")
         logger.debug(traceback.format_exc())
-        return 'Unisex'  # Default to 'Unisex' in case of failure
-    
-def extract_text_from_url(url: str, retries: int = 3, delay: int = 2) -> str:
+        return {}
+
+    results = {}
+    for entry in entries:
+        try:
+            idx = int(entry.get('id'))
+        except (TypeError, ValueError):
+            continue
+        if idx < 0 or idx >= len(product_names):
+            continue
+        result = {}
+        if 'category' in fields:
+            category = str(entry.get('category') or '').strip()
+            result['category'] = category if is_allowed_category(category) else None
+        if 'gender' in fields:
+            gender = str(entry.get('gender') or '').strip().capitalize()
+            result['gender'] = gender if gender in VALID_GENDERS else None
+        results[idx] = result
+    return results
+
+
+def classify_products(product_names: List[str], category_hints: Optional[List[Optional[str]]] = None,
+                      batch_size: int = CLASSIFICATION_BATCH_SIZE) -> List[Dict[str, Optional[str]]]:
     """
-    Fetches and extracts text content from a given URL.
-    Retries on failure with specified delay between attempts.
-    
+    Determines category and gender for many products, using the local classifier cascade and the
+    classification cache first, then batched GPT-4 requests, and finally individual requests for items
+    the batch skipped or garbled. GPT-4 is only asked for the fields the cascade left unresolved.
+
     Args:
-        url (str): The URL to fetch.
-        retries (int): Number of retry attempts.
-        delay (int): Delay in seconds between retries.
-        
+        product_names (List[str]): Product titles to classify.
+        category_hints (Optional[List[Optional[str]]]): eBay category names, aligned with product_names.
+        batch_size (int): Maximum number of titles per GPT-4 request.
+
     Returns:
-        str: Extracted text or empty string if failed.
+        List[Dict[str, Optional[str]]]: Per input, in input order: 'category' and 'gender', and where each came
+        from in 'category_source' and 'gender_source' (see product_classifier's SOURCE_* constants).
     """
-    for attempt in range(1, retries + 1):
-        try:
-            logger.info(f"Fetching URL: {url} (Attempt {attempt})")
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
-                time.sleep(delay)  # Polite delay
-                text = soup.get_text(separator=' ', strip=True)
-                logger.info(f"Successfully fetched and parsed URL: {url}")
-                return text
-            else:
-                logger.warning(f"Failed to retrieve {url}, attempt {attempt}, status code: {response.status_code}")
-        except Exception as e:
-            logger.error(f"Error fetching {url} on attempt {attempt}: {e}")
-            logger.debug(traceback.format_exc())
-    logger.error(f"Failed to fetch {url} after {retries} attempts.")
-    return ""
+    # Run the local cascade once per distinct title, so its stats count each title once
+    resolved: Dict[str, Dict[str, Optional[str]]] = {}
+    for name in product_names:
+        if name not in resolved:
+            resolved[name] = {}
+            for field in CLASSIFICATION_FIELDS:
+                value, source = product_classifier.predict(field, name)
+                if value is None:
+                    # The cache only holds GPT-4 answers
+                    value = classification_cache.get(field, name)
+                    source = product_classifier.SOURCE_GPT if value is not None else None
+                resolved[name][field] = value
+                resolved[name][f'{field}_source'] = source
+
+    # Group the distinct titles by the fields still missing, so each request asks only for those
+    pending: Dict[Tuple[str, ...], List[str]] = {}
+    for name, values in resolved.items():
+        missing = tuple(field for field in CLASSIFICATION_FIELDS if values[field] is None)
+        if missing:
+            pending.setdefault(missing, []).append(name)
+
+    first_index = {}
+    for idx, name in enumerate(product_names):
+        first_index.setdefault(name, idx)
+    individual = {'category': categorize_clothing_item_gpt, 'gender': determine_product_gender_gpt}
+
+    for fields, names in pending.items():
+        for start in range(0, len(names), batch_size):
+            chunk = names[start:start + batch_size]
+            hints = [category_hints[first_index[name]] for name in chunk] if category_hints else None
+            batch_results = classify_products_batch_gpt(chunk, hints, fields)
+
+            for offset, name in enumerate(chunk):
+                result = batch_results.get(offset, {})
+                for field in fields:
+                    value = result.get(field)
+                    if value is not None:
+                        classification_cache.set(field, name, value)
+                    else:
+                        # Retry only the fields the batch skipped or garbled, one item at a time
+                        logger.warning(f"Batch classification returned no valid {field} for '{name}'. Retrying individually.")
+                        value = classification_cache.get_or_compute(field, name, individual[field])
+                    resolved[name][field] = value
+                    resolved[name][f'{field}_source'] = product_classifier.SOURCE_GPT if value is not None else None
+
+    for values in resolved.values():
+        if values['gender'] is None:
+            values['gender'], values['gender_source'] = 'Unisex', product_classifier.SOURCE_FALLBACK
+    return [dict(resolved[name]) for name in product_names]
+
 
 def truncate_text(text: str, max_tokens: int = MAX_EMBEDDING_TOKENS) -> str:
     """
@@ -227,30 +314,92 @@ def truncate_text(text: str, max_tokens: int = MAX_EMBEDDING_TOKENS) -> str:
     logger.debug(f"Truncated text to {len(truncated)} characters.")
     return truncated
 
-def get_embedding(text: str) -> Optional[np.ndarray]:
+def estimate_tokens(text: str) -> int:
     """
-    Generates an embedding for the given text using OpenAI's API.
-    
+    Estimates the token count of a text, using the same 4 characters per token heuristic as truncate_text.
+    """
+    return max(1, len(text) // 4)
+
+def split_embedding_batches(texts: List[str], max_batch_tokens: int = MAX_EMBEDDING_BATCH_TOKENS,
+                            max_batch_size: int = MAX_EMBEDDING_BATCH_SIZE) -> List[List[int]]:
+    """
+    Groups text indices into batches that stay within a token budget and an input count limit.
+
     Args:
-        text (str): The input text.
-        
+        texts (List[str]): The (already truncated) texts to embed.
+        max_batch_tokens (int): Maximum estimated tokens per request.
+        max_batch_size (int): Maximum number of inputs per request.
+
     Returns:
-        Optional[np.ndarray]: The embedding vector or None if failed.
+        List[List[int]]: Batches of indices into `texts`, in input order.
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    for idx, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(idx)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def _embed_batch(texts: List[str]) -> List[Optional["np.ndarray"]]:
     """
-    truncated_text = truncate_text(text, MAX_EMBEDDING_TOKENS)
+    Embeds a batch of texts in one request. On failure, the batch is split in half and retried
+    so that a single bad input only loses its own embedding.
+    """
+    import numpy as np
+
+    openai = _openai()
     try:
-        logger.info("Generating embedding for text.")
         response = openai.Embedding.create(
             model="text-embedding-ada-002",
-            input=truncated_text
+            input=texts
         )
-        embedding = response['data'][0]['embedding']
-        logger.info("Successfully generated embedding.")
-        return np.array(embedding)
+        embeddings = [None] * len(texts)
+        for item in response['data']:
+            embeddings[item['index']] = np.array(item['embedding'])
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        if missing:
+            logger.warning(f"Embedding response was missing {len(missing)} of {len(texts)} inputs.")
+        return embeddings
     except Exception as e:
-        logger.error(f"Error in embedding generation: {e}")
-        logger.debug(traceback.format_exc())
-        return None
+        if len(texts) == 1:
+            logger.error(f"Error in embedding generation: {e}")
+            logger.debug(traceback.format_exc())
+            return [None]
+        logger.warning(f"Embedding batch of {len(texts)} failed ({e}). Splitting and retrying.")
+        middle = len(texts) // 2
+        return _embed_batch(texts[:middle]) + _embed_batch(texts[middle:])
+
+def get_embeddings_batch(texts: List[str]) -> List[Optional["np.ndarray"]]:
+    """
+    Generates embeddings for many texts using as few OpenAI requests as possible.
+    Texts are truncated, grouped by a token budget and the results are returned in input order.
+
+    Args:
+        texts (List[str]): The input texts.
+
+    Returns:
+        List[Optional[np.ndarray]]: One embedding per input, or None where generation failed.
+    """
+    truncated_texts = [truncate_text(text, MAX_EMBEDDING_TOKENS) for text in texts]
+    embeddings: List[Optional["np.ndarray"]] = [None] * len(texts)
+    batches = split_embedding_batches(truncated_texts)
+
+    logger.info(f"Generating embeddings for {len(texts)} texts in {len(batches)} request(s).")
+    for batch in batches:
+        results = _embed_batch([truncated_texts[i] for i in batch])
+        for idx, embedding in zip(batch, results):
+            embeddings[idx] = embedding
+
+    logger.info(f"Successfully generated {sum(e is not None for e in embeddings)}/{len(texts)} embeddings.")
+    return embeddings
 
 def extract_refined_trends(text: str, max_tokens: int = MAX_SUMMARY_TOKENS) -> str:
     """
@@ -264,6 +413,7 @@ def extract_refined_trends(text: str, max_tokens: int = MAX_SUMMARY_TOKENS) -> s
     Returns:
         str: Combined trends text.
     """
+    openai = _openai()
     chunks = [text[i:i+max_tokens] for i in range(0, len(text), max_tokens)]
     all_trends = []
 
@@ -299,8 +449,6 @@ def extract_refined_trends(text: str, max_tokens: int = MAX_SUMMARY_TOKENS) -> s
     logger.debug(f"Combined trends text length: {len(combined_trends)} characters.")
     return combined_trends
 
-from sklearn.cluster import DBSCAN
-
 def deduplicate_trends(trends_list: List[str]) -> List[str]:
     """
     Deduplicates trends using DBSCAN clustering based on TF-IDF embeddings.
@@ -311,6 +459,11 @@ def deduplicate_trends(trends_list: List[str]) -> List[str]:
     Returns:
         List[str]: List of unique trends.
     """
+    # numpy and scikit-learn are imported here rather than at module level, so importing this module stays cheap
+    import numpy as np
+    from sklearn.cluster import DBSCAN
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     vectorizer = TfidfVectorizer(stop_words='english')
     X = vectorizer.fit_transform(trends_list)
     
@@ -345,6 +498,7 @@ def generate_search_keywords(description: str, min_keywords: int = 3, max_keywor
     Returns:
         Optional[str]: A space-separated string of extracted keywords or None if failed.
     """
+    openai = _openai()
     try:
         logger.info("Generating search keywords using GPT.")
         prompt = (
@@ -516,6 +670,7 @@ def summarize_cluster(text: str) -> str:
     Returns:
         str: Summary of the cluster.
     """
+    openai = _openai()
     try:
         logger.info("Summarizing cluster text.")
         response = openai.ChatCompletion.create(
@@ -569,10 +724,12 @@ def validate_search_phrase(search_phrase: str) -> bool:
         logger.debug(traceback.format_exc())
         return False
 
-def determine_optimal_clusters(embeddings: np.ndarray, max_k: int = ELBOW_METHOD_MAX_K) -> int:
+def determine_optimal_clusters(embeddings: "np.ndarray", max_k: int = ELBOW_METHOD_MAX_K) -> int:
     """
     Determines the optimal number of clusters using the Elbow Method.
     """
+    from sklearn.cluster import KMeans
+
     num_samples = len(embeddings)
     if num_samples < 2:
         logger.error("Insufficient samples for clustering.")
@@ -592,6 +749,71 @@ def determine_optimal_clusters(embeddings: np.ndarray, max_k: int = ELBOW_METHOD
     logger.info(f"Determined optimal number of clusters: {optimal_k}")
     return optimal_k
 
+def parse_ebay_item(item: dict) -> Optional[dict]:
+    """
+    Converts a Finding API item into a product dictionary (without classification).
+    Returns None if essential data is missing.
+
+    Args:
+        item (dict): A single item from the eBay search result.
+
+    Returns:
+        Optional[dict]: The product dictionary, with the eBay category under 'category_name'.
+    """
+    ebay_item_id = item.get("itemId", [None])[0]
+    product_name = item.get("title", [None])[0]
+    category_name = item.get("primaryCategory", [{}])[0].get("categoryName", [None])[0]
+    price = float(item.get("sellingStatus", [{}])[0].get("currentPrice", [{}])[0].get("__value__", 0.0))
+    currency = item.get("sellingStatus", [{}])[0].get("currentPrice", [{}])[0].get("__currency__", "USD")
+    product_url = item.get("viewItemURL", [None])[0]
+    image_url = item.get("galleryURL", [None])[0]
+
+    # Skip items with missing essential data
+    if not all([ebay_item_id, product_name, product_url]):
+        logger.warning(f"Skipping item due to missing data: {item}")
+        return None
+
+    return {
+        'ebay_item_id': ebay_item_id,
+        'product_name': product_name,
+        'category_name': category_name,
+        'suggested_item_type': None,
+        'price': price,
+        'currency': currency,
+        'product_url': product_url,
+        'image_url': image_url,
+        'date_suggested': datetime.utcnow(),
+        'user_id': None,  # Set to appropriate user_id if necessary
+        'gender': 'Unisex'
+    }
+
+def classify_fetched_products(products: List[dict]) -> List[dict]:
+    """
+    Fills in suggested_item_type and gender, and where each came from, for fetched products using batched classification.
+
+    Args:
+        products (List[dict]): Products returned by parse_ebay_item.
+
+    Returns:
+        List[dict]: Classified copies of the products, without the temporary 'category_name' key.
+        The input dictionaries are left unchanged.
+    """
+    if not products:
+        return products
+    classifications = classify_products(
+        [product['product_name'] for product in products],
+        [product.get('category_name') for product in products]
+    )
+    classified = []
+    for product, classification in zip(products, classifications):
+        product = {key: value for key, value in product.items() if key != 'category_name'}
+        product['suggested_item_type'] = classification['category']
+        product['gender'] = classification['gender']
+        product['category_source'] = classification['category_source']
+        product['gender_source'] = classification['gender_source']
+        classified.append(product)
+    return classified
+
 def fetch_ebay_products(search_query: str, limit: int = 50, max_pages: int = 10) -> List[dict]:
     """
     Fetches products from eBay API based on the search_query.
@@ -605,160 +827,84 @@ def fetch_ebay_products(search_query: str, limit: int = 50, max_pages: int = 10)
     Returns:
         List[dict]: A list of product dictionaries.
     """
-    ebay_api_url = "https://svcs.ebay.com/services/search/FindingService/v1"
-    headers_api = {
-        "X-EBAY-SOA-SECURITY-APPNAME": EBAY_APP_ID,
-        "X-EBAY-SOA-OPERATION-NAME": "findItemsByKeywords",
-        "X-EBAY-SOA-SERVICE-VERSION": "1.0.0",
-        "X-EBAY-SOA-RESPONSE-DATA-FORMAT": "JSON",
-    }
-    params = {
-        "keywords": search_query,
-        "paginationInput.entriesPerPage": min(limit, EBAY_API_MAX_ENTRIES_PER_PAGE),  # eBay allows max 100 per page
-        "paginationInput.pageNumber": 1,
-        "outputSelector": "SellerInfo",
-    }
+    products = search_items(
+        EBAY_APP_ID,
+        search_query,
+        limit,
+        parse_ebay_item,
+        max_pages=max_pages,
+        extra_params={"outputSelector": "SellerInfo"}
+    )
+    logger.info(f"Total products fetched: {len(products)}")
+    return classify_fetched_products(products)
+
+from cachetools import TTLCache
+
+# Define a cache with a TTL of 1 hour and maxsize of 1000
+ebay_cache = TTLCache(maxsize=1000, ttl=3600)
+_ebay_cache_lock = threading.Lock()
+_ebay_in_flight: Dict[tuple, Future] = {}
 
-    products = []
+def fetch_ebay_products_cached(search_query: str, limit: int = 50, max_pages: int = 10) -> List[dict]:
+    """
+    Returns fetch_ebay_products' result for the query from a shared TTL cache.
+    Populate workers that miss on the same query at once wait for a single fetch instead of each
+    running their own. Callers get copies of the cached products, so changing them leaves the cache intact.
+    """
+    key = (search_query, limit, max_pages)
+    with _ebay_cache_lock:
+        products = ebay_cache.get(key)
+        if products is not None:
+            return [dict(product) for product in products]
+        flight = _ebay_in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _ebay_in_flight[key] = Future()
+
+    if not leader:
+        return [dict(product) for product in flight.result()]
     try:
-        logger.info(f"Making request to eBay API with search query: '{search_query}'")
-        response = requests.get(ebay_api_url, headers=headers_api, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        # Check API response acknowledgment
-        search_response = data.get('findItemsByKeywordsResponse', [{}])[0]
-        ack = search_response.get('ack', [None])[0]
-        if ack != 'Success':
-            error_message = search_response.get('errorMessage', [{}])[0].get('error', [{}])[0].get('message', ['Unknown error'])[0]
-            logger.error(f"eBay API Error: {error_message}")
-            return products
-
-        # Extract items
-        items = search_response.get('searchResult', [{}])[0].get('item', [])
-        logger.info(f"Fetched {len(items)} items from eBay for query '{search_query}'.")
-
-        for item in items:
-            ebay_item_id = item.get("itemId", [None])[0]
-            product_name = item.get("title", [None])[0]
-            category_name = item.get("primaryCategory", [{}])[0].get("categoryName", [None])[0]
-            price = float(item.get("sellingStatus", [{}])[0].get("currentPrice", [{}])[0].get("__value__", 0.0))
-            currency = item.get("sellingStatus", [{}])[0].get("currentPrice", [{}])[0].get("__currency__", "USD")
-            product_url = item.get("viewItemURL", [None])[0]
-            image_url = item.get("galleryURL", [None])[0]
-            
+        products = fetch_ebay_products(search_query, limit, max_pages)
+        with _ebay_cache_lock:
+            ebay_cache[key] = products
+        flight.set_result(products)
+    except Exception as e:
+        flight.set_exception(e)
+        raise
+    finally:
+        with _ebay_cache_lock:
+            _ebay_in_flight.pop(key, None)
+    return [dict(product) for product in products]
 
-            # Skip items with missing essential data
-            if not all([ebay_item_id, product_name, product_url]):
-                logger.warning(f"Skipping item due to missing data: {item}")
-                continue
-
-            # Map category to clothing type
-            clothing_type = categorize_clothing_item_gpt_cached(category_name)
-            gender = determine_product_gender_gpt_cached(product_name)
-
-            product = {
-                'ebay_item_id': ebay_item_id,
-                'product_name': product_name,
-                'suggested_item_type': clothing_type,
-                'price': price,
-                'currency': currency,
-                'product_url': product_url,
-                'image_url': image_url,
-                'date_suggested': datetime.utcnow(),
-                'user_id': None,  # Set to appropriate user_id if necessary
-                'gender': gender
-            }
-
-            products.append(product)
-
-            if len(products) >= limit:
-                break
-
-        # Handle pagination if more items are needed
-        pagination_output = search_response.get('paginationOutput', [{}])[0]
-        total_entries = int(pagination_output.get('totalEntries', [0])[0])
-        total_pages = int(pagination_output.get('totalPages', [1])[0])
-        logger.info(f"Total entries: {total_entries}, Total pages: {total_pages}")
-
-        current_page = 1
-        while len(products) < limit and current_page < total_pages and current_page < max_pages:
-            current_page += 1
-            params["paginationInput.pageNumber"] = current_page
-            logger.info(f"Fetching page {current_page} for query '{search_query}'")
-            response = requests.get(ebay_api_url, headers=headers_api, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            search_response = data.get('findItemsByKeywordsResponse', [{}])[0]
-            ack = search_response.get('ack', [None])[0]
-            if ack != 'Success':
-                error_message = search_response.get('errorMessage', [{}])[0].get('error', [{}])[0].get('message', ['Unknown error'])[0]
-                logger.error(f"eBay API Error on page {current_page}: {error_message}")
-                break
-
-            items = search_response.get('searchResult', [{}])[0].get('item', [])
-            logger.info(f"Fetched {len(items)} items from eBay on page {current_page} for query '{search_query}'.")
-
-            if not items:
-                logger.info(f"No more items found on page {current_page}. Stopping pagination.")
-                break  # Exit if no items are found on the current page
-
-            for item in items:
-                ebay_item_id = item.get("itemId", [None])[0]
-                product_name = item.get("title", [None])[0]
-                category_name = item.get("primaryCategory", [{}])[0].get("categoryName", [None])[0]
-                price = float(item.get("sellingStatus", [{}])[0].get("currentPrice", [{}])[0].get("__value__", 0.0))
-                currency = item.get("sellingStatus", [{}])[0].get("currentPrice", [{}])[0].get("__currency__", "USD")
-                product_url = item.get("viewItemURL", [None])[0]
-                image_url = item.get("galleryURL", [None])[0]
-
-                # Skip items with missing essential data
-                if not all([ebay_item_id, product_name, product_url]):
-                    logger.warning(f"Skipping item due to missing data: {item}")
-                    continue
-
-                gender = determine_product_gender_gpt(product_name)
-
-                product = {
-                    'ebay_item_id': ebay_item_id,
-                    'product_name': product_name,
-                    'suggested_item_type': clothing_type,
-                    'price': price,
-                    'currency': currency,
-                    'product_url': product_url,
-                    'image_url': image_url,
-                    'date_suggested': datetime.utcnow(),
-                    'user_id': None, # Set to appropriate user_id if necessary
-                    'gender': gender
-                }
+class SeenItemIds:
+    """
+    Thread-safe set of eBay item IDs stored during one populate run, so products returned for several
+    trends are only inserted once. IDs are recorded only after their insert has committed, so a trend whose
+    insert fails does not hide its products from the other trends. Trends running at the same time may both
+    try a shared product; the insert skips it by its unique key.
+    """
 
-                products.append(product)
+    def __init__(self):
+        self._ids = set()
+        self._lock = threading.Lock()
 
-                if len(products) >= limit:
-                    break
+    def unseen(self, products: List[dict]) -> List[dict]:
+        """
+        Returns the products whose ebay_item_id has not been stored yet in this run.
+        """
+        with self._lock:
+            return [product for product in products if product['ebay_item_id'] not in self._ids]
 
-        logger.info(f"Total products fetched: {len(products)}")
-        return products
+    def record(self, products: List[dict]):
+        """
+        Marks the products as stored; call once their insert has committed.
+        """
+        with self._lock:
+            self._ids.update(product['ebay_item_id'] for product in products)
 
-    except requests.exceptions.HTTPError as http_err:
-        logger.error(f"HTTP error occurred: {http_err}")
-        logger.debug(traceback.format_exc())
-    except Exception as e:
-        logger.error(f"Error fetching products from eBay: {e}")
-        logger.debug(traceback.format_exc())
-    return products
 
-from cachetools import cached, TTLCache
-
-# Define a cache with a TTL of 1 hour and maxsize of 1000
-ebay_cache = TTLCache(maxsize=1000, ttl=3600)
-
-@cached(cache=ebay_cache)
-def fetch_ebay_products_cached(search_query: str, limit: int = 50, max_pages: int = 10) -> List[dict]:
-    return fetch_ebay_products(search_query, limit, max_pages)
-
-def fetch_and_insert_trend_products(db: Session, trend: FashionTrend, limit_per_trend: int = 10):
+def fetch_and_insert_trend_products(db: Session, trend: FashionTrend, limit_per_trend: int = 10,
+                                    seen_ids: Optional[SeenItemIds] = None) -> Dict[str, int]:
     """
     Fetches products for a given trend's search phrase and inserts them into the database.
     Ensures no duplicates based on ebay_item_id.
@@ -767,75 +913,113 @@ def fetch_and_insert_trend_products(db: Session, trend: FashionTrend, limit_per_
         db (Session): SQLAlchemy session object.
         trend (FashionTrend): The fashion trend object.
         limit_per_trend (int): Maximum number of products to fetch per trend.
+        seen_ids (Optional[SeenItemIds]): IDs already handled for other trends in this run.
+
+    Returns:
+        Dict[str, int]: Counts of 'fetched', 'inserted' and 'skipped' products.
     """
     search_phrase = trend.trend_search_phrase
     if not search_phrase:
         logger.warning(f"Trend ID {trend.trend_id} does not have a search phrase. Skipping.")
-        return
+        return {'fetched': 0, 'inserted': 0, 'skipped': 0}
 
     logger.info(f"Fetching products for trend '{trend.trend_name}' with search phrase '{search_phrase}'.")
 
     # Fetch products from eBay with a maximum of 10 pages
     products = fetch_ebay_products_cached(search_phrase, limit=limit_per_trend, max_pages=10)
+    fetched = len(products)
 
-    logger.info(f"Fetched {len(products)} products for trend '{trend.trend_name}'.")
+    logger.info(f"Fetched {fetched} products for trend '{trend.trend_name}'.")
 
-    # Prepare products for bulk insert
-    new_products = []
-    for product in products:
-        existing_product = db.query(EcommerceProduct).filter(
-            EcommerceProduct.ebay_item_id == product['ebay_item_id']
-        ).first()
-        if existing_product:
-            logger.info(f"Product '{product['product_name']}' (eBay ID: {product['ebay_item_id']}) already exists. Skipping.")
-            continue
+    if seen_ids is not None:
+        products = seen_ids.unseen(products)
 
-        new_product = EcommerceProduct(
-            ebay_item_id=product['ebay_item_id'],
-            product_name=product['product_name'],
-            suggested_item_type=product['suggested_item_type'],
-            price=product['price'],
-            currency=product['currency'],
-            product_url=product['product_url'],
-            image_url=product['image_url'],
-            date_suggested=product['date_suggested'],
-            user_id=product['user_id'],
-            gender=product['gender']
-        )
-        new_products.append(new_product)
+    try:
+        counts = ingest_products(db, products)
+        if seen_ids is not None:
+            seen_ids.record(products)
+        counts['skipped'] += fetched - len(products)
+        logger.info(f"Inserted {counts['inserted']} new products for trend '{trend.trend_name}', skipped {counts['skipped']}.")
+        return {'fetched': fetched, **counts}
+    except Exception as e:
+        logger.error(f"Error bulk inserting products for trend '{trend.trend_name}': {e}")
+        logger.debug(traceback.format_exc())
+        return {'fetched': fetched, 'inserted': 0, 'skipped': fetched}
 
-    if new_products:
-        try:
-            db.bulk_save_objects(new_products)
-            db.commit()
-            logger.info(f"Inserted {len(new_products)} new products for trend '{trend.trend_name}'.")
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error bulk inserting products for trend '{trend.trend_name}': {e}")
-            logger.debug(traceback.format_exc())
-    else:
-        logger.info(f"No new products to insert for trend '{trend.trend_name}'.")
 
+def _populate_trend(session_factory, trend_id: int, limit_per_trend: int, seen_ids: SeenItemIds) -> Dict[str, int]:
+    """
+    Runs one trend in its own short-lived session so worker threads never share a session
+    and the identity map does not grow over the whole run.
+    """
+    session = session_factory()
+    try:
+        trend = session.get(FashionTrend, trend_id)
+        return fetch_and_insert_trend_products(session, trend, limit_per_trend, seen_ids)
+    finally:
+        session.close()
 
 
-def populate_ecommerce_products(db: Session, limit_per_trend: int = 10):
+def populate_ecommerce_products(db: Session, limit_per_trend: int = 10, workers: int = 1) -> List[dict]:
     """
     Populates the ecommerce_products table based on the current fashion trends.
+    With more than one worker, trends are processed concurrently, each in its own session.
     
     Args:
         db (Session): SQLAlchemy session object.
         limit_per_trend (int): Maximum number of products to fetch per trend.
+        workers (int): Number of trends to process concurrently.
+
+    Returns:
+        List[dict]: Per-trend summary with status, counts and elapsed seconds.
     """
-    trends = db.query(FashionTrend).filter(FashionTrend.trend_search_phrase.isnot(None)).all()
+    trends = db.query(FashionTrend.trend_id, FashionTrend.trend_name).filter(FashionTrend.trend_search_phrase.isnot(None)).all()
     logger.info(f"Found {len(trends)} trends with search phrases.")
 
-    for trend in trends:
+    seen_ids = SeenItemIds()
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    summary = {}
+
+    def run(trend_id: int, trend_name: str):
+        start = time.perf_counter()
         try:
-            fetch_and_insert_trend_products(db, trend, limit_per_trend)
+            if workers > 1:
+                counts = _populate_trend(session_factory, trend_id, limit_per_trend, seen_ids)
+            else:
+                counts = fetch_and_insert_trend_products(db, db.get(FashionTrend, trend_id), limit_per_trend, seen_ids)
+            result = {'status': 'ok', **counts}
         except Exception as e:
-            logger.error(f"Failed to fetch and insert products for trend '{trend.trend_name}': {e}")
+            logger.error(f"Failed to fetch and insert products for trend '{trend_name}': {e}")
             logger.debug(traceback.format_exc())
-            continue  # Proceed with the next trend
+            result = {'status': 'failed', 'error': str(e)}
+        result.update({'trend_id': trend_id, 'trend_name': trend_name, 'seconds': round(time.perf_counter() - start, 2)})
+        summary[trend_id] = result
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run, trend_id, trend_name) for trend_id, trend_name in trends]
+            for future in as_completed(futures):
+                future.result()
+    else:
+        for trend_id, trend_name in trends:
+            run(trend_id, trend_name)  # Proceeds with the next trend on failure
+
+    results = [summary[trend_id] for trend_id, _ in trends]
+    for result in results:
+        logger.info(
+            f"Trend '{result['trend_name']}': {result['status']}, fetched {result.get('fetched', 0)}, "
+            f"inserted {result.get('inserted', 0)}, skipped {result.get('skipped', 0)} in {result['seconds']}s"
+        )
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    logger.info(
+        f"Populated {len(results)} trends with {workers} worker(s): "
+        f"{sum(result.get('inserted', 0) for result in results)} products inserted, {failed} trends failed."
+    )
+
+    logger.info(f"Classification cache stats: {classification_cache.get_stats()}")
+    logger.info(f"Local classifier stats: {product_classifier.get_stats()}")
+    logger.info(f"HTTP client stats: {http_client.get_stats()}")
+    return results
         
 from cachetools import cached, TTLCache
 
@@ -864,7 +1048,7 @@ def fetch_and_update_fashion_trends(db: Session):
     ]
 
     logger.info("Starting to fetch articles...")
-    articles = [extract_text_from_url(url) for url in urls]
+    articles = fetch_articles(urls)
     articles = [article for article in articles if article]  # Filter out empty strings
 
     if not articles:
@@ -873,8 +1057,12 @@ def fetch_and_update_fashion_trends(db: Session):
 
     logger.info(f"Fetched {len(articles)} articles.")
 
+    import numpy as np
+
     logger.info("Generating embeddings for articles...")
-    embeddings = [get_embedding(article) for article in articles]
+    embeddings = get_embeddings_batch(articles)
+    # Keep articles aligned with their embeddings so cluster labels index the right text
+    articles = [article for article, e in zip(articles, embeddings) if e is not None]
     embeddings = np.array([e for e in embeddings if e is not None])
 
     if len(embeddings) == 0:
@@ -887,6 +1075,8 @@ def fetch_and_update_fashion_trends(db: Session):
     optimal_k = determine_optimal_clusters(embeddings, ELBOW_METHOD_MAX_K)
 
     logger.info("Clustering embeddings...")
+    from sklearn.cluster import KMeans
+
     kmeans = KMeans(n_clusters=optimal_k, random_state=42)
     labels = kmeans.fit_predict(embeddings)
 
@@ -950,10 +1140,10 @@ def main():
     profiler = cProfile.Profile()
     profiler.enable()
     
-    # Initialize database session (assuming SQLAlchemy sessionmaker is set up)
-    engine = create_engine(DATABASE_URL, pool_size=20, max_overflow=10, pool_timeout=30, pool_recycle=1800)
-    SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    SessionScoped = scoped_session(SessionFactory)
+    # Initialize database session from the shared engine; pool settings come from DB_POOL_* (see db.py)
+    from db import get_session_factory
+
+    SessionScoped = scoped_session(get_session_factory())
     db = SessionScoped()
 
     try:
@@ -963,7 +1153,7 @@ def main():
         # Populate ecommerce products based on the updated trends
         populate_ecommerce_products(db, limit_per_trend=10)
     finally:
-        db.remove()  # Use remove() with scoped_session to properly handle sessions
+        SessionScoped.remove()  # Use remove() with scoped_session to properly handle sessions
     
     profiler.disable()
     stats = pstats.Stats(profiler).sort_stats('cumtime')
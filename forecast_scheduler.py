@@ -0,0 +1,211 @@
+# forecast_scheduler.py
+
+import argparse
+import logging
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session, sessionmaker
+
+from db import AdvisoryLock, get_engine, get_session_factory
+from models import Location, User
+from weather_service import fetch_forecast_from_api, forecast_cache, save_forecast
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+FORECAST_PREFETCH_ENABLED = os.getenv("FORECAST_PREFETCH_ENABLED", "false").lower() in ("1", "true", "yes")
+FORECAST_REFRESH_INTERVAL = int(os.getenv("FORECAST_REFRESH_INTERVAL", "21600"))  # Seconds between full refreshes
+FORECAST_PREFETCH_CONCURRENCY = int(os.getenv("FORECAST_PREFETCH_CONCURRENCY", "4"))
+FORECAST_PREFETCH_STAGGER = float(os.getenv("FORECAST_PREFETCH_STAGGER", "1.0"))  # Seconds between request starts
+# Seconds between checks of the scheduler lock; a standby takes over this long after the holder stops
+FORECAST_LOCK_CHECK_INTERVAL = int(os.getenv("FORECAST_LOCK_CHECK_INTERVAL", "60"))
+
+# Constants
+SCHEDULER_LOCK_NAME = "lazydrobe_forecast_scheduler"
+
+
+def get_active_locations(db: Session) -> List[Location]:
+    """
+    Returns every canonical location referenced by at least one user.
+    """
+    return db.query(Location).join(User, User.location_id == Location.location_id).distinct().all()
+
+
+def refresh_location(session_factory: sessionmaker, api_key: str, location_name: str) -> bool:
+    """
+    Fetches a location's forecast from the API, stores it and refreshes the in-process cache.
+
+    Returns:
+        bool: True if the forecast was refreshed.
+    """
+    db = session_factory()
+    try:
+        weather_data = fetch_forecast_from_api(api_key, location_name)
+        save_forecast(db, weather_data)
+        forecast_cache.put(location_name, weather_data)
+        logger.info(f"Refreshed forecast for '{location_name}'.")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to refresh forecast for '{location_name}': {e}")
+        logger.debug(traceback.format_exc())
+        return False
+    finally:
+        db.close()
+
+
+def refresh_all_locations(session_factory: sessionmaker, api_key: str,
+                          concurrency: int = FORECAST_PREFETCH_CONCURRENCY,
+                          stagger: float = FORECAST_PREFETCH_STAGGER,
+                          stop_event: Optional[threading.Event] = None) -> Dict[str, float]:
+    """
+    Refreshes the forecast of every active location.
+    At most `concurrency` requests run at once and request starts are spaced `stagger` seconds apart
+    to stay within the Visual Crossing quota.
+
+    Args:
+        session_factory (sessionmaker): Creates the short-lived session for each location.
+        api_key (str): Visual Crossing API key.
+        concurrency (int): Maximum number of concurrent API requests.
+        stagger (float): Seconds between request starts.
+        stop_event (Optional[threading.Event]): Stops submitting new refreshes when set.
+
+    Returns:
+        Dict[str, float]: Counts of 'refreshed' and 'failed' locations and elapsed 'seconds'.
+    """
+    start = time.perf_counter()
+    db = session_factory()
+    try:
+        location_names = [location.display_name for location in get_active_locations(db)]
+    finally:
+        db.close()
+    logger.info(f"Refreshing forecasts for {len(location_names)} locations.")
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for index, location_name in enumerate(location_names):
+            if stop_event is not None and stop_event.is_set():
+                break
+            if index and stagger > 0:
+                # Waiting on the event lets a shutdown interrupt the stagger
+                if stop_event is not None:
+                    stop_event.wait(stagger)
+                else:
+                    time.sleep(stagger)
+            futures.append(executor.submit(refresh_location, session_factory, api_key, location_name))
+
+    refreshed = sum(1 for future in futures if future.result())
+    summary = {
+        'refreshed': refreshed,
+        'failed': len(futures) - refreshed,
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+    logger.info(f"Forecast refresh finished: {summary}")
+    return summary
+
+
+class ForecastScheduler:
+    """
+    Refreshes forecasts for all active locations on a background thread every `interval` seconds,
+    so request handlers are served from the database instead of waiting on the weather API.
+
+    Every API worker may start one; with a `lock`, only the process holding it refreshes and the others
+    stand by, re-checking every FORECAST_LOCK_CHECK_INTERVAL seconds so one takes over if the holder stops.
+    """
+
+    def __init__(self, session_factory: sessionmaker, api_key: str, interval: int = FORECAST_REFRESH_INTERVAL,
+                 concurrency: int = FORECAST_PREFETCH_CONCURRENCY, stagger: float = FORECAST_PREFETCH_STAGGER,
+                 lock: Optional[AdvisoryLock] = None, lock_check_interval: int = FORECAST_LOCK_CHECK_INTERVAL):
+        self.session_factory = session_factory
+        self.api_key = api_key
+        self.interval = interval
+        self.concurrency = concurrency
+        self.stagger = stagger
+        self.lock = lock
+        self.lock_check_interval = lock_check_interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        next_refresh = 0.0
+        while not self._stop_event.is_set():
+            if self.lock is not None and not self.lock.acquire():
+                # Standby: refresh as soon as the lock is ours
+                next_refresh = 0.0
+                self._stop_event.wait(self.lock_check_interval)
+                continue
+            if time.monotonic() >= next_refresh:
+                try:
+                    refresh_all_locations(self.session_factory, self.api_key, self.concurrency, self.stagger,
+                                          self._stop_event)
+                except Exception as e:
+                    logger.error(f"Forecast refresh failed: {e}")
+                    logger.debug(traceback.format_exc())
+                next_refresh = time.monotonic() + self.interval
+            wait = max(0.0, next_refresh - time.monotonic())
+            self._stop_event.wait(wait if self.lock is None else min(wait, self.lock_check_interval))
+        if self.lock is not None:
+            self.lock.release()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="forecast-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Forecast scheduler started (interval {self.interval}s, concurrency {self.concurrency}).")
+
+    def stop(self, timeout: Optional[float] = 10):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("Forecast scheduler stopped.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefetch weather forecasts for every active user location.")
+    parser.add_argument("--once", action="store_true", help="Refresh all locations once and exit.")
+    parser.add_argument("--interval", type=int, default=FORECAST_REFRESH_INTERVAL, help="Seconds between full refreshes.")
+    parser.add_argument("--concurrency", type=int, default=FORECAST_PREFETCH_CONCURRENCY, help="Maximum concurrent API requests.")
+    parser.add_argument("--stagger", type=float, default=FORECAST_PREFETCH_STAGGER, help="Seconds between request starts.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    database_url = os.getenv("DATABASE_URL")
+    api_key = os.getenv("VISUAL_CROSSING_API_KEY")
+    if not database_url or not api_key:
+        logger.error("DATABASE_URL and VISUAL_CROSSING_API_KEY must be set in the environment variables.")
+        raise SystemExit(1)
+
+    session_factory = get_session_factory()
+    # Shares the lock with schedulers running inside the API, so the two never refresh at the same time
+    lock = AdvisoryLock(get_engine(), SCHEDULER_LOCK_NAME)
+
+    if args.once:
+        if not lock.acquire():
+            logger.info("Another forecast scheduler holds the lock; skipping this run.")
+            return
+        try:
+            refresh_all_locations(session_factory, api_key, args.concurrency, args.stagger)
+        finally:
+            lock.release()
+        return
+
+    scheduler = ForecastScheduler(session_factory, api_key, args.interval, args.concurrency, args.stagger, lock=lock)
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
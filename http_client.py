@@ -0,0 +1,165 @@
+# http_client.py
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+
+# Constants
+POOL_CONNECTIONS = 20  # Number of hosts to keep connection pools for
+POOL_MAXSIZE = 20  # Keep-alive connections per host
+BACKOFF_BASE = 0.5  # Seconds; doubled on every retry
+BACKOFF_MAX = 8.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Only these are retried by default; repeating a POST could e.g. create a second record
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Returns the delay before retry number `attempt` (0-based). Shared with the async article crawler.
+
+    Args:
+        attempt (int): The attempt that just failed.
+        retry_after (Optional[str]): The response's Retry-After header, honoured when it is in seconds.
+    """
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), BACKOFF_MAX)
+    # Full jitter keeps concurrent workers from retrying in lockstep
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _cap_timeout(timeout, remaining: float):
+    # Applies a deadline to a requests timeout, which is either one number or a (connect, read) pair
+    if isinstance(timeout, tuple):
+        return tuple(remaining if value is None else min(value, remaining) for value in timeout)
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def _expires_before(expires_at: Optional[float], delay: float) -> bool:
+    # True if a retry after `delay` seconds would start past the deadline
+    return expires_at is not None and time.monotonic() + delay >= expires_at
+
+
+class HttpClient:
+    """
+    Thin wrapper around a shared requests.Session.
+    Reuses keep-alive connections per host, applies default (connect, read) timeouts,
+    retries 429/5xx responses and connection errors with jittered exponential backoff
+    and records per-host latency and error counters.
+    """
+
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries: int = MAX_RETRIES):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        # Retries are handled below so they can be jittered and counted
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, host: str, latency: float, error: bool = False, retry: bool = False):
+        """
+        Adds one request to the per-host counters; also used by clients that do not go through the session.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(host, {
+                'requests': 0, 'errors': 0, 'retries': 0, 'total_latency': 0.0, 'max_latency': 0.0
+            })
+            stats['requests'] += 1
+            stats['errors'] += error
+            stats['retries'] += retry
+            stats['total_latency'] += latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+
+    def request(self, method: str, url: str, retries: Optional[int] = None, deadline: Optional[float] = None,
+                **kwargs) -> requests.Response:
+        """
+        Sends a request through the shared session.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            retries (Optional[int]): Retry attempts on 429/5xx or connection errors; defaults to HTTP_MAX_RETRIES
+                for idempotent methods and to 0 otherwise. Pass it explicitly to retry e.g. a POST known to be safe.
+            deadline (Optional[float]): Seconds the whole call may take, retries and backoff included. Each attempt's
+                connect and read timeouts are cut to the time left, and no retry starts once it has run out.
+            **kwargs: Passed on to requests (params, headers, timeout, ...).
+
+        Returns:
+            requests.Response: The last response. Callers still check the status code.
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails after all retries.
+            requests.exceptions.Timeout: If the deadline passes before a response arrives.
+        """
+        if retries is None:
+            retries = self.max_retries if method.upper() in IDEMPOTENT_METHODS else 0
+        timeout = kwargs.pop('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        expires_at = time.monotonic() + deadline if deadline is not None else None
+
+        for attempt in range(retries + 1):
+            if expires_at is not None:
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    raise requests.exceptions.Timeout(f"Deadline of {deadline}s exceeded for {host}.")
+                kwargs['timeout'] = _cap_timeout(timeout, remaining)
+            else:
+                kwargs['timeout'] = timeout
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                delay = backoff_delay(attempt)
+                should_retry = attempt < retries and not _expires_before(expires_at, delay)
+                self.record(host, time.perf_counter() - start, error=True, retry=should_retry)
+                if not should_retry:
+                    raise
+                logger.warning(f"Request to {host} failed ({e}). Retrying in {delay:.2f}s.")
+                time.sleep(delay)
+                continue
+
+            delay = backoff_delay(attempt, response.headers.get('Retry-After'))
+            should_retry = (response.status_code in RETRY_STATUS_CODES and attempt < retries
+                            and not _expires_before(expires_at, delay))
+            self.record(host, time.perf_counter() - start, error=response.status_code >= 400, retry=should_retry)
+            if not should_retry:
+                return response
+            logger.warning(f"Request to {host} returned {response.status_code}. Retrying in {delay:.2f}s.")
+            response.close()
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, dict]:
+        """
+        Returns per-host request, error and retry counts with average and max latency in seconds.
+        """
+        with self._lock:
+            result = {host: dict(stats) for host, stats in self._stats.items()}
+        for stats in result.values():
+            stats['avg_latency'] = stats['total_latency'] / stats['requests'] if stats['requests'] else 0.0
+        return result
+
+
+http_client = HttpClient()
@@ -0,0 +1,62 @@
+# locations.py
+
+import logging
+import re
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from bulk_ops import insert_ignore_duplicates, supports_upsert
+from constants import LOCATION_ALIASES
+from models import Location
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def normalize_location(location: str) -> str:
+    """
+    Normalizes a user-entered location into the canonical name forecasts are keyed by.
+    Lowercases, collapses whitespace and resolves known aliases ("NYC" -> "new york").
+
+    Args:
+        location (str): The raw location string.
+
+    Returns:
+        str: The canonical location name.
+    """
+    name = re.sub(r"\s+", " ", (location or "").strip().lower())
+    name = re.sub(r"\s*,\s*", ", ", name)
+    return LOCATION_ALIASES.get(name, name)
+
+
+def get_location(db: Session, location: str) -> Optional[Location]:
+    return db.query(Location).filter(Location.canonical_name == normalize_location(location)).first()
+
+
+def get_or_create_location(db: Session, location: str) -> Location:
+    """
+    Returns the Location row for a location string, creating it if needed.
+    Safe against concurrent creation: the insert ignores an existing canonical name.
+    The caller is responsible for committing.
+
+    Args:
+        db (Session): SQLAlchemy session object.
+        location (str): The raw location string.
+
+    Returns:
+        Location: The canonical location.
+    """
+    canonical_name = normalize_location(location)
+    existing = db.query(Location).filter(Location.canonical_name == canonical_name).first()
+    if existing:
+        return existing
+
+    row = {'canonical_name': canonical_name, 'display_name': location.strip()}
+    if supports_upsert(db):
+        insert_ignore_duplicates(db, Location.__table__, [row], ['canonical_name'])
+    else:
+        db.add(Location(**row))
+        db.flush()
+    logger.info(f"Registered location '{canonical_name}'.")
+    return db.query(Location).filter(Location.canonical_name == canonical_name).one()
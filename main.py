@@ -1,26 +1,54 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks, Request, Body
+from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks, Request, Body, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr, Field
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
 from typing import List, Optional
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
-import requests
 import logging
 from fastapi import BackgroundTasks 
-from pydantic import AnyHttpUrl 
 
 # Import models from models.py
 from models import Base, User, EcommerceProduct, WardrobeItem, Outfit, FashionTrend, WeatherData, OutfitSuggestion
 
-# Import fashion_trends function
-from fashion_trends import fetch_and_update_fashion_trends
+# Import request and response schemas from schemas.py
+from schemas import (
+    FashionTrendResponse,
+    LoginRequest,
+    LoginResponse,
+    OutfitCreate,
+    OutfitResponse,
+    OutfitSuggestionCreateResponse,
+    OutfitSuggestionRequest,
+    OutfitSuggestionResponse,
+    OutfitUpdate,
+    SuggestionJobResponse,
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+    WardrobeItemCreate,
+    WardrobeItemResponse,
+    WardrobeItemUpdate,
+    WeatherRequest,
+    WeatherResponse,
+)
 
-from outfit_suggester import suggest_outfits
+from weather_service import WeatherServiceError, get_forecast, save_forecast
+from locations import get_or_create_location
+from forecast_scheduler import FORECAST_PREFETCH_ENABLED, SCHEDULER_LOCK_NAME, ForecastScheduler
+from suggestion_jobs import SUCCEEDED, SuggestionJobLimitError, SuggestionJobManager
+from auth_tokens import authorize_user, create_access_token, get_token_user_id, require_path_user
+from exports import NDJSON_MEDIA_TYPE, stream_ndjson, suggestions_export_statement, wardrobe_export_statement
+import password_service
+from password_service import hash_password_async, verify_and_update_async
+from db import DB_POOL_STATS_ENABLED, AdvisoryLock, dispose_engine, get_db, get_engine, get_session_factory, pool_stats, session_scope
+from async_db import ASYNC_DB_ENABLED, dispose_async_engine
+from pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursorError, paginate
 
 # Load environment variables from .env file
 load_dotenv()
@@ -41,17 +69,40 @@ if not DATABASE_URL:
     logger.error("DATABASE_URL is not set in the environment variables.")
     raise ValueError("DATABASE_URL is not set in the environment variables.")
 
-# Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL, echo=False)  # Set echo to False for production
-
-# Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Shared engine and "Session" class; pool settings come from the DB_POOL_* variables (see db.py)
+engine = get_engine()
+SessionLocal = get_session_factory()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Purges expired suggestion jobs and fails the ones a stopped worker left unfinished
+    suggestion_jobs.start()
+    # Keep forecasts for every user location fresh in the background when enabled.
+    # Every worker starts a scheduler, but only the one holding the database lock refreshes.
+    scheduler = None
+    api_key = os.getenv("VISUAL_CROSSING_API_KEY")
+    if FORECAST_PREFETCH_ENABLED and api_key:
+        scheduler = ForecastScheduler(SessionLocal, api_key, lock=AdvisoryLock(engine, SCHEDULER_LOCK_NAME))
+        scheduler.start()
+    elif FORECAST_PREFETCH_ENABLED:
+        logger.warning("FORECAST_PREFETCH_ENABLED is set but VISUAL_CROSSING_API_KEY is missing; not prefetching forecasts.")
+    yield
+    if scheduler:
+        scheduler.stop()
+    suggestion_jobs.shutdown()
+    password_service.shutdown(wait=False)
+    await dispose_async_engine()
+    dispose_engine()
+
+# Outfit suggestions queued via /outfits/suggest/jobs run here instead of on request threads
+suggestion_jobs = SuggestionJobManager(SessionLocal)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="LazYdrobe API",
     description="API for LazYdrobe Wardrobe Management Application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -60,220 +111,106 @@ app.add_middleware(
     allow_origins=["*"],  
     allow_credentials=True, allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
-# Pydantic Schemas
-
-class UserBase(BaseModel):
-    username: str = Field(..., min_length=3, max_length=50)
-    email: EmailStr
-    location: str  # Now required
-    preferences: Optional[List[str]] = None
-    gender: Optional[str] = None
-    height: Optional[str] = None
-    weight: Optional[str] = None
-
-    class Config:
-        orm_mode = True
-
-
-class UserCreate(UserBase):
-    password: str = Field(..., min_length=6)
-
-
-class UserUpdate(BaseModel):
-    username: Optional[str] = Field(None, min_length=3, max_length=50)
-    email: Optional[EmailStr] = None
-    location: Optional[str] = None
-    preferences: Optional[List[str]] = None  # Expecting a list
-    gender: Optional[str] = None
-    password: Optional[str] = Field(None, min_length=6)
-    height: Optional[str] = None
-    weight: Optional[str] = None
-
-    class Config:
-        orm_mode = True
-
-
-class UserResponse(UserBase):
-    user_id: int
-    date_joined: datetime
-
-    class Config:
-        orm_mode = True
-
-
-# Login Schemas
-
-class LoginRequest(BaseModel):
-    email: EmailStr
-    password: str
-
-
-class LoginResponse(BaseModel):
-    user_id: int
-    username: str
-    email: EmailStr
-
-    class Config:
-        orm_mode = True
-
-
-# Weather Schemas
-
-class WeatherRequest(BaseModel):
-    user_id: int 
-
-class WeatherResponse(BaseModel):
-    date: datetime
-    location: str
-    temp_max: float
-    temp_min: float
-    feels_max: float
-    feels_min: float
-    wind_speed: float
-    humidity: float
-    precipitation: float
-    precipitation_probability: float
-    special_condition: str
-    weather_icon: str
-
-    class Config:
-        orm_mode = True
-
-class FashionTrendResponse(BaseModel):
-    trend_id: int
-    trend_name: str
-    trend_description: str
-    date_added: datetime
-
-    class Config:
-        orm_mode = True
-
-# Wardrobe Item Schemas
-
-class WardrobeItemBase(BaseModel):
-    clothing_type: Optional[str] = Field(..., min_length=3, max_length=50)
-    for_weather: Optional[str] = None
-    color: Optional[List[str]] = None
-    size: Optional[str] = Field(..., min_length=1, max_length=50)
-    tags: Optional[List[str]] = None
-    image_url: Optional[str] = None
+# Utility Functions
 
-    class Config:
-        orm_mode = True
+def save_rehashed_password(db: Session, user: User, new_hash: str):
+    """
+    Stores a password hash upgraded to the current work factor; a failure does not fail the login.
+    """
+    user.password = new_hash
+    try:
+        db.commit()
+        logger.info(f"Upgraded password hash for user ID {user.user_id}.")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to upgrade password hash for user ID {user.user_id}: {e}")
 
 
-class WardrobeItemCreate(WardrobeItemBase):
-    user_id: int
+def insert_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    """
+    Stores a new user whose password is already hashed.
+    """
+    # Create User instance
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        password=hashed_password,
+        location=user.location,  # Now required
+        location_id=get_or_create_location(db, user.location).location_id,
+        preferences=user.preferences,
+        gender=user.gender,
+        height=user.height,
+        weight=user.weight
+    )
 
+    db.add(db_user)
+    try:
+        db.commit()
+        db.refresh(db_user)
+        logger.info(f"User {user.email} created successfully.")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to create user: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
 
-class WardrobeItemUpdate(BaseModel):
-    clothing_type: Optional[str] = Field(None, min_length=3, max_length=50)
-    for_weather: Optional[str] = Field(None, min_length=3, max_length=50)
-    color: Optional[List[str]] = None
-    size: Optional[str] = Field(None, min_length=1, max_length=50)
-    tags: Optional[List[str]] = None
-    image_url: Optional[str] = None
+    return db_user
 
-    class Config:
-        orm_mode = True
-class WardrobeItemResponse(WardrobeItemBase):
-    item_id: int
-    clothing_type: str
-    for_weather: str
-    color: List[str]
-    size: str
-    tags: List[str]
-    image_url: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+def apply_user_update(db: Session, user: User, user_update: UserUpdate, hashed_password: Optional[str]) -> User:
+    """
+    Applies a user update, with the new password already hashed, and fetches the forecast for a new location.
+    """
+    user_id = user.user_id
 
-# Outfit
+    # Determine if location is being updated
+    location_updated = False
+    old_location = user.location
+    if user_update.location and user_update.location != user.location:
+        location_updated = True
+        logger.info(f"User ID {user_id} location updated from '{old_location}' to '{user_update.location}'.")
 
-class OutfitBase(BaseModel):
-    occasion: Optional[List[str]] = None
-    for_weather: Optional[str] = None
-    clothings: Optional[List[int]] = None
-    source_url: Optional[str] = None
+    if hashed_password:
+        user.password = hashed_password
 
-class OutfitCreate(OutfitBase):
-    user_id: int
+    # Update other fields if provided
+    update_data = user_update.dict(exclude_unset=True, exclude={"password"})
+    logger.debug(f"Updating fields: {update_data}")
+    for key, value in update_data.items():
+        setattr(user, key, value)
+    if location_updated:
+        user.location_id = get_or_create_location(db, user.location).location_id
 
-class OutfitResponse(OutfitBase):
-    outfit_id: int
-    clothings: List[int]
-    occasion: List[str]
-    for_weather: Optional[str]
-
-    class Config:
-        orm_mode = True
-
-class OutfitUpdate(BaseModel):
-    occasion: Optional[List[str]] = None
-    for_weather: Optional[str] = None
-
-
-# Outfit Suggestion - it is working now
-
-class OutfitComponent(BaseModel):
-    clothing_type: str
-    item_id: int
-    product_name: str
-    image_url: Optional[str] = None
-    eBay_link: Optional[List[str]] = None 
-    gender: str
-    
-    class Config:
-        orm_mode = True
-
-
-class OutfitSuggestionResponse(BaseModel):
-    suggestion_id: int
-    outfit_details: List[List[OutfitComponent]]
-    gender: str
-    date_suggested: datetime
-    image_url: Optional[AnyHttpUrl] = None
-
-    class Config:
-        orm_mode = True
-        
-class OutfitSuggestionRequest(BaseModel):
-    user_id: int
-
-class OutfitSuggestionCreateResponse(BaseModel):
-    suggestion_id: int
-    outfit_details: List[List[OutfitComponent]]
-    gender: str
-    date_suggested: datetime
-    image_url: Optional[AnyHttpUrl] = None
-
-    class Config:
-        orm_mode = True
-
-        
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
     try:
-        yield db
-    finally:
-        db.close()
-
-
-# Utility Functions
-
-def hash_password(password: str) -> str:
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    return pwd_context.hash(password)
+        db.commit()
+        db.refresh(user)
+        logger.info(f"User with ID {user_id} updated successfully.")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to update user: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
 
+    # If location was updated, fetch and insert new weather data
+    if location_updated:
+        try:
+            logger.info(f"Fetching and inserting weather data for new location '{user.location}'.")
+            api_key = get_api_key('VISUAL_CROSSING_API_KEY')
+            get_forecast(db, user.location, api_key,
+                         on_fetched=lambda weather_data: insert_weather_data_to_db(weather_data, db))
+            logger.info(f"Weather data for location '{user.location}' is available.")
+        except WeatherServiceError as we:
+            logger.error(f"Error during weather data fetch: {we.detail}")
+            raise HTTPException(status_code=500, detail="Failed to fetch and insert weather data after location update.")
+        except HTTPException as he:
+            logger.error(f"HTTPException during weather data fetch: {he.detail}")
+            raise HTTPException(status_code=500, detail="Failed to fetch and insert weather data after location update.")
+        except Exception as e:
+            logger.error(f"Unexpected error during weather data fetch: {e}")
+            raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching weather data after location update.")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    return pwd_context.verify(plain_password, hashed_password)
+    return user
 
 
 def get_api_key(key_name: str) -> str:
@@ -284,146 +221,52 @@ def get_api_key(key_name: str) -> str:
                             detail=f"{key_name} not found in environment variables.")
     return api_key
 
-def fetch_weather_data_from_db(location: str, user_id: Optional[int] = None) -> List[dict]:
-    today = datetime.utcnow().date()
-    db = SessionLocal()
-
-    weather_data = []
-    logger.info(f"Fetching data from database for location: {location}")
-
+def fetch_page(query, columns, limit: Optional[int], cursor: Optional[str], response: Response, descending: bool = False) -> list:
+    """
+    Returns one keyset page of a query and sets the next page's cursor header when there is one.
+    """
     try:
-        query = db.query(WeatherData).filter(
-            WeatherData.location == location,
-            WeatherData.date >= today
-        ).order_by(WeatherData.date) 
-
-        if user_id:
-            query = query.filter(WeatherData.user_id == user_id)
-
-        entries = query.limit(5).all()  # Fetch up to 5 latest days
-
-        for entry in entries:
-            weather_data.append({
-                'date': entry.date,
-                'location': entry.location,
-                'temp_max': entry.temp_max,
-                'temp_min': entry.temp_min,
-                'feels_max': entry.feels_max,
-                'feels_min': entry.feels_min,
-                'wind_speed': entry.wind_speed,
-                'humidity': entry.humidity,
-                'precipitation': entry.precipitation,
-                'precipitation_probability': entry.precipitation_probability,
-                'special_condition': entry.special_condition,
-                'weather_icon': entry.weather_icon,
-            })
-            logger.info(f"Obtained weather data for {entry.date}")
-    except Exception as e:
-        logger.error(f"Error fetching data from database: {e}")
-        return []
-    finally:
-        db.close()
-
-    logger.debug(f"Weather data retrieved: {weather_data}")
-    if len(weather_data) == 5:
-        return weather_data
-    return []
-
-
-def fetch_weather_data(api_key: str, location: str) -> List[dict]:
-    weather_entries = fetch_weather_data_from_db(location)
-
-    if weather_entries:
-        return weather_entries
-
-    location_encoded = requests.utils.quote(location)
-    url = f'https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/{location_encoded}/next5days?key={api_key}&unitGroup=us&iconSet=icons2'
-    response = requests.get(url)
-    logger.info("Getting weather data from API")
-
-    if response.status_code != 200:
-        error_message = response.text
-        logger.error(f"Failed to fetch weather data. Status Code: {response.status_code}, Message: {error_message}")
-        raise HTTPException(status_code=response.status_code, detail=error_message)
-
-    data = response.json()
-    if 'days' not in data or not data['days']:
-        logger.error("No weather data available.")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No weather data available.")
-
-    weather_entries = []
-    for day in data["days"]:
-        weather_entry = {
-            'date': datetime.strptime(day['datetime'], "%Y-%m-%d").date(),  # Ensure 'date' is a date object
-            'location': location,
-            'temp_max': day.get('tempmax', 0.0),
-            'temp_min': day.get('tempmin', 0.0),
-            'feels_max': day.get('feelslikemax', 0.0),
-            'feels_min': day.get('feelslikemin', 0.0),
-            'wind_speed': day.get('windspeed', 0.0),
-            'humidity': day.get('humidity', 0.0),
-            'precipitation': day.get('precip', 0.0),
-            'precipitation_probability': day.get('precipprob', 0.0),
-            'special_condition': day.get('conditions', 'Unknown'),
-            'weather_icon': day.get('icon', '')
-        }
-        weather_entries.append(weather_entry)
-
-    return weather_entries
-
-
-
-def insert_weather_data_to_db(data: List[dict], user_id: Optional[int] = None):
+        rows, next_cursor = paginate(query, columns, limit, cursor, descending)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
+
+def ndjson_export_response(db: Session, user_id: int, statement, filename: str) -> StreamingResponse:
+    """
+    Streams an export for an existing user as NDJSON; the rows are read on the export's own session.
+    """
+    if not db.query(User.user_id).filter(User.user_id == user_id).first():
+        raise HTTPException(status_code=404, detail="User not found.")
+    return StreamingResponse(
+        stream_ndjson(SessionLocal, statement),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def insert_weather_data_to_db(data: List[dict], db: Optional[Session] = None):
     """
-    Inserts or updates weather data into the database.
+    Inserts or updates weather data into the shared per-location forecast store in one upsert statement.
     
     Args:
         data (List[dict]): List of weather data dictionaries.
-        user_id (Optional[int]): ID of the user, if applicable.
+        db (Optional[Session]): The caller's session; a new one is opened when None.
     """
-    db = SessionLocal()
     if not data:
         logger.info("No data to insert into the database.")
-        db.close()
         return
 
+    if db is None:
+        with session_scope() as session:
+            return insert_weather_data_to_db(data, session)
+
     try:
-        for entry in data:
-            existing_record = db.query(WeatherData).filter_by(
-                date=entry['date'], location=entry['location'], user_id=user_id
-            ).first()
-
-            if existing_record:
-                # Update the existing record
-                for key, value in entry.items():
-                    setattr(existing_record, key, value)
-                logger.info(f"Updated existing weather record for {entry['date']} at {entry['location']}.")
-            else:
-                # Insert new record
-                weather_record = WeatherData(
-                    date=entry['date'],
-                    location=entry['location'],
-                    temp_max=entry['temp_max'],
-                    temp_min=entry['temp_min'],
-                    feels_max=entry['feels_max'],
-                    feels_min=entry['feels_min'],
-                    wind_speed=entry['wind_speed'],
-                    humidity=entry['humidity'],
-                    precipitation=entry['precipitation'],
-                    precipitation_probability=entry['precipitation_probability'],
-                    special_condition=entry['special_condition'],
-                    weather_icon=entry['weather_icon'],
-                    user_id=user_id
-                )
-                db.add(weather_record)
+        save_forecast(db, data)
         logger.info("Weather data successfully updated or inserted into the database.")
-        db.commit()
     except Exception as e:
-        db.rollback()
         logger.error(f"Error inserting data: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to insert weather data into the database.")
-    finally:
-        db.close()
 
 
 
@@ -433,11 +276,11 @@ def insert_weather_data_to_db(data: List[dict], user_id: Optional[int] = None):
 ## User Registration
 
 @app.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     logger.info(f"Creating user with email: {user.email}")
 
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
+    existing_user = await run_in_threadpool(lambda: db.query(User).filter(User.email == user.email).first())
     if existing_user:
         logger.warning(f"Email {user.email} already registered.")
         raise HTTPException(status_code=400, detail="Email already registered.")
@@ -446,61 +289,47 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         logger.warning("Location not provided during user creation.")
         raise HTTPException(status_code=400, detail="Location is required.")
 
-    # Hash the password
-    hashed_password = hash_password(user.password)
+    # Hash the password on the password worker pool, without holding a request thread
+    hashed_password = await hash_password_async(user.password)
 
-    # Create User instance
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        password=hashed_password,
-        location=user.location,  # Now required
-        preferences=user.preferences,
-        gender=user.gender,
-        height=user.height,
-        weight=user.weight
-    )
-
-    db.add(db_user)
-    try:
-        db.commit()
-        db.refresh(db_user)
-        logger.info(f"User {user.email} created successfully.")
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Failed to create user: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
-
-    return db_user
+    return await run_in_threadpool(insert_user, db, user, hashed_password)
 
 
 
 ## User Login
 
 @app.post("/login", response_model=LoginResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: Session = Depends(get_db)):
     logger.info(f"Attempting login for email: {request.email}")
 
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.email == request.email).first())
     if not user:
         logger.warning(f"Login failed for email: {request.email} - User not found.")
         raise HTTPException(status_code=400, detail="Invalid email or password.")
 
-    if not verify_password(request.password, user.password):
+    # bcrypt runs on the password worker pool, so a burst of logins does not hold request threads
+    valid, new_hash = await verify_and_update_async(request.password, user.password)
+    if not valid:
         logger.warning(f"Login failed for email: {request.email} - Incorrect password.")
         raise HTTPException(status_code=400, detail="Invalid email or password.")
+    if new_hash:
+        await run_in_threadpool(save_rehashed_password, db, user, new_hash)
 
     logger.info(f"User {request.email} logged in successfully.")
+    # Later requests send this token instead of logging in again
+    access_token, expires_at = create_access_token(user.user_id)
     return LoginResponse(
         user_id=user.user_id,
         username=user.username,
-        email=user.email
+        email=user.email,
+        access_token=access_token,
+        expires_at=datetime.utcfromtimestamp(expires_at)
     )
 
 
 ## Get User by ID
 
-@app.get("/users/{user_id}", response_model=UserResponse)
+@app.get("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(require_path_user)])
 def read_user(user_id: int, db: Session = Depends(get_db)):
     logger.info(f"Fetching user with ID: {user_id}")
 
@@ -515,64 +344,28 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
 
 ## Update User Information
 
-@app.put("/users/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, user_update: UserUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+@app.put("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(require_path_user)])
+async def update_user(user_id: int, user_update: UserUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     logger.info(f"Updating user with ID: {user_id}")
     logger.debug(f"Update data received: {user_update.dict()}")
 
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.user_id == user_id).first())
     if not user:
         logger.warning(f"User with ID {user_id} not found.")
         raise HTTPException(status_code=404, detail="User not found.")
 
-    # Determine if location is being updated
-    location_updated = False
-    old_location = user.location
-    if user_update.location and user_update.location != user.location:
-        location_updated = True
-        logger.info(f"User ID {user_id} location updated from '{old_location}' to '{user_update.location}'.")
-
-    # If password is being updated, hash it
+    # If password is being updated, hash it on the password worker pool, without holding a request thread
+    hashed_password = None
     if user_update.password:
         logger.debug("Updating password.")
-        user.password = hash_password(user_update.password)
+        hashed_password = await hash_password_async(user_update.password)
 
-    # Update other fields if provided
-    update_data = user_update.dict(exclude_unset=True, exclude={"password"})
-    logger.debug(f"Updating fields: {update_data}")
-    for key, value in update_data.items():
-        setattr(user, key, value)
-
-    try:
-        db.commit()
-        db.refresh(user)
-        logger.info(f"User with ID {user_id} updated successfully.")
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Failed to update user: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
-
-    # If location was updated, fetch and insert new weather data
-    if location_updated:
-        try:
-            logger.info(f"Fetching and inserting weather data for new location '{user.location}'.")
-            api_key = get_api_key('VISUAL_CROSSING_API_KEY')
-            weather_data = fetch_weather_data(api_key, user.location)
-            insert_weather_data_to_db(weather_data, user_id=user_id)
-            logger.info(f"Weather data for location '{user.location}' inserted successfully.")
-        except HTTPException as he:
-            logger.error(f"HTTPException during weather data fetch: {he.detail}")
-            raise HTTPException(status_code=500, detail="Failed to fetch and insert weather data after location update.")
-        except Exception as e:
-            logger.error(f"Unexpected error during weather data fetch: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching weather data after location update.")
-
-    return user
+    return await run_in_threadpool(apply_user_update, db, user, user_update, hashed_password)
 
 
 ## Delete User
 
-@app.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+@app.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_path_user)])
 def delete_user(user_id: int, db: Session = Depends(get_db)):
     logger.info(f"Deleting user with ID: {user_id}")
 
@@ -596,8 +389,10 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
 ## Create Wardrobe Item
 
 @app.post("/wardrobe_item/", response_model=WardrobeItemResponse, status_code=status.HTTP_201_CREATED)
-def create_wardrobe_item(item: WardrobeItemCreate, db: Session = Depends(get_db)):
+def create_wardrobe_item(item: WardrobeItemCreate, db: Session = Depends(get_db),
+                         token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Adding wardrobe item for user ID: {item.user_id}")
+    authorize_user(item.user_id, token_user_id)
 
     # Create a new WardrobeItem instance
     db_item = WardrobeItem(
@@ -624,24 +419,38 @@ def create_wardrobe_item(item: WardrobeItemCreate, db: Session = Depends(get_db)
 
 ## Get Wardrobe Items for User
 
-@app.get("/wardrobe_item/user/{user_id}", response_model=List[WardrobeItemResponse])
-def get_all_wardrobe_items(user_id: int, db: Session = Depends(get_db)):
+@app.get("/wardrobe_item/user/{user_id}", response_model=List[WardrobeItemResponse], dependencies=[Depends(require_path_user)])
+def get_all_wardrobe_items(user_id: int, response: Response,
+                           limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                           cursor: Optional[str] = None, db: Session = Depends(get_db)):
     logger.info(f"Fetching wardrobe item for user ID: {user_id}")
-    items = db.query(WardrobeItem).filter(WardrobeItem.user_id == user_id).all()
-    if not items:
+    items = fetch_page(
+        db.query(WardrobeItem).filter(WardrobeItem.user_id == user_id),
+        [WardrobeItem.item_id], limit, cursor, response
+    )
+    if not items and cursor is None:
         raise HTTPException(status_code=404, detail="No wardrobe items found for this user.")
     return items
 
+## Export Wardrobe Items for User
+
+@app.get("/wardrobe_item/user/{user_id}/export", dependencies=[Depends(require_path_user)])
+def export_wardrobe_items(user_id: int, db: Session = Depends(get_db)):
+    logger.info(f"Exporting wardrobe items for user ID: {user_id}")
+    return ndjson_export_response(db, user_id, wardrobe_export_statement(user_id), f"wardrobe_{user_id}.ndjson")
+
 ## Get Wardrobe Item Information
 
 @app.get("/wardrobe_item/{item_id}", response_model=WardrobeItemResponse)
-def read_wardrobe_item(item_id: int, db: Session = Depends(get_db)):
+def read_wardrobe_item(item_id: int, db: Session = Depends(get_db),
+                       token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Fetching wardrobe item with ID: {item_id}")
 
     wardrobe_item = db.query(WardrobeItem).filter(WardrobeItem.item_id == item_id).first()
     if not wardrobe_item:
         logger.warning(f"Wardrobe item with ID {item_id} not found.")
         raise HTTPException(status_code=404, detail="Wardrobe item not found.")
+    authorize_user(wardrobe_item.user_id, token_user_id)
 
     logger.info(f"Wardrobe item with ID {item_id} retrieved successfully.")
     return wardrobe_item
@@ -650,7 +459,8 @@ def read_wardrobe_item(item_id: int, db: Session = Depends(get_db)):
 ## Update Wardrobe Item Information
 
 @app.put("/wardrobe_item/{item_id}", response_model=WardrobeItemResponse)
-def update_wardrobe_item(item_id: int, item_update: WardrobeItemUpdate, db: Session = Depends(get_db)):
+def update_wardrobe_item(item_id: int, item_update: WardrobeItemUpdate, db: Session = Depends(get_db),
+                         token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Updating wardrobe item with ID: {item_id}")
     logger.debug(f"Update data received: {item_update.dict()}")
 
@@ -658,6 +468,7 @@ def update_wardrobe_item(item_id: int, item_update: WardrobeItemUpdate, db: Sess
     if not wardrobe_item:
         logger.warning(f"Wardrobe item with ID {item_id} not found.")
         raise HTTPException(status_code=404, detail="Wardrobe item not found.")
+    authorize_user(wardrobe_item.user_id, token_user_id)
 
     # Update fields from the incoming request if they are provided
     update_data = item_update.dict(exclude_unset=True)
@@ -680,9 +491,14 @@ def update_wardrobe_item(item_id: int, item_update: WardrobeItemUpdate, db: Sess
 ## Delete Wardrobe Item
 
 @app.delete("/wardrobe_item/", status_code=status.HTTP_204_NO_CONTENT)
-def delete_wardrobe_item(item_ids: List[int] = Body(..., embed=True), db: Session = Depends(get_db)):
+def delete_wardrobe_item(item_ids: List[int] = Body(..., embed=True), db: Session = Depends(get_db),
+                         token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Deleting wardrobe item with IDs: {item_ids}")
 
+    # Every item must belong to the token's user before any of them is deleted
+    for owner_id, in db.query(WardrobeItem.user_id).filter(WardrobeItem.item_id.in_(item_ids)).distinct():
+        authorize_user(owner_id, token_user_id)
+
     not_found_items = []
     for item_id in item_ids:
         wardrobe_item = db.query(WardrobeItem).filter(WardrobeItem.item_id == item_id).first()
@@ -708,8 +524,10 @@ def delete_wardrobe_item(item_ids: List[int] = Body(..., embed=True), db: Sessio
 ## Weather Endpoint
 
 @app.post("/weather/", response_model=List[WeatherResponse], status_code=status.HTTP_200_OK)
-def get_weather_data(weather_request: WeatherRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def get_weather_data(weather_request: WeatherRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db),
+                     token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Received weather data request for user_id={weather_request.user_id}")
+    authorize_user(weather_request.user_id, token_user_id)
 
     user = db.query(User).filter(User.user_id == weather_request.user_id).first()
     if not user:
@@ -721,37 +539,21 @@ def get_weather_data(weather_request: WeatherRequest, background_tasks: Backgrou
         raise HTTPException(status_code=400, detail="User location not set.")
 
     location = user.location
+    api_key = get_api_key('VISUAL_CROSSING_API_KEY')
 
-    try:
-        weather_data = fetch_weather_data_from_db(location)
-        if not weather_data:
-            logger.info(f"No full weather data found in DB for location: {location}")
-            raise ValueError(f"No full weather data for {location} found in the database.")
-    except ValueError:
-        try:
-            api_key = get_api_key('VISUAL_CROSSING_API_KEY')
-            logger.info("Retrieved Visual Crossing API key successfully.")
-        except ValueError as e:
-            logger.error(f"API Key Error: {e}")
-            raise HTTPException(status_code=500, detail=str(e))
+    def schedule_insert(weather_data: List[dict]):
+        # Insert into DB as a background task; the request's session is closed by then, so it opens its own
+        background_tasks.add_task(insert_weather_data_to_db, weather_data, None)
+        logger.info("Scheduled weather data insertion as a background task.")
 
-        try:
-            weather_data = fetch_weather_data(api_key, location)
-            logger.info("Fetched weather data successfully from API.")
-        except HTTPException as he:
-            logger.error(f"HTTPException during weather data fetch: {he.detail}")
-            raise he
-        except Exception as e:
-            logger.error(f"Unexpected error during weather data fetch: {e}")
-            raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching weather data.")
-
-        try:
-            # Insert into DB as a background task with the provided user_id
-            background_tasks.add_task(insert_weather_data_to_db, weather_data, user_id=weather_request.user_id)
-            logger.info("Scheduled weather data insertion as a background task.")
-        except Exception as e:
-            logger.error(f"Error scheduling background task for weather data insertion: {e}")
-            raise HTTPException(status_code=500, detail="Failed to schedule weather data insertion.")
+    try:
+        weather_data = get_forecast(db, location, api_key, on_fetched=schedule_insert)
+    except WeatherServiceError as we:
+        logger.error(f"Error during weather data fetch: {we.detail}")
+        raise HTTPException(status_code=we.status_code, detail=we.detail)
+    except Exception as e:
+        logger.error(f"Unexpected error during weather data fetch: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching weather data.")
 
     # Return the data
     logger.info("Returning weather data to the client.")
@@ -761,21 +563,32 @@ def get_weather_data(weather_request: WeatherRequest, background_tasks: Backgrou
 ## Fashion Trends Endpoints
 
 @app.post("/fashion_trends/update", status_code=status.HTTP_202_ACCEPTED)
-def update_fashion_trends_endpoint(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def update_fashion_trends_endpoint(background_tasks: BackgroundTasks):
     """
     Endpoint to trigger the fetching and updating of fashion trends.
     """
-    background_tasks.add_task(fetch_and_update_fashion_trends, db)
+    # The trend pipeline pulls in scikit-learn and openai, so API workers only load it when it is used
+    from fashion_trends import fetch_and_update_fashion_trends
+
+    def update_fashion_trends():
+        # Runs after the response is sent, so it cannot use a request session
+        with session_scope() as session:
+            fetch_and_update_fashion_trends(session)
+
+    background_tasks.add_task(update_fashion_trends)
     logger.info("Fashion trends update initiated via API.")
     return {"message": "Fashion trends update initiated."}
 
 @app.get("/fashion_trends/", response_model=List[FashionTrendResponse], status_code=status.HTTP_200_OK)
-def get_fashion_trends(db: Session = Depends(get_db)):
+def get_fashion_trends(response: Response, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                       cursor: Optional[str] = None, db: Session = Depends(get_db)):
     """
-    Retrieve the latest fashion trends from the database.
+    Retrieve the latest fashion trends from the database, newest first, one page at a time.
     """
-    trends = db.query(FashionTrend).order_by(FashionTrend.date_added.desc()).all()
-    return trends
+    return fetch_page(
+        db.query(FashionTrend), [FashionTrend.date_added, FashionTrend.trend_id], limit, cursor, response,
+        descending=True
+    )
 
 # Get latest 3 trends
 
@@ -796,10 +609,12 @@ def get_fashion_trends(db: Session = Depends(get_db)):
 
 ## Create Custom Outfit
 @app.post("/outfit/", response_model=OutfitResponse, status_code=status.HTTP_201_CREATED)
-def create_outfit(outfit: OutfitCreate, db: Session = Depends(get_db)):
+def create_outfit(outfit: OutfitCreate, db: Session = Depends(get_db),
+                  token_user_id: Optional[int] = Depends(get_token_user_id)):
     """
     Create a customized outfit and save it to the database
     """
+    authorize_user(outfit.user_id, token_user_id)
     db_outfit = Outfit(
         user_id=outfit.user_id,
         occasion=outfit.occasion,
@@ -820,22 +635,26 @@ def create_outfit(outfit: OutfitCreate, db: Session = Depends(get_db)):
 
 ## Get Outfits for User
 
-@app.get("/outfit/user/{user_id}", response_model=List[OutfitResponse])
-def get_all_outfits(user_id: int, db: Session = Depends(get_db)):
+@app.get("/outfit/user/{user_id}", response_model=List[OutfitResponse], dependencies=[Depends(require_path_user)])
+def get_all_outfits(user_id: int, response: Response, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                    cursor: Optional[str] = None, db: Session = Depends(get_db)):
     logger.info(f"Fetching outfits for user ID: {user_id}")
-    outfits = db.query(Outfit).filter(Outfit.user_id == user_id).all()
+    outfits = fetch_page(
+        db.query(Outfit).filter(Outfit.user_id == user_id), [Outfit.outfit_id], limit, cursor, response
+    )
     return outfits
 
 ## Get Outfit Information
 
 @app.get("/outfit/{outfit_id}", response_model=OutfitResponse)
-def read_outfit(outfit_id: int, db: Session = Depends(get_db)):
+def read_outfit(outfit_id: int, db: Session = Depends(get_db), token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Fetching outfit with ID: {outfit_id}")
     outfit = db.query(Outfit).filter(Outfit.outfit_id == outfit_id).first()
 
     if not outfit:
         logger.warning(f"Outfit with ID {outfit_id} not found.")
         raise HTTPException(status_code=404, detail="Outfit not found.")
+    authorize_user(outfit.user_id, token_user_id)
 
     logger.info(f"Outfit with ID {outfit_id} retrieved successfully.")
     return outfit
@@ -843,13 +662,14 @@ def read_outfit(outfit_id: int, db: Session = Depends(get_db)):
 ## Delete Outfits
 
 @app.delete("/outfit/{outfit_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_outfit(outfit_id: int, db: Session = Depends(get_db)):
+def delete_outfit(outfit_id: int, db: Session = Depends(get_db), token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Deleting outfit with ID: {outfit_id}")
 
     outfit = db.query(Outfit).filter(Outfit.outfit_id == outfit_id).first()
     if not outfit:
         logger.warning(f"Outfit with ID {outfit_id} not found.")
         raise HTTPException(status_code=404, detail="Outfit not found.")
+    authorize_user(outfit.user_id, token_user_id)
 
     try:
         db.delete(outfit)
@@ -864,13 +684,15 @@ def delete_outfit(outfit_id: int, db: Session = Depends(get_db)):
 ## Update Outfit Information
 
 @app.put("/outfit/{outfit_id}", response_model=OutfitResponse)
-def update_outfit(outfit_id: int, outfit_update: OutfitUpdate, db: Session = Depends(get_db)):
+def update_outfit(outfit_id: int, outfit_update: OutfitUpdate, db: Session = Depends(get_db),
+                  token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Updating outfit with ID: {outfit_id}")
 
     outfit = db.query(Outfit).filter(Outfit.outfit_id == outfit_id).first()
     if not outfit:
         logger.warning(f"Outfit with ID {outfit_id} not found.")
         raise HTTPException(status_code=404, detail="Outfit not found.")
+    authorize_user(outfit.user_id, token_user_id)
 
     # Update fields from the incoming request if they are provided
     update_data = outfit_update.dict(exclude_unset=True)
@@ -893,13 +715,18 @@ def update_outfit(outfit_id: int, outfit_update: OutfitUpdate, db: Session = Dep
 # Outfit suggest
 
 @app.post("/outfits/suggest", response_model=OutfitSuggestionCreateResponse, status_code=status.HTTP_201_CREATED)
-def suggest_outfit_endpoint(request: OutfitSuggestionRequest, db: Session = Depends(get_db)):
+def suggest_outfit_endpoint(request: OutfitSuggestionRequest, db: Session = Depends(get_db),
+                            token_user_id: Optional[int] = Depends(get_token_user_id)):
     """
     Suggests outfits for the user based on current weather and fashion trends.
     Does not consider the user's existing wardrobe.
     """
     logger.info(f"Received outfit suggestion request for user_id={request.user_id}")
+    authorize_user(request.user_id, token_user_id)
     
+    # Loaded on first use to keep worker startup fast (see benchmarks/bench_startup.py)
+    from outfit_suggester import suggest_outfits
+
     try:
         outfit_suggestion = suggest_outfits(request.user_id, db)
         logger.info(f"Outfit suggestion ID {outfit_suggestion.suggestion_id} created for user_id={request.user_id}")
@@ -912,15 +739,69 @@ def suggest_outfit_endpoint(request: OutfitSuggestionRequest, db: Session = Depe
         raise HTTPException(status_code=500, detail="Failed to suggest outfits.")
 
 
+@app.post("/outfits/suggest/jobs", response_model=SuggestionJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_outfit_suggestion_job(request: OutfitSuggestionRequest, db: Session = Depends(get_db),
+                                 token_user_id: Optional[int] = Depends(get_token_user_id)):
+    """
+    Queues an outfit suggestion and returns immediately with a job ID.
+    Poll GET /outfits/suggest/jobs/{job_id} for the status and result.
+    """
+    logger.info(f"Received outfit suggestion job request for user_id={request.user_id}")
+    authorize_user(request.user_id, token_user_id)
+
+    user = db.query(User).filter(User.user_id == request.user_id).first()
+    if not user:
+        logger.error(f"User with ID {request.user_id} not found.")
+        raise HTTPException(status_code=404, detail="User not found.")
+
+    try:
+        job = suggestion_jobs.submit(db, request.user_id)
+    except SuggestionJobLimitError as le:
+        logger.warning(f"Outfit suggestion job for user_id={request.user_id} rejected: {le.detail}")
+        raise HTTPException(status_code=le.status_code, detail=le.detail)
+    return SuggestionJobResponse(job_id=job.job_id, user_id=job.user_id, status=job.status, created_at=job.created_at)
+
+
+@app.get("/outfits/suggest/jobs/{job_id}", response_model=SuggestionJobResponse)
+def get_outfit_suggestion_job(job_id: str, db: Session = Depends(get_db),
+                              token_user_id: Optional[int] = Depends(get_token_user_id)):
+    job = suggestion_jobs.get(db, job_id)
+    if not job:
+        logger.warning(f"Outfit suggestion job {job_id} not found.")
+        raise HTTPException(status_code=404, detail="Job not found.")
+    authorize_user(job.user_id, token_user_id)
+
+    result = None
+    if job.status == SUCCEEDED:
+        result = db.query(OutfitSuggestion).filter(OutfitSuggestion.suggestion_id == job.suggestion_id).first()
+
+    return SuggestionJobResponse(
+        job_id=job.job_id,
+        user_id=job.user_id,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        result=OutfitSuggestionCreateResponse.model_validate(result, from_attributes=True) if result else None
+    )
+
+
 from sqlalchemy.orm import joinedload
 
-@app.get("/outfits/suggestions/{user_id}", response_model=List[OutfitSuggestionResponse])
-def get_outfit_suggestions(user_id: int, db: Session = Depends(get_db)):
+@app.get("/outfits/suggestions/{user_id}", response_model=List[OutfitSuggestionResponse], dependencies=[Depends(require_path_user)])
+def get_outfit_suggestions(user_id: int, response: Response,
+                           limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                           cursor: Optional[str] = None, db: Session = Depends(get_db)):
     logger.info(f"Fetching outfit suggestions for user ID: {user_id}")
-    suggestions = db.query(OutfitSuggestion).filter(OutfitSuggestion.user_id == user_id).all()
+    # Newest first, served by the (user_id, date_suggested) index
+    suggestions = fetch_page(
+        db.query(OutfitSuggestion).filter(OutfitSuggestion.user_id == user_id),
+        [OutfitSuggestion.date_suggested, OutfitSuggestion.suggestion_id], limit, cursor, response,
+        descending=True
+    )
     logger.debug(f"Number of outfit suggestions found: {len(suggestions)}")
     
-    if not suggestions:
+    if not suggestions and cursor is None:
         logger.warning(f"No outfit suggestions found for user ID: {user_id}")
         raise HTTPException(status_code=404, detail="No outfit suggestions found for this user.")
     
@@ -929,7 +810,12 @@ def get_outfit_suggestions(user_id: int, db: Session = Depends(get_db)):
     
     return suggestions
 
-@app.delete("/outfits/suggestions/all", status_code=status.HTTP_204_NO_CONTENT)
+@app.get("/outfits/suggestions/{user_id}/export", dependencies=[Depends(require_path_user)])
+def export_outfit_suggestions(user_id: int, db: Session = Depends(get_db)):
+    logger.info(f"Exporting outfit suggestions for user ID: {user_id}")
+    return ndjson_export_response(db, user_id, suggestions_export_statement(user_id), f"outfit_suggestions_{user_id}.ndjson")
+
+@app.delete("/outfits/suggestions/all", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_path_user)])
 def delete_all_outfit_suggestions(user_id: int, db: Session = Depends(get_db)):
     logger.info(f"Deleting all outfit suggestions for user_id={user_id}")
     
@@ -948,9 +834,14 @@ def delete_all_outfit_suggestions(user_id: int, db: Session = Depends(get_db)):
 ## Delete Outfit Suggestion
 
 @app.delete("/outfits/suggestions/", status_code=status.HTTP_204_NO_CONTENT)
-def delete_wardrobe_item(suggestion_id: List[int] = Body(..., embed=True), db: Session = Depends(get_db)):
+def delete_wardrobe_item(suggestion_id: List[int] = Body(..., embed=True), db: Session = Depends(get_db),
+                         token_user_id: Optional[int] = Depends(get_token_user_id)):
     logger.info(f"Deleting outfit suggestions with IDs: {suggestion_id}")
 
+    # Every suggestion must belong to the token's user before any of them is deleted
+    for owner_id, in db.query(OutfitSuggestion.user_id).filter(OutfitSuggestion.suggestion_id.in_(suggestion_id)).distinct():
+        authorize_user(owner_id, token_user_id)
+
     not_found_items = []
     for id in suggestion_id:
         suggestion = db.query(OutfitSuggestion).filter(OutfitSuggestion.suggestion_id == id).first()
@@ -972,6 +863,15 @@ def delete_wardrobe_item(suggestion_id: List[int] = Body(..., embed=True), db: S
 
     return
 
+## Database Pool Metrics
+
+# Pool internals are not for clients, so the route only exists when explicitly enabled
+if DB_POOL_STATS_ENABLED:
+    @app.get("/db/pool-stats", include_in_schema=False)
+    async def get_pool_stats():
+        # Checkout wait times and saturation counters for request sessions and the connection pools
+        return pool_stats()
+
 ## Exception Handlers
 
 from fastapi.responses import JSONResponse
@@ -992,3 +892,10 @@ async def generic_exception_handler(request: Request, exc: Exception):
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "An unexpected error occurred."},
     )
+
+## Async Database Layer
+
+# Serve the user, wardrobe item, outfit and suggestion CRUD routes from AsyncSession when configured
+if ASYNC_DB_ENABLED:
+    from async_routes import use_async_routes
+    use_async_routes(app)
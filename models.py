@@ -11,6 +11,8 @@ from sqlalchemy import (
     JSON,
     Text,
     BigInteger,
+    UniqueConstraint,
+    Index,
     func,
 )
 from sqlalchemy.orm import relationship
@@ -18,6 +20,30 @@ from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+
+def _created_on_dialect(ddl, target, bind, **kw) -> bool:
+    # Indexes listing the database in info['skip_dialects'] are not created there; alembic/env.py
+    # leaves them out of autogenerate on that database too
+    return kw['dialect'].name not in target.info.get('skip_dialects', ())
+
+
+def fk_index(name: str, column: str) -> Index:
+    """
+    Index on a foreign key column. InnoDB already indexes every foreign key, so it is not created on MySQL,
+    matching migration c8e2a5f61d47.
+    """
+    return Index(name, column, info={'skip_dialects': ('mysql',)}).ddl_if(callable_=_created_on_dialect)
+
+class Location(Base):
+    __tablename__ = "locations"
+
+    location_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    canonical_name = Column(String(255), unique=True, nullable=False, index=True)
+    display_name = Column(String(255), nullable=False)
+
+    users = relationship("User", back_populates="location_ref")
+    weather_data = relationship("WeatherData", back_populates="location_ref", cascade="all, delete-orphan")
+
 class User(Base):
     __tablename__ = "users"
 
@@ -26,6 +52,7 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     password = Column(String(255), nullable=False)
     location = Column(String(255))
+    location_id = Column(Integer, ForeignKey("locations.location_id"), nullable=True, index=True)
     preferences = Column(JSON, nullable=True)
     gender = Column(String(50), nullable=True)
     height = Column(String(10), nullable=True)
@@ -35,14 +62,15 @@ class User(Base):
     wardrobe_items = relationship("WardrobeItem", back_populates="owner", cascade="all, delete-orphan")
     outfits = relationship("Outfit", back_populates="user", cascade="all, delete-orphan")
     ecommerce_products = relationship("EcommerceProduct", back_populates="user", cascade="all, delete-orphan")
-    weather_data = relationship("WeatherData", back_populates="user", cascade="all, delete-orphan")
+    location_ref = relationship("Location", back_populates="users")
     fashion_trends = relationship("FashionTrend", back_populates="user", cascade="all, delete-orphan")
     outfit_suggestions = relationship("OutfitSuggestion", back_populates="user", cascade="all, delete-orphan")
+    suggestion_jobs = relationship("SuggestionJob", back_populates="user", cascade="all, delete-orphan")
 
 class EcommerceProduct(Base):
     __tablename__ = "ecommerce_products"
 
-    product_id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
+    product_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True, autoincrement=True)  # SQLite only autoincrements INTEGER keys
     ebay_item_id = Column(String(50), unique=True, nullable=False)
     product_name = Column(String(255), nullable=False)
     suggested_item_type = Column(String(255), nullable=True)
@@ -53,9 +81,18 @@ class EcommerceProduct(Base):
     date_suggested = Column(DateTime, server_default=func.now())
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=True)
     gender = Column(String(10), nullable=False, default='Unisex')
+    category = Column(String(50), nullable=True)  # General outfit category, see taxonomy.map_product_to_category
+    # Where suggested_item_type and gender came from ('rules', 'model', 'gpt', 'human', 'fallback'); NULL if unknown
+    category_source = Column(String(10), nullable=True)
+    gender_source = Column(String(10), nullable=True)
 
     user = relationship("User", back_populates="ecommerce_products")
 
+    __table_args__ = (
+        Index('ix_ecommerce_products_category_gender', 'category', 'gender'),
+        Index('ix_ecommerce_products_item_type_gender', 'suggested_item_type', 'gender'),
+    )
+
 class WardrobeItem(Base):
     __tablename__ = "wardrobe_items"
 
@@ -71,6 +108,10 @@ class WardrobeItem(Base):
 
     owner = relationship("User", back_populates="wardrobe_items")
 
+    __table_args__ = (
+        fk_index('ix_wardrobe_items_user_id', 'user_id'),
+    )
+
 class Outfit(Base):
     __tablename__ = "outfits"
 
@@ -84,13 +125,17 @@ class Outfit(Base):
 
     user = relationship("User", back_populates="outfits")
 
+    __table_args__ = (
+        fk_index('ix_outfits_user_id', 'user_id'),
+    )
+
 class FashionTrend(Base):
     __tablename__ = "fashion_trends"
 
     trend_id = Column(Integer, primary_key=True, autoincrement=True)
     trend_name = Column(String(255), nullable=False, index=True)
     trend_description = Column(Text, nullable=False)
-    date_added = Column(DateTime, server_default=func.now())
+    date_added = Column(DateTime, server_default=func.now(), nullable=False, index=True)
     trend_search_phrase = Column(String(255), nullable=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=True)
 
@@ -112,9 +157,14 @@ class WeatherData(Base):
     precipitation_probability = Column(Float, nullable=False)
     special_condition = Column(String(255), nullable=True)
     weather_icon = Column(String(255), nullable=True)
-    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True)
+    location_id = Column(Integer, ForeignKey("locations.location_id", ondelete="CASCADE"), nullable=False)
+
+    location_ref = relationship("Location", back_populates="weather_data")
 
-    user = relationship("User", back_populates="weather_data")
+    # One row per (location, day), shared by every user in that location
+    __table_args__ = (
+        UniqueConstraint('location_id', 'date', name='uq_weather_data_location_date'),
+    )
 
 class OutfitSuggestion(Base):
     __tablename__ = "outfit_suggestions"
@@ -126,4 +176,25 @@ class OutfitSuggestion(Base):
     gender = Column(String(10), nullable=False)
     image_url = Column(String(2083), nullable=True)
 
-    user = relationship("User", back_populates="outfit_suggestions")
\ No newline at end of file
+    user = relationship("User", back_populates="outfit_suggestions")
+
+    __table_args__ = (
+        Index('ix_outfit_suggestions_user_id_date_suggested', 'user_id', 'date_suggested'),
+    )
+
+class SuggestionJob(Base):
+    __tablename__ = "suggestion_jobs"
+
+    # Stored so every API worker can answer status polls, and jobs survive a restart
+    job_id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)
+    status = Column(String(20), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True, index=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # Refreshed while the queuing worker is alive
+    suggestion_id = Column(Integer, ForeignKey('outfit_suggestions.suggestion_id', ondelete='SET NULL'), nullable=True)
+    error = Column(String(255), nullable=True)
+    error_status = Column(Integer, nullable=True)
+
+    user = relationship("User", back_populates="suggestion_jobs")
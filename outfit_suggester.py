@@ -8,16 +8,22 @@ from fetch_ebay_data import fetch_similar_ebay_products
 import random
 import openai
 import traceback
-import inflect
 import fal_client 
 import os
-
-p = inflect.engine()
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from constants import ALLOWED_CATEGORIES
+from taxonomy import CATEGORIES, extract_clothing_types, is_allowed_category
+from product_gender import determine_product_gender_gpt_cached
+from weather_service import WeatherServiceError, get_forecast
 
 logger = logging.getLogger(__name__)
 
+# eBay lookups for outfit components run concurrently on this shared pool
+SIMILAR_PRODUCTS_CONCURRENCY = int(os.getenv("SIMILAR_PRODUCTS_CONCURRENCY", "5"))
+SIMILAR_PRODUCTS_TIMEOUT = float(os.getenv("SIMILAR_PRODUCTS_TIMEOUT", "8"))  # Seconds for all of a suggestion's lookups
+_similar_products_executor = ThreadPoolExecutor(max_workers=SIMILAR_PRODUCTS_CONCURRENCY, thread_name_prefix="similar-products")
+
 # Configure Logger (Ensure this configuration is done once in your main application)
 if not logger.handlers:
     logger.setLevel(logging.DEBUG)  # Set to DEBUG for detailed logs; adjust as needed
@@ -27,63 +33,6 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
-def singularize(word: str) -> str:
-    """
-    Converts a plural noun to its singular form. If the word is already singular, returns it unchanged.
-    """
-    return p.singular_noun(word) or word
-
-
-def map_product_to_category(suggested_item_type: str) -> Optional[str]:
-    """
-    Maps a specific clothing item type to a general category.
-    
-    Args:
-        suggested_item_type (str): The specific type of the clothing item.
-    
-    Returns:
-        Optional[str]: The general category of the clothing item or None if no match found.
-    """
-    singular_type = singularize(suggested_item_type).strip().lower()
-    suggested_item_type_lower = suggested_item_type.strip().lower()
-
-    categories = {
-        'Top': [
-            't-shirt', 'tank top', 'blouse', 'sweater', 'hoodie', 'cardigan',
-            'shirt', 'crop top', 'camisole', 'polo shirt', 'long sleeve shirt',
-            'turtleneck', 'thermal wear'
-        ],
-        'Bottom': [
-            'jeans', 'shorts', 'skirt', 'pants', 'trouser', 'cargo pants',
-            'corduroy pants', 'leggings', 'capri pants', 'sweatpants',
-            'jumpsuit', 'culottes', 'thermal wear', 'tights'
-        ],
-        'Shoes': [
-            'sneakers', 'sandals', 'boots', 'heavy boot', 'shoe',
-            'loafers', 'flats', 'slippers', 'heels'
-        ],
-        'Outerwear': [
-            'jacket', 'coat', 'blazer', 'raincoat', 'windbreaker',
-            'denim jacket', 'leather jacket', 'trench coat', 'poncho',
-            'winter coat'
-        ],
-        'Accessories': [
-            'gloves', 'necklace', 'scarf', 'sunglasses', 'hat', 'belt',
-            'watch', 'earrings', 'bracelet', 'handbag'
-        ],
-        'Set': [
-            'set', 'suit set', 'complete suit', 'jumpsuit', 'dress'
-        ]
-    }
-
-    for category, items in categories.items():
-        if singular_type in items or suggested_item_type_lower in items:
-            logger.debug(f"Mapped '{suggested_item_type}' to category '{category}'.")
-            return category
-    logger.warning(f"Could not map '{suggested_item_type}' to any category.")
-    return None
-
-
 def categorize_clothing_item_gpt(product_name: str) -> Optional[str]:
     """
     Categorizes a clothing item into one of the predefined categories using GPT-4.
@@ -128,7 +77,7 @@ def categorize_clothing_item_gpt(product_name: str) -> Optional[str]:
         category = category.split('\n')[0].strip()
 
         # Validate the category
-        if category in ALLOWED_CATEGORIES:
+        if is_allowed_category(category):
             logger.info(f"Categorized '{product_name}' as '{category}'.")
             return category
         else:
@@ -144,54 +93,6 @@ def categorize_clothing_item_gpt(product_name: str) -> Optional[str]:
         return None
 
 
-def determine_product_gender_gpt(product_name: str) -> str:
-    """
-    Determines the gender category using GPT-4 based on the product name.
-    Returns 'Male', 'Female', or 'Unisex'.
-    Ensures that 'Unisex' is only used if explicitly stated.
-    Defaults to 'Unisex' in case of uncertainty.
-    
-    Args:
-        product_name (str): The name or description of the product.
-    
-    Returns:
-        str: The determined gender category.
-    """
-    try:
-        logger.info(f"Determining gender for product: '{product_name}' using GPT-4.")
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert in fashion trends and gender categorization. "
-                        "Determine whether the following product is designed for 'Male', 'Female', or is 'Unisex'. "
-                        "Respond with only one of these three options. "
-                        "Only categorize as 'Unisex' if it is explicitly stated as such."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": f"Product Name: {product_name}"
-                }
-            ],
-            max_tokens=10,
-            temperature=0.2,
-        )
-        gender = response['choices'][0].message.content.strip()
-        gender = gender.capitalize()
-        if gender not in ['Male', 'Female', 'Unisex']:
-            logger.warning(f"GPT-4 returned unexpected gender '{gender}' for product '{product_name}'. Defaulting to 'Unisex'.")
-            return 'Unisex'
-        logger.info(f"GPT-4 classified product '{product_name}' as '{gender}'.")
-        return gender
-    except Exception as e:
-        logger.error(f"Error determining gender with GPT-4 for product '{product_name}': {e}")
-        logger.debug(traceback.format_exc())
-        return 'Unisex'  # Default to 'Unisex' in case of failure
-
-
 def suggest_outfits(user_id: int, db: Session) -> OutfitSuggestion:
     """
     Suggests outfits based on current weather and fashion trends.
@@ -274,7 +175,7 @@ def suggest_outfits(user_id: int, db: Session) -> OutfitSuggestion:
                 gender = component.get('gender')
                 if not gender:
                     # Use GPT-4 to determine gender
-                    gender = determine_product_gender_gpt(component['product_name'])
+                    gender = determine_product_gender_gpt_cached(component['product_name'])
                 product_genders.append(gender)
 
             # Determine overall outfit gender
@@ -354,23 +255,33 @@ def determine_overall_outfit_gender(outfit_genders: List[str]) -> str:
 
 def get_latest_weather(db: Session, user_id: int) -> Optional[WeatherData]:
     """
-    Retrieves the latest weather data for the user's location.
+    Retrieves today's weather for the user's location from the shared forecast cache,
+    falling back to the most recent stored weather data if no forecast can be obtained.
     
     Args:
         db (Session): Database session.
         user_id (int): ID of the user.
         
     Returns:
-        Optional[WeatherData]: The latest weather data or None if not found.
+        Optional[WeatherData]: The weather data (not attached to the session) or None if not found.
     """
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user or not user.location:
         logger.debug("User or user location not found.")
         return None
 
-    weather = db.query(WeatherData).filter(
-        WeatherData.location == user.location
-    ).order_by(WeatherData.date.desc()).first()
+    try:
+        forecast = get_forecast(db, user.location)
+    except WeatherServiceError as e:
+        logger.warning(f"Forecast unavailable for '{user.location}': {e.detail}")
+        forecast = []
+
+    if forecast:
+        weather = WeatherData(**forecast[0])
+    else:
+        weather = db.query(WeatherData).filter(
+            WeatherData.location_id == user.location_id
+        ).order_by(WeatherData.date.desc()).first()
 
     if weather:
         logger.debug(f"Fetched WeatherData: date={weather.date}, temp_max={weather.temp_max}, location={weather.location}")
@@ -451,7 +362,7 @@ def determine_clothing_types(weather: WeatherData, trends: List[FashionTrend]) -
 
 def extract_clothing_types_from_trend(description: str) -> List[str]:
     """
-    Extracts clothing types from a trend description using simple keyword matching.
+    Extracts clothing types from a trend description with the taxonomy's whole-word keyword matcher.
     
     Args:
         description (str): The description of the fashion trend.
@@ -459,14 +370,7 @@ def extract_clothing_types_from_trend(description: str) -> List[str]:
     Returns:
         List[str]: List of clothing types extracted from the trend.
     """
-    keywords = [
-        'jacket', 'blouse', 'skirt', 'sweater', 'dress', 'jeans', 't-shirt', 'shorts',
-        'boots', 'sandals', 'sneakers', 'coat', 'hoodie', 'tank top', 'heavy boots',
-        'set', 'suit set', 'complete suit', 'jumpsuit', 'gloves', 'necklace', 'scarf',
-        'flats', 
-    ]
-    extracted = [word.capitalize() for word in keywords if word in description.lower()]
-    return extracted
+    return extract_clothing_types(description)
 
 
 def select_relevant_clothing_items(db: Session, clothing_types: List[str], user_id: int) -> List[EcommerceProduct]:
@@ -500,11 +404,13 @@ def select_relevant_clothing_items(db: Session, clothing_types: List[str], user_
     clothing_types_formatted = [ctype.lower().strip() for ctype in clothing_types]
     logger.debug(f"Clothing types being searched: {clothing_types_formatted}")
 
-    # Query the database for products matching the specific categories and allowed genders
+    # Query the database for products matching the specific types and allowed genders.
+    # Only products with a general category can be used in an outfit; (category, gender) is indexed.
     products = db.query(EcommerceProduct).filter(
-        EcommerceProduct.suggested_item_type.in_(clothing_types_formatted),
-        EcommerceProduct.gender.in_(allowed_genders)
-    ).all()
+        EcommerceProduct.category.in_(CATEGORIES),
+        EcommerceProduct.gender.in_(allowed_genders),
+        EcommerceProduct.suggested_item_type.in_(clothing_types_formatted)
+    ).order_by(EcommerceProduct.category).all()
 
     logger.debug(f"Number of products fetched: {len(products)}")
     for product in products:
@@ -512,12 +418,7 @@ def select_relevant_clothing_items(db: Session, clothing_types: List[str], user_
 
     category_distribution = {}
     for product in products:
-        category = map_product_to_category(product.suggested_item_type)
-        if category:
-            category_distribution[category] = category_distribution.get(category, 0) + 1
-            logger.debug(f"Product '{product.product_name}' categorized under '{category}'")
-        else:
-            logger.warning(f"Product '{product.product_name}' with type '{product.suggested_item_type}' could not be mapped to a general category.")
+        category_distribution[product.category] = category_distribution.get(product.category, 0) + 1
 
     logger.info(f"Category distribution: {category_distribution}")
 
@@ -535,10 +436,10 @@ def generate_outfit_combinations(
     optional_categories = ['Accessories']
     grouped_items = {category: [] for category in required_categories + optional_categories + ['Set', 'Top', 'Bottom', 'Outerwear']}
 
-    # Categorize items
+    # Categorize items by their stored general category
     for item in clothing_items:
-        category = map_product_to_category(item.suggested_item_type)
-        if category:
+        category = item.category
+        if category in grouped_items:
             grouped_items[category].append(item)
             logger.debug(f"Assigned '{item.product_name}' to category '{category}'")
         else:
@@ -661,26 +562,65 @@ def generate_outfit_combinations(
 
 
 def fetch_similar_products_for_outfits(outfit_combinations: List[List[Dict[str, Any]]], db: Session) -> List[List[Dict[str, Any]]]:
-    for outfit in outfit_combinations:
-        for component in outfit:
-            product_name = component['product_name']
-            try:
-                similar_links = fetch_similar_ebay_products(product_name, limit=3)
-                component['eBay_link'] = similar_links
-
-                # Fetch or determine the gender
-                product = db.query(EcommerceProduct).filter(EcommerceProduct.product_id == component['item_id']).first()
-                if product and product.gender:
-                    component['gender'] = product.gender
-                else:
-                    # Use GPT-4 to determine gender
-                    component['gender'] = determine_product_gender_gpt(product_name)
+    """
+    Adds similar eBay links and the gender to every component of the outfits.
+    The eBay lookups for all distinct products run concurrently and share one deadline, SIMILAR_PRODUCTS_TIMEOUT
+    seconds from the call. Lookups still queued at the deadline are cancelled and ones still running are skipped,
+    leaving those products without links. Each lookup is also given the same timeout for its HTTP requests, so
+    a slow one frees its worker. Genders come from a single query over all component IDs.
+
+    Args:
+        outfit_combinations (List[List[Dict[str, Any]]]): The outfits to enrich.
+        db (Session): Database session.
 
-                logger.info(f"Fetched {len(similar_links)} eBay links for '{product_name}'.")
-            except Exception as e:
-                logger.error(f"Failed to fetch eBay links for '{product_name}': {e}")
-                component['eBay_link'] = []  # Assign empty list
-                component['gender'] = 'Unisex'  # Default
+    Returns:
+        List[List[Dict[str, Any]]]: The same outfits with 'eBay_link' and 'gender' set.
+    """
+    components = [component for outfit in outfit_combinations for component in outfit]
+    product_names = list(dict.fromkeys(component['product_name'] for component in components))
+
+    futures = {
+        product_name: _similar_products_executor.submit(fetch_similar_ebay_products, product_name, 3,
+                                                        SIMILAR_PRODUCTS_TIMEOUT)
+        for product_name in product_names
+    }
+
+    # The HTTP timeout covers reads but not e.g. DNS resolution, so the deadline is enforced here as well
+    done, _ = wait(futures.values(), timeout=SIMILAR_PRODUCTS_TIMEOUT)
+
+    similar_links = {}
+    for product_name, future in futures.items():
+        if future not in done:
+            future.cancel()
+            logger.warning(f"eBay lookup for '{product_name}' did not finish within {SIMILAR_PRODUCTS_TIMEOUT}s; skipping it.")
+            similar_links[product_name] = []
+            continue
+        try:
+            similar_links[product_name] = future.result()
+            logger.info(f"Fetched {len(similar_links[product_name])} eBay links for '{product_name}'.")
+        except Exception as e:
+            logger.error(f"Failed to fetch eBay links for '{product_name}': {e}")
+            similar_links[product_name] = []
+
+    item_ids = {component['item_id'] for component in components}
+    try:
+        genders = dict(
+            db.query(EcommerceProduct.product_id, EcommerceProduct.gender)
+            .filter(EcommerceProduct.product_id.in_(item_ids)).all()
+        ) if item_ids else {}
+    except Exception as e:
+        logger.error(f"Failed to load product genders: {e}")
+        genders = {}
+
+    for component in components:
+        product_name = component['product_name']
+        component['eBay_link'] = list(similar_links.get(product_name, []))
+        try:
+            # Use GPT-4 to determine gender if the product has none stored
+            component['gender'] = genders.get(component['item_id']) or determine_product_gender_gpt_cached(product_name)
+        except Exception as e:
+            logger.error(f"Failed to determine gender for '{product_name}': {e}")
+            component['gender'] = 'Unisex'  # Default
     return outfit_combinations
 
 
@@ -0,0 +1,150 @@
+# pagination.py
+
+import base64
+import json
+import logging
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import DateTime, Integer, Numeric, Select, String, and_, or_
+from sqlalchemy.orm import Query
+
+if TYPE_CHECKING:
+    # Only needed for annotations; the async extension requires greenlet
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor cannot be decoded or does not match the listing."""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encodes the sort key of the last row of a page as an opaque, URL-safe cursor.
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def _cursor_value(column: Any, value: Any) -> Any:
+    # JSON gives back str/int/float/bool/None; only accept what the column's type can be compared with
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        if not isinstance(value, str):
+            raise ValueError(f"expected a timestamp for {column.key}")
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Integer):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"expected an integer for {column.key}")
+        return value
+    if isinstance(column_type, Numeric):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"expected a number for {column.key}")
+        return value
+    if isinstance(column_type, String):
+        if not isinstance(value, str):
+            raise ValueError(f"expected a string for {column.key}")
+        return value
+    raise ValueError(f"unsupported sort column type {column_type!r} for {column.key}")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decodes a cursor produced by encode_cursor back into sort key values for the given columns.
+    Each value must match its column's type, so a tampered cursor is rejected here instead of
+    failing in the database.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or its values do not match the column types.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_cursor_value(column, value) for column, value in zip(columns, payload)]
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Invalid pagination cursor '{cursor}': {e}")
+        raise InvalidCursorError("Invalid cursor.")
+
+
+def _page_size(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    # Without a limit or a cursor the whole listing is returned, as before pagination was added;
+    # a cursor without a limit continues with pages of the default size
+    if limit is None:
+        return DEFAULT_PAGE_SIZE if cursor else None
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _keyset_query(query, columns: Sequence[Any], limit: Optional[int], cursor: Optional[str], descending: bool):
+    # Works for both ORM Query and 2.0-style Select objects
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # (c1, c2, ...) after (v1, v2, ...), expanded so every dialect can use the index
+        after = [
+            and_(*[column == value for column, value in zip(columns[:index], values[:index])],
+                 columns[index] < values[index] if descending else columns[index] > values[index])
+            for index in range(len(columns))
+        ]
+        query = query.filter(or_(*after))
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    query = query.order_by(*order)
+    return query if limit is None else query.limit(limit + 1)
+
+
+def _split_page(rows: list, columns: Sequence[Any], limit: Optional[int]) -> Tuple[list, Optional[str]]:
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
+
+
+def paginate(query: Query, columns: Sequence[Any], limit: Optional[int] = None,
+             cursor: Optional[str] = None, descending: bool = False) -> Tuple[list, Optional[str]]:
+    """
+    Returns one page of a query using keyset pagination.
+    Rows are ordered by `columns`, whose last entry must be unique (the primary key), and each page
+    starts strictly after the cursor's sort key, so the cost of a page does not grow with its offset.
+
+    Args:
+        query (Query): The filtered query to page through.
+        columns (Sequence): Sort key columns, e.g. [FashionTrend.date_added, FashionTrend.trend_id].
+        limit (Optional[int]): Maximum number of rows in the page, capped at MAX_PAGE_SIZE. None returns every
+            row when there is no cursor, and DEFAULT_PAGE_SIZE rows after one.
+        cursor (Optional[str]): Cursor returned with the previous page, or None for the first page.
+        descending (bool): Sort newest/highest first.
+
+    Returns:
+        Tuple[list, Optional[str]]: The rows and the cursor of the next page, or None on the last page.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or its values do not match the column types.
+    """
+    limit = _page_size(limit, cursor)
+    rows = _keyset_query(query, columns, limit, cursor, descending).all()
+    return _split_page(rows, columns, limit)
+
+
+async def paginate_async(db: "AsyncSession", statement: Select, columns: Sequence[Any], limit: Optional[int] = None,
+                         cursor: Optional[str] = None, descending: bool = False) -> Tuple[list, Optional[str]]:
+    """
+    Async variant of paginate for a select() of one ORM entity.
+    """
+    limit = _page_size(limit, cursor)
+    result = await db.execute(_keyset_query(statement, columns, limit, cursor, descending))
+    return _split_page(list(result.scalars().all()), columns, limit)
@@ -0,0 +1,101 @@
+# password_service.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+from passlib.context import CryptContext
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Work factor for new hashes; older hashes are upgraded on login
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Hashes made with a different work factor are flagged by needs_update and rehashed on the next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers only import this module, and do not inherit the server's threads or connections
+            _executor = ProcessPoolExecutor(max_workers=max(1, PASSWORD_HASH_WORKERS),
+                                            mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"Started {PASSWORD_HASH_WORKERS} password hashing workers (bcrypt rounds {BCRYPT_ROUNDS}).")
+        return _executor
+
+
+def _submit(func, *args) -> Future:
+    return _get_executor().submit(func, *args)
+
+
+def hash_password(password: str) -> str:
+    """
+    Hashes a password on the dedicated worker pool, blocking the calling thread until it is done.
+    """
+    return _submit(_hash, password).result()
+
+
+def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password on the dedicated worker pool.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches, and a new hash if the stored one
+        uses an outdated scheme or work factor.
+    """
+    try:
+        return _submit(_verify_and_update, password, hashed_password).result()
+    except ValueError as e:
+        logger.warning(f"Could not verify password hash: {e}")
+        return False, None
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return verify_and_update(password, hashed_password)[0]
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashes a password on the dedicated worker pool without holding a request thread.
+    """
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def verify_and_update_async(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Async variant of verify_and_update for handlers running on the event loop.
+    """
+    try:
+        return await asyncio.wrap_future(_submit(_verify_and_update, password, hashed_password))
+    except ValueError as e:
+        logger.warning(f"Could not verify password hash: {e}")
+        return False, None
+
+
+def shutdown(wait: bool = True):
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
@@ -0,0 +1,332 @@
+# product_classifier.py
+
+import argparse
+import logging
+import os
+import re
+import threading
+import traceback
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from constants import ALLOWED_CATEGORIES
+from taxonomy import is_allowed_category
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+# Relative paths resolve against the project directory, not the process's working directory
+PRODUCT_CLASSIFIER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                       os.getenv("PRODUCT_CLASSIFIER_PATH", "product_classifier.joblib"))
+CONFIDENCE_THRESHOLD = float(os.getenv("CLASSIFIER_CONFIDENCE_THRESHOLD", "0.8"))
+
+# Constants
+VALID_GENDERS = ['Male', 'Female', 'Unisex']
+MIN_TRAINING_SAMPLES = 50
+
+# Where a stored category or gender came from (ecommerce_products.category_source / gender_source)
+SOURCE_RULES = 'rules'
+SOURCE_MODEL = 'model'
+SOURCE_GPT = 'gpt'
+SOURCE_HUMAN = 'human'
+SOURCE_FALLBACK = 'fallback'  # The 'Unisex' default for products nobody could classify
+# Only independent labels are trained and evaluated on; the cascade's own output would make both circular
+TRAINING_LABEL_SOURCES = (SOURCE_GPT, SOURCE_HUMAN)
+
+GENDER_RULES = [
+    ('Unisex', re.compile(r"\bunisex\b", re.IGNORECASE)),
+    ('Female', re.compile(r"\b(women['’]?s?|ladies|lady['’]?s?|female|girls?['’]?s?|maternity)\b", re.IGNORECASE)),
+    ('Male', re.compile(r"\b(men['’]?s?|male|boys?['’]?s?|gentlemen['’]?s?)\b", re.IGNORECASE)),
+]
+
+# Category names as regexes, longest first so 'Denim Jacket' wins over 'Jacket'
+CATEGORY_RULES = [
+    (category, re.compile(
+        r"\b" + r"[\s_-]+".join(re.escape(word) for word in re.split(r"[\s_]+", category)) + r"(e?s)?\b",
+        re.IGNORECASE
+    ))
+    for category in sorted(ALLOWED_CATEGORIES, key=len, reverse=True)
+]
+
+stats = {'rule_hits': 0, 'model_hits': 0, 'fallbacks': 0}
+_stats_lock = threading.Lock()
+_model_lock = threading.Lock()
+_model = None
+_model_loaded = False
+
+
+def _count(key: str):
+    with _stats_lock:
+        stats[key] += 1
+
+
+def gender_from_rules(title: str) -> Optional[str]:
+    """
+    Determines gender from explicit words in the title ("Men's", "Women's", "Unisex").
+    Returns None if the title mentions no gender or both.
+    """
+    matches = {gender for gender, pattern in GENDER_RULES if pattern.search(title)}
+    if 'Unisex' in matches:
+        return 'Unisex'
+    if len(matches) == 1:
+        return matches.pop()
+    return None
+
+
+def category_from_rules(title: str) -> Optional[str]:
+    """
+    Determines the category from category names appearing in the title.
+    Returns None when no category or several unrelated categories are mentioned.
+    """
+    matched = []
+    for category, pattern in CATEGORY_RULES:
+        if pattern.search(title):
+            matched.append(category)
+    # Drop generic matches that are part of a more specific one ('Jacket' inside 'Denim Jacket')
+    specific = [c for c in matched if not any(c != other and c.lower() in other.lower() for other in matched)]
+    if len(specific) == 1:
+        return specific[0]
+    return None
+
+
+def load_model():
+    """
+    Loads the persisted classifier once. Returns None if no model has been trained yet.
+    """
+    global _model, _model_loaded
+    if _model_loaded:
+        return _model
+    with _model_lock:
+        if not _model_loaded:
+            if os.path.exists(PRODUCT_CLASSIFIER_PATH):
+                try:
+                    import joblib
+                    _model = joblib.load(PRODUCT_CLASSIFIER_PATH)
+                    logger.info(f"Loaded product classifier trained on {_model.get('samples')} samples at {_model.get('trained_at')}.")
+                except Exception as e:
+                    logger.error(f"Failed to load product classifier from {PRODUCT_CLASSIFIER_PATH}: {e}")
+                    logger.debug(traceback.format_exc())
+            else:
+                logger.info(f"No product classifier found at {PRODUCT_CLASSIFIER_PATH}. Local model stage disabled.")
+            _model_loaded = True
+    return _model
+
+
+def _model_predict(field: str, title: str) -> Tuple[Optional[str], float]:
+    model = load_model()
+    if not model or model.get(field) is None:
+        return None, 0.0
+    pipeline = model[field]
+    probabilities = pipeline.predict_proba([title])[0]
+    best = probabilities.argmax()
+    return pipeline.classes_[best], float(probabilities[best])
+
+
+def predict(field: str, title: str, threshold: float = CONFIDENCE_THRESHOLD) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resolves 'category' or 'gender' locally: title rules first, then the trained model.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The label and the stage that produced it (SOURCE_RULES or
+        SOURCE_MODEL), or (None, None) when neither is confident enough, so the caller should ask GPT-4.
+    """
+    rules = category_from_rules if field == 'category' else gender_from_rules
+    label = rules(title)
+    if label:
+        _count('rule_hits')
+        return label, SOURCE_RULES
+    label, confidence = _model_predict(field, title)
+    if label and confidence >= threshold:
+        _count('model_hits')
+        return label, SOURCE_MODEL
+    _count('fallbacks')
+    return None, None
+
+
+def predict_category(title: str, threshold: float = CONFIDENCE_THRESHOLD) -> Optional[str]:
+    """
+    Resolves the category locally, or returns None so the caller should ask GPT-4 (see predict).
+    """
+    return predict('category', title, threshold)[0]
+
+
+def predict_gender(title: str, threshold: float = CONFIDENCE_THRESHOLD) -> Optional[str]:
+    """
+    Resolves the gender locally, or returns None so the caller should ask GPT-4 (see predict).
+    """
+    return predict('gender', title, threshold)[0]
+
+
+def get_stats() -> Dict[str, float]:
+    """
+    Returns counters for how often each stage of the cascade resolved a prediction.
+    """
+    with _stats_lock:
+        result = dict(stats)
+    total = result['rule_hits'] + result['model_hits'] + result['fallbacks']
+    result['local_share'] = (result['rule_hits'] + result['model_hits']) / total if total else 0.0
+    return result
+
+
+def _build_pipeline():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+
+    return make_pipeline(
+        TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=1),
+        LogisticRegression(max_iter=1000, class_weight='balanced')
+    )
+
+
+def load_training_data(database_url: str, include_unknown: bool = False) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Loads GPT- or human-labelled products from ecommerce_products. Labels set by the rules, the model
+    itself or the 'Unisex' fallback are left out, so the model is neither trained nor scored on its own output.
+
+    Args:
+        database_url (str): SQLAlchemy database URL.
+        include_unknown (bool): Also use labels stored before their source was recorded.
+
+    Returns:
+        List[Tuple[str, Optional[str], Optional[str]]]: (product_name, category, gender) rows; a label is None
+        where it is missing, invalid or not from a trusted source.
+    """
+    from sqlalchemy.orm import sessionmaker
+    from db import create_db_engine
+    from models import EcommerceProduct
+
+    engine = create_db_engine(database_url)
+    session = sessionmaker(bind=engine)()
+    try:
+        rows = session.query(
+            EcommerceProduct.product_name,
+            EcommerceProduct.suggested_item_type,
+            EcommerceProduct.gender,
+            EcommerceProduct.category_source,
+            EcommerceProduct.gender_source
+        ).all()
+    finally:
+        session.close()
+        engine.dispose()
+
+    def trusted(source: Optional[str]) -> bool:
+        return source in TRAINING_LABEL_SOURCES or (include_unknown and source is None)
+
+    data = []
+    for product_name, category, gender, category_source, gender_source in rows:
+        row = (
+            product_name,
+            category if trusted(category_source) and is_allowed_category(category) else None,
+            gender if trusted(gender_source) and gender in VALID_GENDERS else None
+        )
+        if row[1] or row[2]:
+            data.append(row)
+    logger.info(f"Loaded {len(data)} GPT- or human-labelled products out of {len(rows)} in the database.")
+    return data
+
+
+def train(data: List[Tuple[str, Optional[str], Optional[str]]]) -> dict:
+    """
+    Trains category and gender classifiers on (title, category, gender) rows.
+    """
+    model = {'trained_at': datetime.utcnow().isoformat(), 'samples': len(data)}
+    for field, column in (('category', 1), ('gender', 2)):
+        labelled = [(row[0], row[column]) for row in data if row[column]]
+        if len(labelled) < MIN_TRAINING_SAMPLES or len({label for _, label in labelled}) < 2:
+            logger.warning(f"Not enough labelled data to train the {field} classifier ({len(labelled)} rows).")
+            model[field] = None
+            continue
+        pipeline = _build_pipeline()
+        pipeline.fit([title for title, _ in labelled], [label for _, label in labelled])
+        model[field] = pipeline
+        logger.info(f"Trained {field} classifier on {len(labelled)} rows.")
+    return model
+
+
+def save_model(model: dict, path: str = PRODUCT_CLASSIFIER_PATH):
+    import joblib
+    joblib.dump(model, path)
+    logger.info(f"Saved product classifier to {path}.")
+
+
+def evaluate(data: List[Tuple[str, Optional[str], Optional[str]]], threshold: float = CONFIDENCE_THRESHOLD,
+             test_size: float = 0.2) -> Dict[str, dict]:
+    """
+    Trains on a split of the data and compares the cascade against the GPT or human labels on the held-out rows.
+
+    Returns:
+        Dict[str, dict]: Per field: model accuracy, accuracy of locally resolved items and the share resolved locally.
+    """
+    from sklearn.model_selection import train_test_split
+
+    train_rows, test_rows = train_test_split(data, test_size=test_size, random_state=42)
+    model = train(train_rows)
+    rules = {'category': category_from_rules, 'gender': gender_from_rules}
+
+    report = {}
+    for field, column in (('category', 1), ('gender', 2)):
+        labelled = [(row[0], row[column]) for row in test_rows if row[column]]
+        if not labelled:
+            continue
+        pipeline = model.get(field)
+        model_correct = 0
+        local_total = local_correct = rule_total = 0
+        for title, label in labelled:
+            prediction, confidence = None, 0.0
+            if pipeline is not None:
+                probabilities = pipeline.predict_proba([title])[0]
+                prediction = pipeline.classes_[probabilities.argmax()]
+                confidence = float(probabilities.max())
+                model_correct += prediction == label
+
+            local = rules[field](title)
+            if local:
+                rule_total += 1
+            elif prediction is not None and confidence >= threshold:
+                local = prediction
+            if local:
+                local_total += 1
+                local_correct += local == label
+
+        report[field] = {
+            'test_rows': len(labelled),
+            'model_accuracy': model_correct / len(labelled) if pipeline is not None else None,
+            'rule_share': rule_total / len(labelled),
+            'local_share': local_total / len(labelled),
+            'local_accuracy': local_correct / local_total if local_total else None,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and evaluate the local product classifier.")
+    parser.add_argument("command", choices=["train", "report"], help="'train' fits and saves the model, 'report' evaluates it against GPT labels.")
+    parser.add_argument("--output", default=PRODUCT_CLASSIFIER_PATH, help="Where to save the trained model.")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD, help="Confidence required to skip GPT-4.")
+    parser.add_argument("--include-unknown", action="store_true",
+                        help="Also use labels stored before label sources were recorded.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        logger.error("DATABASE_URL is not set in the environment variables.")
+        raise SystemExit(1)
+
+    data = load_training_data(database_url, args.include_unknown)
+    if args.command == "train":
+        save_model(train(data), args.output)
+    else:
+        for field, metrics in evaluate(data, args.threshold).items():
+            print(f"{field}:")
+            for name, value in metrics.items():
+                print(f"  {name}: {value if value is None or isinstance(value, int) else round(value, 3)}")
+
+
+if __name__ == "__main__":
+    main()
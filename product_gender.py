@@ -0,0 +1,82 @@
+# product_gender.py
+
+import logging
+import os
+import traceback
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from classification_cache import classification_cache
+import product_classifier
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+VALID_GENDERS = ['Male', 'Female', 'Unisex']
+
+
+@lru_cache(maxsize=1)
+def _openai():
+    # Imported on first use, so callers that resolve every product locally never load the SDK
+    import openai
+    if OPENAI_API_KEY:
+        openai.api_key = OPENAI_API_KEY
+    return openai
+
+
+def determine_product_gender_gpt(product_name: str) -> Optional[str]:
+    """
+    Determines the gender category using GPT-4 based on the product name.
+    Returns 'Male', 'Female', or 'Unisex'.
+    Ensures that 'Unisex' is only used if explicitly stated.
+    Returns None if the request fails, so the failure is not cached.
+    """
+    openai = _openai()
+    try:
+        logger.info(f"Determining gender for product: '{product_name}' using GPT-4.")
+        response = openai.ChatCompletion.create(
+            model="gpt-4",
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You are an expert in fashion trends and gender categorization. "
+                        "Determine whether the following product is designed for 'Male', 'Female', or is 'Unisex'. "
+                        "Respond with only one of these three options. "
+                        "Only categorize as 'Unisex' if it is explicitly stated as such."
+                    )
+                },
+                {
+                    "role": "user",
+                    "content": f"Product Name: {product_name}"
+                }
+            ],
+            max_tokens=10,
+            temperature=0.2,
+        )
+        gender = response['choices'][0]['message']['content'].strip()
+        gender = gender.capitalize()
+        if gender not in VALID_GENDERS:
+            logger.warning(f"GPT-4 returned unexpected gender '{gender}' for product '{product_name}'. Defaulting to 'Unisex'.")
+            return 'Unisex'
+        logger.info(f"GPT-4 classified product '{product_name}' as '{gender}'.")
+        return gender
+    except Exception as e:
+        logger.error(f"Error determining gender with GPT-4 for product '{product_name}': {e}")
+        logger.debug(traceback.format_exc())
+        return None  # Not cached, so the product is retried; callers fall back to 'Unisex'
+
+
+def determine_product_gender_gpt_cached(product_name: str) -> str:
+    """
+    Resolves a product's gender with the local classifier first, then the classification cache and GPT-4.
+    Used by both the trend pipeline and the outfit suggester, so they share one cache entry per title.
+    """
+    return product_classifier.predict_gender(product_name) or \
+        classification_cache.get_or_compute('gender', product_name, determine_product_gender_gpt) or 'Unisex'
@@ -0,0 +1,93 @@
+# product_ingest.py
+
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from bulk_ops import chunk_rows, insert_ignore_duplicates, supports_upsert
+from models import EcommerceProduct
+from product_classifier import SOURCE_FALLBACK
+from taxonomy import map_product_to_category
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+INGEST_BATCH_SIZE = 500
+
+PRODUCT_COLUMNS = [
+    'ebay_item_id', 'product_name', 'suggested_item_type', 'price', 'currency',
+    'product_url', 'image_url', 'date_suggested', 'user_id', 'gender', 'category',
+    'category_source', 'gender_source',
+]
+
+
+def _product_row(product: dict) -> dict:
+    """
+    Maps a fetched product dictionary onto the ecommerce_products columns, filling defaults
+    and computing the general category once here instead of at request time.
+    """
+    row = {column: product.get(column) for column in PRODUCT_COLUMNS}
+    if not row['category'] and row['suggested_item_type']:
+        row['category'] = map_product_to_category(row['suggested_item_type'])
+    row['currency'] = row['currency'] or 'USD'
+    if not row['gender']:
+        row['gender'], row['gender_source'] = 'Unisex', SOURCE_FALLBACK
+    row['date_suggested'] = row['date_suggested'] or datetime.utcnow()
+    return row
+
+
+def ingest_products(session: Session, products: List[dict], batch_size: int = INGEST_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Inserts fetched products into ecommerce_products, skipping ones whose ebay_item_id already exists.
+    Uses one conflict-ignoring multi-row INSERT per batch where the dialect supports it,
+    otherwise one IN (...) prefetch of existing ids per batch.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        products (List[dict]): Product dictionaries as returned by the eBay fetchers.
+        batch_size (int): Maximum number of rows per statement.
+
+    Returns:
+        Dict[str, int]: Counts of 'inserted' and 'skipped' products.
+    """
+    # Drop duplicates within the input before touching the database
+    rows_by_id = {}
+    for product in products:
+        if product.get('ebay_item_id') and product['ebay_item_id'] not in rows_by_id:
+            rows_by_id[product['ebay_item_id']] = _product_row(product)
+    rows = list(rows_by_id.values())
+
+    if not rows:
+        logger.info("No items to insert.")
+        return {'inserted': 0, 'skipped': len(products)}
+
+    table = EcommerceProduct.__table__
+    use_upsert = supports_upsert(session)
+    inserted = 0
+    try:
+        for batch in chunk_rows(rows, batch_size):
+            if use_upsert:
+                inserted += insert_ignore_duplicates(session, table, batch, ['ebay_item_id'])
+                continue
+
+            batch_ids = [row['ebay_item_id'] for row in batch]
+            existing = {
+                ebay_item_id for (ebay_item_id,) in session.query(EcommerceProduct.ebay_item_id)
+                .filter(EcommerceProduct.ebay_item_id.in_(batch_ids))
+            }
+            new_rows = [row for row in batch if row['ebay_item_id'] not in existing]
+            if new_rows:
+                session.execute(insert(table), new_rows)
+                inserted += len(new_rows)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    skipped = len(products) - inserted
+    logger.info(f"Inserted {inserted} new products into ecommerce_products, skipped {skipped} existing or duplicate products.")
+    return {'inserted': inserted, 'skipped': skipped}
@@ -1,6 +1,7 @@
 # run_fashion_trends.py
 
 import os
+import argparse
 from sqlalchemy.orm import Session
 from models import Base, FashionTrend, EcommerceProduct
 from fashion_trends import fetch_and_update_fashion_trends, populate_ecommerce_products
@@ -19,24 +20,23 @@ if not DATABASE_URL:
     logger.error("DATABASE_URL is not set in the environment variables.")
     raise ValueError("DATABASE_URL is not set in the environment variables.")
 
-# Create the SQLAlchemy engine
-from sqlalchemy import create_engine
+# Shared engine and "Session" class; with --workers, size DB_POOL_SIZE/DB_MAX_OVERFLOW to match (see db.py)
+from db import get_session_factory
 
-engine = create_engine(DATABASE_URL, echo=False)
-
-# Create a configured "Session" class
-from sqlalchemy.orm import sessionmaker
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = get_session_factory()
 
 def main():
+    parser = argparse.ArgumentParser(description="Update fashion trends and populate ecommerce products.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of trends to fetch and insert products for concurrently.")
+    args = parser.parse_args()
+
     db = SessionLocal()
     try:
         # Step 1: Fetch and update fashion trends
         fetch_and_update_fashion_trends(db)
 
         # Step 2: Populate ecommerce_products based on updated trends
-        populate_ecommerce_products(db)
+        populate_ecommerce_products(db, workers=max(1, args.workers))
 
     finally:
         db.close()
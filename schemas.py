@@ -0,0 +1,208 @@
+# schemas.py
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import AnyHttpUrl, BaseModel, EmailStr, Field
+
+# Pydantic Schemas shared by the sync routes in main.py and the async routes in async_routes.py
+
+class UserBase(BaseModel):
+    username: str = Field(..., min_length=3, max_length=50)
+    email: EmailStr
+    location: str  # Now required
+    preferences: Optional[List[str]] = None
+    gender: Optional[str] = None
+    height: Optional[str] = None
+    weight: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class UserCreate(UserBase):
+    password: str = Field(..., min_length=6)
+
+
+class UserUpdate(BaseModel):
+    username: Optional[str] = Field(None, min_length=3, max_length=50)
+    email: Optional[EmailStr] = None
+    location: Optional[str] = None
+    preferences: Optional[List[str]] = None  # Expecting a list
+    gender: Optional[str] = None
+    password: Optional[str] = Field(None, min_length=6)
+    height: Optional[str] = None
+    weight: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class UserResponse(UserBase):
+    user_id: int
+    date_joined: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Login Schemas
+
+class LoginRequest(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class LoginResponse(BaseModel):
+    user_id: int
+    username: str
+    email: EmailStr
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Weather Schemas
+
+class WeatherRequest(BaseModel):
+    user_id: int 
+
+class WeatherResponse(BaseModel):
+    date: datetime
+    location: str
+    temp_max: float
+    temp_min: float
+    feels_max: float
+    feels_min: float
+    wind_speed: float
+    humidity: float
+    precipitation: float
+    precipitation_probability: float
+    special_condition: str
+    weather_icon: str
+
+    class Config:
+        orm_mode = True
+
+class FashionTrendResponse(BaseModel):
+    trend_id: int
+    trend_name: str
+    trend_description: str
+    date_added: datetime
+
+    class Config:
+        orm_mode = True
+
+# Wardrobe Item Schemas
+
+class WardrobeItemBase(BaseModel):
+    clothing_type: Optional[str] = Field(..., min_length=3, max_length=50)
+    for_weather: Optional[str] = None
+    color: Optional[List[str]] = None
+    size: Optional[str] = Field(..., min_length=1, max_length=50)
+    tags: Optional[List[str]] = None
+    image_url: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class WardrobeItemCreate(WardrobeItemBase):
+    user_id: int
+
+
+class WardrobeItemUpdate(BaseModel):
+    clothing_type: Optional[str] = Field(None, min_length=3, max_length=50)
+    for_weather: Optional[str] = Field(None, min_length=3, max_length=50)
+    color: Optional[List[str]] = None
+    size: Optional[str] = Field(None, min_length=1, max_length=50)
+    tags: Optional[List[str]] = None
+    image_url: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+class WardrobeItemResponse(WardrobeItemBase):
+    item_id: int
+    clothing_type: str
+    for_weather: str
+    color: List[str]
+    size: str
+    tags: List[str]
+    image_url: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+# Outfit
+
+class OutfitBase(BaseModel):
+    occasion: Optional[List[str]] = None
+    for_weather: Optional[str] = None
+    clothings: Optional[List[int]] = None
+    source_url: Optional[str] = None
+
+class OutfitCreate(OutfitBase):
+    user_id: int
+
+class OutfitResponse(OutfitBase):
+    outfit_id: int
+    clothings: List[int]
+    occasion: List[str]
+    for_weather: Optional[str]
+
+    class Config:
+        orm_mode = True
+
+class OutfitUpdate(BaseModel):
+    occasion: Optional[List[str]] = None
+    for_weather: Optional[str] = None
+
+
+# Outfit Suggestion - it is working now
+
+class OutfitComponent(BaseModel):
+    clothing_type: str
+    item_id: int
+    product_name: str
+    image_url: Optional[str] = None
+    eBay_link: Optional[List[str]] = None 
+    gender: str
+    
+    class Config:
+        orm_mode = True
+
+
+class OutfitSuggestionResponse(BaseModel):
+    suggestion_id: int
+    outfit_details: List[List[OutfitComponent]]
+    gender: str
+    date_suggested: datetime
+    image_url: Optional[AnyHttpUrl] = None
+
+    class Config:
+        orm_mode = True
+        
+class OutfitSuggestionRequest(BaseModel):
+    user_id: int
+
+class OutfitSuggestionCreateResponse(BaseModel):
+    suggestion_id: int
+    outfit_details: List[List[OutfitComponent]]
+    gender: str
+    date_suggested: datetime
+    image_url: Optional[AnyHttpUrl] = None
+
+    class Config:
+        orm_mode = True
+
+class SuggestionJobResponse(BaseModel):
+    job_id: str
+    user_id: int
+    status: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[OutfitSuggestionCreateResponse] = None
@@ -0,0 +1,207 @@
+# suggestion_jobs.py
+
+import logging
+import os
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+
+from models import SuggestionJob
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+SUGGESTION_JOB_WORKERS = int(os.getenv("SUGGESTION_JOB_WORKERS", "2"))
+SUGGESTION_JOB_TTL = int(os.getenv("SUGGESTION_JOB_TTL", "3600"))  # Seconds finished jobs stay pollable
+SUGGESTION_JOB_QUEUE_SIZE = int(os.getenv("SUGGESTION_JOB_QUEUE_SIZE", "100"))  # Unfinished jobs per API worker
+SUGGESTION_JOBS_PER_USER = int(os.getenv("SUGGESTION_JOBS_PER_USER", "3"))  # Unfinished jobs per user
+# Seconds between sweeps; each sweep purges expired jobs and marks this worker's unfinished jobs alive
+SUGGESTION_JOB_SWEEP_INTERVAL = int(os.getenv("SUGGESTION_JOB_SWEEP_INTERVAL", "60"))
+
+# Job states
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# Unfinished jobs not marked alive for this many sweeps belong to a worker that stopped
+MISSED_HEARTBEATS = 3
+
+
+class SuggestionJobLimitError(Exception):
+    """Raised when a job cannot be queued because a limit is reached. Carries the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class SuggestionJobManager:
+    """
+    Runs outfit suggestions on a dedicated thread pool so they do not hold request threads.
+    Jobs are stored in the suggestion_jobs table, so any API worker can report on a job queued by another.
+
+    Each worker queues at most `max_queue` unfinished jobs, and a user may have at most `max_per_user`.
+    Once started, a background sweep runs every `sweep_interval` seconds: it deletes jobs finished more than
+    `ttl` seconds ago, refreshes the heartbeat of this worker's unfinished jobs, and marks unfinished jobs
+    whose heartbeat stopped (their worker exited before completing them) failed. The first sweep runs on start,
+    so jobs left behind while no worker was running are failed right away, and any others within
+    MISSED_HEARTBEATS sweeps.
+    """
+
+    def __init__(self, session_factory: sessionmaker, max_workers: int = SUGGESTION_JOB_WORKERS,
+                 ttl: int = SUGGESTION_JOB_TTL, max_queue: int = SUGGESTION_JOB_QUEUE_SIZE,
+                 max_per_user: int = SUGGESTION_JOBS_PER_USER, sweep_interval: int = SUGGESTION_JOB_SWEEP_INTERVAL):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.sweep_interval = sweep_interval
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="suggestion-job")
+        self._lock = threading.Lock()
+        self._active: Set[str] = set()  # IDs of this worker's queued and running jobs
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def sweep(self):
+        """
+        Purges expired jobs, refreshes the heartbeat of this worker's jobs and fails orphaned ones.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            active = list(self._active)
+        db = self.session_factory()
+        try:
+            db.query(SuggestionJob).filter(
+                SuggestionJob.finished_at < now - timedelta(seconds=self.ttl)
+            ).delete(synchronize_session=False)
+            if active:
+                db.query(SuggestionJob).filter(
+                    SuggestionJob.job_id.in_(active), SuggestionJob.finished_at.is_(None)
+                ).update({'heartbeat_at': now}, synchronize_session=False)
+            orphaned = db.query(SuggestionJob).filter(
+                SuggestionJob.finished_at.is_(None),
+                func.coalesce(SuggestionJob.heartbeat_at, SuggestionJob.created_at)
+                < now - timedelta(seconds=self.sweep_interval * MISSED_HEARTBEATS),
+            ).update({
+                'status': FAILED, 'finished_at': now,
+                'error': "The job was interrupted.", 'error_status': 500,
+            }, synchronize_session=False)
+            db.commit()
+            if orphaned:
+                logger.warning(f"Marked {orphaned} interrupted outfit suggestion jobs failed.")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to sweep outfit suggestion jobs: {e}")
+            logger.debug(traceback.format_exc())
+        finally:
+            db.close()
+
+    def _sweep_loop(self):
+        while not self._stop_event.is_set():
+            self.sweep()
+            self._stop_event.wait(self.sweep_interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sweep_loop, name="suggestion-job-sweep", daemon=True)
+        self._thread.start()
+
+    def submit(self, db: Session, user_id: int) -> SuggestionJob:
+        """
+        Queues an outfit suggestion for the user and returns the pending job.
+
+        Args:
+            db (Session): The request's session; the job is committed before it is queued.
+            user_id (int): The user the suggestion is for, recorded as the job's owner.
+
+        Returns:
+            SuggestionJob: The stored job.
+
+        Raises:
+            SuggestionJobLimitError: 503 if this worker's queue is full, 429 if the user has too many unfinished jobs.
+        """
+        unfinished = db.query(func.count(SuggestionJob.job_id)).filter(
+            SuggestionJob.user_id == user_id, SuggestionJob.finished_at.is_(None)
+        ).scalar()
+        if unfinished >= self.max_per_user:
+            raise SuggestionJobLimitError(429, "Too many outfit suggestions in progress for this user.")
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            if len(self._active) >= self.max_queue:
+                raise SuggestionJobLimitError(503, "Too many outfit suggestions are queued. Try again later.")
+            self._active.add(job_id)  # Reserves the queue slot
+
+        try:
+            now = datetime.utcnow()
+            job = SuggestionJob(job_id=job_id, user_id=user_id, status=PENDING, created_at=now, heartbeat_at=now)
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            self._executor.submit(self._run, job.job_id, user_id)
+        except Exception:
+            with self._lock:
+                self._active.discard(job_id)
+            raise
+        logger.info(f"Queued outfit suggestion job {job.job_id} for user_id={user_id}")
+        return job
+
+    def get(self, db: Session, job_id: str) -> Optional[SuggestionJob]:
+        return db.query(SuggestionJob).filter(SuggestionJob.job_id == job_id).first()
+
+    def _update(self, job_id: str, **values):
+        db = self.session_factory()
+        try:
+            db.query(SuggestionJob).filter(SuggestionJob.job_id == job_id).update(values, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to update outfit suggestion job {job_id}: {e}")
+            logger.debug(traceback.format_exc())
+        finally:
+            db.close()
+
+    def _run(self, job_id: str, user_id: int):
+        try:
+            self._execute(job_id, user_id)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def _execute(self, job_id: str, user_id: int):
+        self._update(job_id, status=RUNNING, started_at=datetime.utcnow())
+        db = self.session_factory()
+        try:
+            # Imported on the worker thread, so the API does not load openai and fal_client at startup
+            from outfit_suggester import suggest_outfits
+
+            outfit_suggestion = suggest_outfits(user_id, db)
+            result = {'status': SUCCEEDED, 'suggestion_id': outfit_suggestion.suggestion_id}
+            logger.info(f"Outfit suggestion job {job_id} created suggestion ID {outfit_suggestion.suggestion_id}")
+        except ValueError as ve:
+            logger.error(f"ValueError during outfit suggestion job {job_id}: {ve}")
+            result = {'status': FAILED, 'error': str(ve)[:255], 'error_status': 400}
+        except Exception as e:
+            logger.error(f"Error during outfit suggestion job {job_id}: {e}")
+            logger.debug(traceback.format_exc())
+            result = {'status': FAILED, 'error': "Failed to suggest outfits.", 'error_status': 500}
+        finally:
+            db.close()
+        self._update(job_id, finished_at=datetime.utcnow(), **result)
+
+    def shutdown(self, wait: bool = False):
+        self._stop_event.set()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,192 @@
+# taxonomy.py
+
+import logging
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from constants import ALLOWED_CATEGORIES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# General outfit categories stored in ecommerce_products.category, in matching priority order
+CATEGORIES = ['Top', 'Bottom', 'Shoes', 'Outerwear', 'Accessories', 'Set']
+
+CATEGORY_ITEMS = {
+    'Top': [
+        't-shirt', 'tank top', 'blouse', 'sweater', 'hoodie', 'cardigan',
+        'shirt', 'crop top', 'camisole', 'polo shirt', 'long sleeve shirt',
+        'turtleneck', 'thermal wear'
+    ],
+    'Bottom': [
+        'jeans', 'shorts', 'skirt', 'pants', 'trouser', 'cargo pants',
+        'corduroy pants', 'leggings', 'capri pants', 'sweatpants',
+        'jumpsuit', 'culottes', 'thermal wear', 'tights'
+    ],
+    'Shoes': [
+        'sneakers', 'sandals', 'boots', 'heavy boot', 'shoe',
+        'loafers', 'flats', 'slippers', 'heels'
+    ],
+    'Outerwear': [
+        'jacket', 'coat', 'blazer', 'raincoat', 'windbreaker',
+        'denim jacket', 'leather jacket', 'trench coat', 'poncho',
+        'winter coat'
+    ],
+    'Accessories': [
+        'gloves', 'necklace', 'scarf', 'sunglasses', 'hat', 'belt',
+        'watch', 'earrings', 'bracelet', 'handbag'
+    ],
+    'Set': [
+        'set', 'suit set', 'complete suit', 'jumpsuit', 'dress'
+    ]
+}
+
+# Clothing types recognised in trend descriptions
+TREND_KEYWORDS = [
+    'jacket', 'blouse', 'skirt', 'sweater', 'dress', 'jeans', 't-shirt', 'shorts',
+    'boots', 'sandals', 'sneakers', 'coat', 'hoodie', 'tank top', 'heavy boots',
+    'set', 'suit set', 'complete suit', 'jumpsuit', 'gloves', 'necklace', 'scarf',
+    'flats',
+]
+
+ALLOWED_CATEGORY_SET = frozenset(ALLOWED_CATEGORIES)
+
+# Item type -> category; an item listed under several categories keeps the first, as the old scan did
+TYPE_TO_CATEGORY: Dict[str, str] = {}
+for _category in CATEGORIES:
+    for _item in CATEGORY_ITEMS[_category]:
+        TYPE_TO_CATEGORY.setdefault(_item, _category)
+
+_CATEGORY_PRIORITY = {category: index for index, category in enumerate(CATEGORIES)}
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def is_allowed_category(category: Optional[str]) -> bool:
+    return category in ALLOWED_CATEGORY_SET
+
+
+@lru_cache(maxsize=1)
+def _inflect_engine():
+    # inflect takes seconds to import, so it is only loaded once a word actually needs inflecting
+    import inflect
+    return inflect.engine()
+
+
+@lru_cache(maxsize=4096)
+def singularize(word: str) -> str:
+    """
+    Converts a plural noun to its singular form. If the word is already singular, returns it unchanged.
+    """
+    return _inflect_engine().singular_noun(word) or word
+
+
+def map_product_to_category(suggested_item_type: str) -> Optional[str]:
+    """
+    Maps a specific clothing item type to a general category.
+
+    Args:
+        suggested_item_type (str): The specific type of the clothing item.
+
+    Returns:
+        Optional[str]: The general category of the clothing item or None if no match found.
+    """
+    singular_type = singularize(suggested_item_type).strip().lower()
+    suggested_item_type_lower = suggested_item_type.strip().lower()
+
+    matches = [
+        category for category in (TYPE_TO_CATEGORY.get(singular_type), TYPE_TO_CATEGORY.get(suggested_item_type_lower))
+        if category
+    ]
+    if matches:
+        category = min(matches, key=_CATEGORY_PRIORITY.get)
+        logger.debug(f"Mapped '{suggested_item_type}' to category '{category}'.")
+        return category
+    logger.warning(f"Could not map '{suggested_item_type}' to any category.")
+    return None
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over word tokens.
+    Finds every keyword phrase in a text in one pass, matching whole words only
+    ('set' does not match 'sunset'). Plural forms of single-word keywords are matched too.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[set] = [set()]
+
+        for keyword in self.keywords:
+            for variant in self._variants(keyword):
+                self._add(variant, keyword)
+        self._build_failure_links()
+
+    @staticmethod
+    def _variants(keyword: str) -> List[List[str]]:
+        tokens = tokenize(keyword)
+        variants = [tokens]
+        # 'jacket' should also match 'jackets'; words that are already plural are left alone
+        if tokens and not _inflect_engine().singular_noun(tokens[-1]):
+            variants.append(tokens[:-1] + tokenize(_inflect_engine().plural_noun(tokens[-1])))
+        return variants
+
+    def _add(self, tokens: List[str], keyword: str):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(keyword)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> set:
+        """
+        Returns the set of keywords occurring in the text.
+        """
+        found = set()
+        state = 0
+        for token in tokenize(text):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            if self._output[state]:
+                found |= self._output[state]
+        return found
+
+
+@lru_cache(maxsize=1)
+def get_trend_keyword_matcher() -> KeywordMatcher:
+    # Built on first use, since building it loads inflect
+    return KeywordMatcher(TREND_KEYWORDS)
+
+
+def extract_clothing_types(description: str) -> List[str]:
+    """
+    Extracts the clothing types mentioned in a trend description, in TREND_KEYWORDS order.
+    """
+    found = get_trend_keyword_matcher().find(description or '')
+    return [keyword.capitalize() for keyword in TREND_KEYWORDS if keyword in found]
@@ -0,0 +1,83 @@
+# tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The modules live at the repository root and read their settings at import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_scratch = tempfile.mkdtemp(prefix="lazydrobe-tests-")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("AUTH_TOKEN_SECRET", "test-secret")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("EBAY_APP_ID", "test-app-id")
+# Keep the caches and the trained model out of the working tree
+os.environ.setdefault("CLASSIFICATION_CACHE_PATH", os.path.join(_scratch, "classification_cache.sqlite3"))
+os.environ.setdefault("PRODUCT_CLASSIFIER_PATH", os.path.join(_scratch, "product_classifier.joblib"))
+
+
+@pytest.fixture
+def api(tmp_path):
+    """A TestClient for the API on its own SQLite file, and the session factory to seed and inspect it."""
+    # Imported here, once the settings above are in place
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import main
+    from db import get_db
+    from models import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = get_test_db
+    yield TestClient(main.app), session_factory
+    main.app.dependency_overrides.clear()
+    engine.dispose()
+
+
+@pytest.fixture
+def async_api(tmp_path):
+    """A TestClient for the async routes alone on their own SQLite file, and a sync session factory to seed it."""
+    # SQLAlchemy's asyncio layer needs greenlet and the aiosqlite driver
+    pytest.importorskip("greenlet")
+    pytest.importorskip("aiosqlite")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from async_db import get_async_db
+    from async_routes import router
+    from models import Base
+
+    path = tmp_path / 'async_api.db'
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+    async def get_test_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    with TestClient(app) as client:
+        yield client, sessionmaker(bind=engine)
+        # Disposed on the client's event loop, where its connections were opened
+        client.portal.call(async_engine.dispose)
+    engine.dispose()
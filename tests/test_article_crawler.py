@@ -0,0 +1,71 @@
+# tests/test_article_crawler.py
+
+import asyncio
+import time
+
+from article_crawler import HostThrottle, fetch_article
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.status = 200
+        self.headers = {}
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+class FakeRequest:
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url
+
+    async def __aenter__(self):
+        self.session.sent.append((self.url, time.monotonic()))
+        await asyncio.sleep(self.session.latency.get(self.url, 0))
+        return FakeResponse(b"<html><body><p>" + self.url.encode() + b"</p></body></html>")
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    def __init__(self, latency=None):
+        self.latency = latency or {}
+        self.sent = []
+
+    def get(self, url):
+        return FakeRequest(self, url)
+
+
+def test_throttle_spaces_requests_to_one_host():
+    async def run():
+        throttle = HostThrottle(delay=0.1)
+        started = []
+        for host in ("a.example", "a.example", "b.example"):
+            await throttle.wait(host)
+            started.append(time.monotonic())
+        return started
+
+    first, second, other_host = asyncio.run(run())
+    assert second - first >= 0.1
+    assert other_host - second < 0.05
+
+
+def test_requests_queued_behind_the_semaphore_keep_the_host_delay():
+    # Two slow requests fill the semaphore; the two same-host requests queued behind them must not fire together
+    delay = 0.2
+    session = FakeSession(latency={"https://slow1.example/": 0.4, "https://slow2.example/": 0.4})
+
+    async def run():
+        semaphore = asyncio.Semaphore(2)
+        throttle = HostThrottle(delay)
+        urls = ["https://slow1.example/", "https://slow2.example/", "https://x.example/1", "https://x.example/2"]
+        return await asyncio.gather(*(fetch_article(session, url, semaphore, throttle, retries=0) for url in urls))
+
+    texts = asyncio.run(run())
+    assert texts[2] == "https://x.example/1"
+    sent = [at for url, at in session.sent if url.startswith("https://x.example/")]
+    assert len(sent) == 2
+    assert sent[1] - sent[0] >= delay
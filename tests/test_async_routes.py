@@ -0,0 +1,61 @@
+# tests/test_async_routes.py
+
+import pytest
+
+from auth_tokens import create_access_token
+from models import Location, User
+
+# SQLAlchemy's asyncio layer needs greenlet
+pytest.importorskip("greenlet")
+import async_routes  # noqa: E402
+
+
+@pytest.fixture
+def seeded(async_api, monkeypatch):
+    async def hash_password_async(password):
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(async_routes, "hash_password_async", hash_password_async)
+    client, session_factory = async_api
+    session = session_factory()
+    session.add(User(user_id=1, username="ada", email="ada@example.com", password="old", location="NYC"))
+    session.commit()
+    session.close()
+    return client, session_factory
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id)[0]}"}
+
+
+def test_update_user_hashes_the_new_password(seeded):
+    client, session_factory = seeded
+    response = client.put("/users/1", json={"password": "new-secret", "gender": "Female"}, headers=auth(1))
+    assert response.status_code == 200
+    assert response.json()["gender"] == "Female"
+
+    session = session_factory()
+    user = session.get(User, 1)
+    assert (user.password, user.gender) == ("hashed:new-secret", "Female")
+    session.close()
+
+
+def test_update_user_links_the_new_location(seeded, monkeypatch):
+    stored = []
+    monkeypatch.setattr(async_routes, "store_forecast", stored.append)
+    client, session_factory = seeded
+    assert client.put("/users/1", json={"location": "LA"}, headers=auth(1)).status_code == 200
+    assert stored == ["LA"]
+
+    session = session_factory()
+    user = session.get(User, 1)
+    assert user.location == "LA"
+    assert session.get(Location, user.location_id).canonical_name == "los angeles"
+    session.close()
+
+
+def test_update_user_needs_the_users_token(seeded):
+    client, _ = seeded
+    assert client.put("/users/1", json={"gender": "Female"}).status_code == 401
+    assert client.put("/users/1", json={"gender": "Female"}, headers=auth(2)).status_code == 403
+
@@ -0,0 +1,66 @@
+# tests/test_auth_tokens.py
+
+import asyncio
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import auth_tokens
+from auth_tokens import InvalidTokenError, authorize_user, create_access_token, decode_access_token, get_token_user_id
+
+
+def bearer(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_token_round_trip():
+    token, expires_at = create_access_token(42, ttl=60)
+    assert decode_access_token(token) == 42
+    claims = json.loads(base64.urlsafe_b64decode(token.split('.')[1] + '=='))
+    assert claims["sub"] == "42" and claims["exp"] == expires_at
+
+
+def test_expired_token_is_rejected():
+    token, _ = create_access_token(42, ttl=-1)
+    with pytest.raises(InvalidTokenError, match="expired"):
+        decode_access_token(token)
+
+
+def test_tampered_token_is_rejected():
+    header, _, signature = create_access_token(42)[0].split('.')
+    other_payload = create_access_token(1)[0].split('.')[1]
+    with pytest.raises(InvalidTokenError, match="signature"):
+        decode_access_token(f"{header}.{other_payload}.{signature}")
+
+
+@pytest.mark.parametrize("token", ["", "not-a-token", "a.b.c.d"])
+def test_malformed_token_is_rejected(token):
+    with pytest.raises(InvalidTokenError):
+        decode_access_token(token)
+
+
+def test_missing_token_is_rejected_when_required(monkeypatch):
+    monkeypatch.setattr(auth_tokens, "AUTH_REQUIRED", True)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_token_user_id(None))
+    assert error.value.status_code == 401
+
+
+def test_missing_token_is_allowed_when_not_required(monkeypatch):
+    monkeypatch.setattr(auth_tokens, "AUTH_REQUIRED", False)
+    assert asyncio.run(get_token_user_id(None)) is None
+    # A token that is sent is still checked
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_token_user_id(bearer("not-a-token")))
+    assert error.value.status_code == 401
+
+
+def test_authorize_user():
+    authorize_user(1, 1)
+    authorize_user(1, None)  # AUTH_REQUIRED disabled
+    with pytest.raises(HTTPException) as error:
+        authorize_user(1, 2)
+    assert error.value.status_code == 403
@@ -0,0 +1,93 @@
+# tests/test_bulk_ops.py
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import sessionmaker
+
+import bulk_ops
+from bulk_ops import chunk_rows, insert_ignore_duplicates, upsert_rows
+
+metadata = MetaData()
+items = Table(
+    "items", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("code", String(20), unique=True, nullable=False),
+    Column("name", String(50), nullable=False),
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def names(session) -> dict:
+    return dict(session.execute(select(items.c.code, items.c.name)).all())
+
+
+def test_chunk_rows_respects_batch_size_and_bind_limit(monkeypatch):
+    rows = [{"a": i, "b": i} for i in range(10)]
+    assert [len(chunk) for chunk in chunk_rows(rows, 4)] == [4, 4, 2]
+    monkeypatch.setattr(bulk_ops, "MAX_BIND_PARAMS", 6)  # 3 rows of 2 columns
+    assert [len(chunk) for chunk in chunk_rows(rows, 4)] == [3, 3, 3, 1]
+    assert chunk_rows([], 4) == []
+
+
+def test_insert_ignore_duplicates_skips_existing_keys(session):
+    assert insert_ignore_duplicates(session, items, [{"code": "a", "name": "first"}], ["code"]) == 1
+    inserted = insert_ignore_duplicates(session, items, [
+        {"code": "a", "name": "second"},
+        {"code": "b", "name": "new"},
+    ], ["code"])
+    assert inserted == 1
+    assert names(session) == {"a": "first", "b": "new"}
+
+
+def test_insert_ignore_duplicates_still_raises_other_errors(session):
+    with pytest.raises(Exception):
+        insert_ignore_duplicates(session, items, [{"code": "c", "name": None}], ["code"])
+
+
+def test_upsert_rows_updates_existing_keys(session):
+    upsert_rows(session, items, [{"code": "a", "name": "first"}], ["code"])
+    upsert_rows(session, items, [{"code": "a", "name": "second"}, {"code": "b", "name": "new"}], ["code"])
+    assert names(session) == {"a": "second", "b": "new"}
+
+
+class FakeMySQLSession:
+    """Stands in for a MySQL session: compiles and records statements, and reports one existing key."""
+
+    class Bind:
+        dialect = mysql.dialect()
+
+    class Result:
+        rowcount = 2
+
+        def scalar(self):
+            return 1
+
+    def __init__(self):
+        self.statements = []
+
+    def get_bind(self):
+        return self.Bind()
+
+    def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=mysql.dialect())))
+        return self.Result()
+
+
+def test_mysql_skips_duplicates_with_a_no_op_update():
+    session = FakeMySQLSession()
+    inserted = insert_ignore_duplicates(session, items, [{"code": "a", "name": "x"}, {"code": "b", "name": "y"}], ["code"])
+    # rowcount includes found duplicates under CLIENT_FOUND_ROWS, so the existing key is counted up front
+    assert inserted == 1
+    insert_sql = session.statements[-1]
+    assert "IGNORE" not in insert_sql
+    assert "ON DUPLICATE KEY UPDATE code = VALUES(code)" in insert_sql
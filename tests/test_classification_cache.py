@@ -0,0 +1,49 @@
+# tests/test_classification_cache.py
+
+import sqlite3
+
+from classification_cache import ClassificationCache, normalize_title
+
+
+def test_normalize_title_ignores_case_spacing_and_punctuation():
+    assert normalize_title("  Slim-Fit  DENIM jacket!! ") == normalize_title("slim fit denim jacket")
+
+
+def test_normalize_title_keeps_word_order():
+    assert normalize_title("Dress Shirt") != normalize_title("Shirt Dress")
+
+
+def test_normalize_title_keeps_sizes_and_numbers():
+    assert normalize_title("Linen Shirt S") == "linen shirt s"
+    assert normalize_title("Linen Shirt L") != normalize_title("Linen Shirt S")
+    assert normalize_title("501 Jeans") == "501 jeans"
+
+
+def test_cache_round_trip_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ClassificationCache(path).set('category', "Men's Wool Coat", 'Coat')
+    cache = ClassificationCache(path)
+    assert cache.get('category', "men's wool coat") == 'Coat'
+    assert cache.get('gender', "Men's Wool Coat") is None
+    assert cache.get_stats()['disk_hits'] == 1
+
+
+def test_get_or_compute_does_not_cache_failures(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "cache.sqlite3"))
+    calls = []
+    assert cache.get_or_compute('gender', "Tee", lambda title: calls.append(title)) is None
+    assert cache.get_or_compute('gender', "Tee", lambda title: calls.append(title) or 'Male') == 'Male'
+    assert cache.get_or_compute('gender', "Tee", lambda title: calls.append(title)) == 'Male'
+    assert len(calls) == 2
+
+
+def test_entries_keyed_by_the_old_normalization_are_dropped(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE product_classifications (kind TEXT NOT NULL, title_key TEXT NOT NULL,"
+                 " value TEXT NOT NULL, updated_at TEXT NOT NULL, PRIMARY KEY (kind, title_key))")
+    # The old key for "Shirt Dress" had its words sorted
+    conn.execute("INSERT INTO product_classifications VALUES ('category', 'dress shirt', 'Dress', '')")
+    conn.commit()
+    conn.close()
+    assert ClassificationCache(path).get('category', "Dress Shirt") is None
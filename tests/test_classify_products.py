@@ -0,0 +1,74 @@
+# tests/test_classify_products.py
+
+import pytest
+
+import fashion_trends
+import product_classifier
+from classification_cache import ClassificationCache
+
+
+@pytest.fixture
+def gpt(tmp_path, monkeypatch):
+    """Replaces the local cascade and every GPT-4 call with fakes that record what they were asked."""
+    calls = {'batch': [], 'category': [], 'gender': []}
+    local = {
+        "Blue Denim Jacket": ('Jacket', None),
+        "Women's Top": (None, 'Female'),
+    }
+    monkeypatch.setattr(fashion_trends, "classification_cache", ClassificationCache(str(tmp_path / "cache.sqlite3")))
+
+    def predict(field, name):
+        value = local.get(name, (None, None))[0 if field == 'category' else 1]
+        return value, product_classifier.SOURCE_RULES if value else None
+
+    monkeypatch.setattr(product_classifier, "predict", predict)
+
+    def batch(names, hints=None, fields=fashion_trends.CLASSIFICATION_FIELDS):
+        calls['batch'].append((list(names), fields))
+        # Garble every category, answer every gender
+        return {idx: {field: ('Male' if field == 'gender' else None) for field in fields} for idx in range(len(names))}
+
+    monkeypatch.setattr(fashion_trends, "classify_products_batch_gpt", batch)
+    monkeypatch.setattr(fashion_trends, "categorize_clothing_item_gpt",
+                        lambda name: calls['category'].append(name) or 'Shirt')
+    monkeypatch.setattr(fashion_trends, "determine_product_gender_gpt",
+                        lambda name: calls['gender'].append(name) or 'Male')
+    return calls
+
+
+def test_only_unresolved_fields_are_sent(gpt):
+    fashion_trends.classify_products(["Blue Denim Jacket", "Women's Top"])
+    assert sorted(gpt['batch'], key=repr) == sorted([
+        (["Blue Denim Jacket"], ('gender',)),
+        (["Women's Top"], ('category',)),
+    ], key=repr)
+
+
+def test_garbled_batch_retries_only_missing_fields(gpt):
+    result = fashion_trends.classify_products(["Blue Denim Jacket", "Women's Top", "Blue Denim Jacket"])
+    # The jacket's category came from the cascade, so only the top's category is retried
+    assert gpt['category'] == ["Women's Top"]
+    assert gpt['gender'] == []
+    assert [(item['category'], item['gender']) for item in result] == [
+        ('Jacket', 'Male'), ('Shirt', 'Female'), ('Jacket', 'Male')
+    ]
+
+
+def test_label_sources_are_reported(gpt):
+    jacket, top = fashion_trends.classify_products(["Blue Denim Jacket", "Women's Top"])
+    assert (jacket['category_source'], jacket['gender_source']) == ('rules', 'gpt')
+    assert (top['category_source'], top['gender_source']) == ('gpt', 'rules')
+
+
+def test_unclassified_gender_is_a_fallback(gpt, monkeypatch):
+    monkeypatch.setattr(fashion_trends, "classify_products_batch_gpt", lambda names, hints=None, fields=(): {})
+    monkeypatch.setattr(fashion_trends, "determine_product_gender_gpt", lambda name: None)
+    (item,) = fashion_trends.classify_products(["Plain Tee"])
+    assert (item['gender'], item['gender_source']) == ('Unisex', 'fallback')
+    assert (item['category'], item['category_source']) == ('Shirt', 'gpt')
+
+
+def test_titles_are_classified_once(gpt):
+    fashion_trends.classify_products(["Plain Tee", "Plain Tee"])
+    assert gpt['batch'] == [(["Plain Tee"], ('category', 'gender'))]
+    assert gpt['category'] == ["Plain Tee"]
@@ -0,0 +1,80 @@
+# tests/test_db.py
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import exc, text
+
+import db
+from async_db import get_async_db, to_async_url
+from db import PoolMetrics, create_db_engine, engine_options
+
+
+def test_sync_and_async_sessions_share_the_request_limit(monkeypatch):
+    monkeypatch.setattr(db, "DB_REQUEST_SESSIONS", 1)
+    monkeypatch.setattr(db, "DB_POOL_TIMEOUT", 0.1)
+    monkeypatch.setattr(db, "_request_sessions", None)
+
+    async def scenario():
+        sync_session = db.get_db()
+        await sync_session.__anext__()
+        # The async dependency waits for the same slot, before opening a session
+        with pytest.raises(HTTPException) as error:
+            await get_async_db().__anext__()
+        assert error.value.status_code == 503
+
+        await sync_session.aclose()
+        assert db._request_sessions.borrowed_tokens == 0
+
+    asyncio.run(scenario())
+
+
+def test_in_memory_sqlite_keeps_its_own_pool():
+    assert "pool_size" not in engine_options("sqlite://")
+    assert engine_options("mysql+pymysql://user:pw@host/db")["pool_size"] == db.DB_POOL_SIZE
+
+
+@pytest.mark.parametrize("database_url, expected", [
+    ("mysql+pymysql://user:pw@host/db", "mysql+aiomysql://user:pw@host/db"),
+    ("postgresql://user:pw@host/db", "postgresql+asyncpg://user:pw@host/db"),
+    ("sqlite:///app.db", "sqlite+aiosqlite:///app.db"),
+])
+def test_to_async_url(database_url, expected):
+    assert to_async_url(database_url) == expected
+
+
+def test_pool_metrics_snapshot():
+    metrics = PoolMetrics("test")
+    metrics.record_checkout(0.002, 1, 2)
+    metrics.record_checkout(0.004, 2, 2)
+    metrics.record_timeout(0.5)
+    assert metrics.snapshot() == {
+        "checkouts": 2,
+        "avg_wait_ms": 3.0,
+        "max_wait_ms": 500.0,
+        "saturated_checkouts": 1,
+        "timeouts": 1,
+        "peak_checked_out": 2,
+    }
+
+
+def test_instrumented_pool_records_checkouts_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(db, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(db, "DB_POOL_TIMEOUT", 0.1)
+    monkeypatch.setattr(db, "POOL_METRICS", {})
+    monkeypatch.setattr(db, "_instrumented_pools", {})
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_name="test")
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            stats = db.pool_stats()["test"]
+            assert (stats["size"], stats["checked_out"]) == (1, 1)
+        assert stats["checkouts"] == 1
+        assert stats["saturated_checkouts"] == 1
+        assert stats["timeouts"] == 1
+    finally:
+        engine.dispose()
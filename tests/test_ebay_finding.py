@@ -0,0 +1,62 @@
+# tests/test_ebay_finding.py
+
+import threading
+
+import ebay_finding
+from ebay_finding import EbayFindingError, search_items
+
+
+def fake_pages(total_pages: int, per_page: int, failing=(), empty_from=None):
+    """Returns a fetch_page stand-in serving numbered items, and the list of pages it was asked for."""
+    requested = []
+    lock = threading.Lock()
+
+    def fetch_page(app_id, params, page_number):
+        with lock:
+            requested.append(page_number)
+        if page_number in failing:
+            raise EbayFindingError("boom")
+        if empty_from is not None and page_number >= empty_from:
+            return [], total_pages
+        start = (page_number - 1) * per_page
+        return [{"n": n} for n in range(start, start + per_page)], total_pages
+
+    return fetch_page, requested
+
+
+def parse(item):
+    return item
+
+
+def test_results_are_in_page_order(monkeypatch):
+    fetch_page, requested = fake_pages(total_pages=5, per_page=10)
+    monkeypatch.setattr(ebay_finding, "fetch_page", fetch_page)
+    products = search_items("app", "coat", 45, parse, max_concurrency=4)
+    assert [p["n"] for p in products] == list(range(45))
+    assert sorted(requested) == [1, 2, 3, 4, 5]
+
+
+def test_only_pages_covering_the_limit_are_requested(monkeypatch):
+    fetch_page, requested = fake_pages(total_pages=50, per_page=10)
+    monkeypatch.setattr(ebay_finding, "fetch_page", fetch_page)
+    assert len(search_items("app", "coat", 25, parse)) == 25
+    assert sorted(requested) == [1, 2, 3]
+
+
+def test_max_pages_caps_the_walk(monkeypatch):
+    fetch_page, requested = fake_pages(total_pages=50, per_page=10)
+    monkeypatch.setattr(ebay_finding, "fetch_page", fetch_page)
+    assert len(search_items("app", "coat", 100, parse, max_pages=3)) == 30
+    assert max(requested) == 3
+
+
+def test_a_failed_page_stops_at_the_last_complete_page(monkeypatch):
+    fetch_page, _ = fake_pages(total_pages=5, per_page=10, failing={3})
+    monkeypatch.setattr(ebay_finding, "fetch_page", fetch_page)
+    assert [p["n"] for p in search_items("app", "coat", 50, parse)] == list(range(20))
+
+
+def test_an_empty_page_ends_the_results(monkeypatch):
+    fetch_page, _ = fake_pages(total_pages=5, per_page=10, empty_from=2)
+    monkeypatch.setattr(ebay_finding, "fetch_page", fetch_page)
+    assert len(search_items("app", "coat", 50, parse)) == 10
@@ -0,0 +1,31 @@
+# tests/test_embeddings.py
+
+import fashion_trends
+from fashion_trends import get_embeddings_batch, split_embedding_batches
+
+
+def test_split_embedding_batches_respects_token_budget():
+    texts = ["a" * 40] * 5  # 10 estimated tokens each
+    assert split_embedding_batches(texts, max_batch_tokens=25) == [[0, 1], [2, 3], [4]]
+
+
+def test_split_embedding_batches_respects_input_count():
+    assert split_embedding_batches(["a", "b", "c"], max_batch_size=2) == [[0, 1], [2]]
+
+
+def test_oversized_text_gets_its_own_batch():
+    assert split_embedding_batches(["a" * 400, "b"], max_batch_tokens=10) == [[0], [1]]
+
+
+def test_get_embeddings_batch_keeps_input_order(monkeypatch):
+    requests = []
+
+    def fake_embed_batch(texts):
+        requests.append(list(texts))
+        return [len(text) for text in texts]
+
+    monkeypatch.setattr(fashion_trends, "_embed_batch", fake_embed_batch)
+    monkeypatch.setattr(fashion_trends, "split_embedding_batches",
+                        lambda texts: split_embedding_batches(texts, max_batch_tokens=3))
+    assert get_embeddings_batch(["aaaa", "bbbbbbbb", "cc"]) == [4, 8, 2]
+    assert len(requests) == 2
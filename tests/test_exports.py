@@ -0,0 +1,55 @@
+# tests/test_exports.py
+
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from exports import stream_ndjson, suggestions_export_statement, wardrobe_export_statement
+from models import Base, OutfitSuggestion, User, WardrobeItem
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'exports.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    for user_id in (1, 2):
+        db.add(User(user_id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com", password="x"))
+    for item_id in range(1, 6):
+        db.add(WardrobeItem(item_id=item_id, user_id=1, clothing_type="Jeans", color=["blue"], tags=["casual"],
+                            date_added=datetime(2026, 1, item_id)))
+    db.add(WardrobeItem(item_id=6, user_id=2, clothing_type="Coat"))
+    for suggestion_id, day in [(1, 3), (2, 1), (3, 2)]:
+        db.add(OutfitSuggestion(suggestion_id=suggestion_id, user_id=1, outfit_details=[], gender="Unisex",
+                                date_suggested=datetime(2026, 1, day)))
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+
+def read_lines(chunks) -> list:
+    return [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+
+
+def test_wardrobe_export_streams_one_users_rows_in_batches(session_factory):
+    chunks = list(stream_ndjson(session_factory, wardrobe_export_statement(1), batch_size=2))
+    assert len(chunks) == 3
+
+    rows = read_lines(chunks)
+    assert [row['item_id'] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]['color'] == ["blue"]
+    assert rows[0]['date_added'] == "2026-01-01T00:00:00"
+
+
+def test_suggestions_export_is_newest_first(session_factory):
+    rows = read_lines(stream_ndjson(session_factory, suggestions_export_statement(1)))
+    assert [row['suggestion_id'] for row in rows] == [1, 3, 2]
+
+
+def test_empty_export_yields_nothing(session_factory):
+    assert list(stream_ndjson(session_factory, suggestions_export_statement(2))) == []
@@ -0,0 +1,85 @@
+# tests/test_forecast_cache.py
+
+import threading
+import time
+
+import pytest
+
+from weather_service import ForecastCache, WeatherServiceError
+
+FORECAST = [{'date': '2026-01-01', 'temp_max': 50.0}]
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ForecastCache(ttl=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.2)
+        return FORECAST
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("Boston", load))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [FORECAST] * 5
+    assert cache.get_stats()['coalesced'] == 4
+
+
+def test_locations_are_keyed_by_canonical_name():
+    cache = ForecastCache(ttl=60)
+    cache.get_or_load("New York", lambda: FORECAST)
+    assert cache.get_or_load("  new   YORK ", pytest.fail) == FORECAST
+
+
+def test_entries_expire_after_the_ttl():
+    cache = ForecastCache(ttl=0.1)
+    cache.get_or_load("Boston", lambda: FORECAST)
+    time.sleep(0.15)
+    calls = []
+    cache.get_or_load("Boston", lambda: calls.append(1) or FORECAST)
+    assert calls == [1]
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = ForecastCache(ttl=60)
+    started = threading.Event()
+
+    def failing_load():
+        started.set()
+        time.sleep(0.2)
+        raise WeatherServiceError(503, "Weather service unavailable.")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load("Boston", failing_load)
+        except WeatherServiceError as e:
+            errors.append(e.status_code)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+    assert errors == [503, 503]
+    assert cache.get_or_load("Boston", lambda: FORECAST) == FORECAST
+
+
+def test_empty_results_are_not_cached():
+    cache = ForecastCache(ttl=60)
+    cache.get_or_load("Boston", lambda: [])
+    assert cache.get("Boston") is None
+
+
+def test_callers_get_copies_of_the_cached_list():
+    cache = ForecastCache(ttl=60)
+    cache.get_or_load("Boston", lambda: list(FORECAST)).clear()
+    assert cache.get_or_load("Boston", pytest.fail) == FORECAST
@@ -0,0 +1,118 @@
+# tests/test_forecast_scheduler.py
+
+import threading
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import forecast_scheduler
+from db import AdvisoryLock
+from forecast_scheduler import ForecastScheduler, refresh_all_locations
+from locations import get_or_create_location
+from models import Base, User, WeatherData
+from weather_service import ForecastCache
+
+
+def forecast(location: str) -> list:
+    return [{'date': date(2026, 1, 1), 'location': location, 'temp_max': 50.0, 'temp_min': 40.0,
+             'feels_max': 48.0, 'feels_min': 38.0, 'wind_speed': 5.0, 'humidity': 60.0,
+             'precipitation': 0.0, 'precipitation_probability': 10.0,
+             'special_condition': 'clear sky', 'weather_icon': '01d'}]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # A file database, since the refresh opens a session per worker thread
+    engine = create_engine(f"sqlite:///{tmp_path / 'forecasts.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    for index, location in enumerate(["Boston", "NYC", "Paris"]):
+        location_id = get_or_create_location(db, location).location_id
+        if location != "Paris":  # No user lives in Paris, so it is not active
+            db.add(User(username=f"user{index}", email=f"user{index}@example.com", password="x",
+                        location=location, location_id=location_id))
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def forecast_cache(monkeypatch):
+    cache = ForecastCache(ttl=60)
+    monkeypatch.setattr(forecast_scheduler, "forecast_cache", cache)
+    return cache
+
+
+def test_refresh_all_locations_stores_active_locations(session_factory, forecast_cache, monkeypatch):
+    calls = []
+
+    def fetch(api_key, location):
+        calls.append(location)
+        if location == "NYC":
+            raise RuntimeError("quota exceeded")
+        return forecast(location)
+
+    monkeypatch.setattr(forecast_scheduler, "fetch_forecast_from_api", fetch)
+    summary = refresh_all_locations(session_factory, "key", concurrency=2, stagger=0)
+
+    assert sorted(calls) == ["Boston", "NYC"]
+    assert (summary['refreshed'], summary['failed']) == (1, 1)
+    db = session_factory()
+    assert [row.location for row in db.query(WeatherData).all()] == ["Boston"]
+    db.close()
+    assert forecast_cache.get("Boston") == forecast("Boston")
+    assert forecast_cache.get("NYC") is None
+
+
+def test_stop_event_interrupts_the_stagger(session_factory, forecast_cache, monkeypatch):
+    monkeypatch.setattr(forecast_scheduler, "fetch_forecast_from_api", lambda api_key, location: forecast(location))
+    stop_event = threading.Event()
+    stop_event.set()
+
+    summary = refresh_all_locations(session_factory, "key", stagger=60, stop_event=stop_event)
+    assert summary['refreshed'] == 0
+
+
+def test_sqlite_lock_is_always_acquired(session_factory):
+    lock = AdvisoryLock(session_factory.kw['bind'], "test_lock")
+    assert lock.acquire()
+    assert lock.acquire()
+    lock.release()
+
+
+def test_scheduler_stands_by_without_the_lock(session_factory, monkeypatch):
+    class HeldElsewhere:
+        def __init__(self):
+            self.checked = threading.Event()
+
+        def acquire(self):
+            self.checked.set()
+            return False
+
+        def release(self):
+            pass
+
+    refreshes = []
+    monkeypatch.setattr(forecast_scheduler, "refresh_all_locations", lambda *args: refreshes.append(args))
+    lock = HeldElsewhere()
+    scheduler = ForecastScheduler(session_factory, "key", interval=3600, lock=lock, lock_check_interval=60)
+    scheduler.start()
+    assert lock.checked.wait(5)
+    scheduler.stop(timeout=5)
+
+    assert refreshes == []
+    assert not scheduler._thread.is_alive()
+
+
+def test_scheduler_refreshes_while_holding_the_lock(session_factory, monkeypatch):
+    refreshed = threading.Event()
+    monkeypatch.setattr(forecast_scheduler, "refresh_all_locations", lambda *args: refreshed.set())
+    scheduler = ForecastScheduler(session_factory, "key", interval=3600, lock=AdvisoryLock(session_factory.kw['bind'], "test_lock"))
+    scheduler.start()
+    assert refreshed.wait(5)
+    scheduler.stop(timeout=5)
+    assert not scheduler._thread.is_alive()
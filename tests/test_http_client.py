@@ -0,0 +1,93 @@
+# tests/test_http_client.py
+
+import pytest
+import requests
+
+import http_client as http_client_module
+from http_client import HttpClient, _cap_timeout, backoff_delay
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Replays queued responses (or raises queued exceptions) and records each call's timeout."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.timeouts = []
+
+    def request(self, method, url, **kwargs):
+        self.timeouts.append(kwargs.get('timeout'))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(http_client_module.time, "sleep", lambda seconds: None)
+    return HttpClient(timeout=(1, 5), max_retries=2)
+
+
+def test_get_retries_server_errors_and_counts_them(client):
+    client.session = FakeSession([FakeResponse(503), FakeResponse(200)])
+    assert client.get("https://api.example/x").status_code == 200
+    stats = client.get_stats()["api.example"]
+    assert (stats['requests'], stats['errors'], stats['retries']) == (2, 1, 1)
+
+
+def test_post_is_not_retried_by_default(client):
+    client.session = FakeSession([FakeResponse(503), FakeResponse(200)])
+    assert client.request("POST", "https://api.example/x").status_code == 503
+
+
+def test_post_is_retried_when_asked(client):
+    client.session = FakeSession([FakeResponse(503), FakeResponse(200)])
+    assert client.request("POST", "https://api.example/x", retries=1).status_code == 200
+
+
+def test_connection_errors_raise_after_the_last_retry(client):
+    client.session = FakeSession([requests.exceptions.ConnectionError("down")] * 3)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get("https://api.example/x")
+    assert client.get_stats()["api.example"]['requests'] == 3
+
+
+def test_client_errors_are_not_retried(client):
+    client.session = FakeSession([FakeResponse(404), FakeResponse(200)])
+    assert client.get("https://api.example/x").status_code == 404
+
+
+def test_deadline_caps_each_attempts_timeout(client):
+    client.session = FakeSession([FakeResponse(200)])
+    client.get("https://api.example/x", deadline=0.5)
+    connect, read = client.session.timeouts[0]
+    assert connect <= 0.5 and read <= 0.5
+
+
+def test_expired_deadline_stops_retries(client, monkeypatch):
+    client.session = FakeSession([FakeResponse(503)] * 3)
+    monkeypatch.setattr(http_client_module, "backoff_delay", lambda attempt, retry_after=None: 10.0)
+    # The first retry would start after the deadline, so the 503 is returned as is
+    assert client.get("https://api.example/x", deadline=1).status_code == 503
+    assert len(client.session.timeouts) == 1
+
+
+def test_cap_timeout_handles_single_values_and_pairs():
+    assert _cap_timeout(5, 2) == 2
+    assert _cap_timeout((1, None), 2) == (1, 2)
+    assert _cap_timeout(None, 2) == 2
+
+
+def test_backoff_honours_retry_after_up_to_the_cap():
+    assert backoff_delay(0, "3") == 3.0
+    assert backoff_delay(0, "600") == http_client_module.BACKOFF_MAX
+    assert 0 <= backoff_delay(3) <= http_client_module.BACKOFF_MAX
@@ -0,0 +1,59 @@
+# tests/test_locations.py
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from locations import get_location, get_or_create_location, normalize_location
+from models import Base, Location, WeatherData
+from weather_service import save_forecast
+
+
+def forecast_day(day: date, temp_max: float, location: str) -> dict:
+    return {'date': day, 'location': location, 'temp_max': temp_max, 'temp_min': 40.0,
+            'feels_max': temp_max, 'feels_min': 38.0, 'wind_speed': 5.0, 'humidity': 60.0,
+            'precipitation': 0.0, 'precipitation_probability': 10.0,
+            'special_condition': 'clear sky', 'weather_icon': '01d'}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Boston", "boston"),
+    ("  New   York  ", "new york"),
+    ("NYC", "new york"),
+    ("Washington ,DC", "washington"),
+    ("Portland,  OR", "portland, or"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_location(raw, expected):
+    assert normalize_location(raw) == expected
+
+
+def test_aliases_share_one_location(db):
+    first = get_or_create_location(db, "New York City")
+    second = get_or_create_location(db, " nyc ")
+    db.commit()
+
+    assert first.location_id == second.location_id
+    assert first.display_name == "New York City"
+    assert db.query(Location).count() == 1
+    assert get_location(db, "NY").location_id == first.location_id
+
+
+def test_forecast_is_shared_across_spellings(db):
+    save_forecast(db, [forecast_day(date(2026, 1, 1), 50.0, location="NYC")])
+    save_forecast(db, [forecast_day(date(2026, 1, 1), 55.0, location="New York")])
+
+    rows = db.query(WeatherData).all()
+    assert [(row.location_ref.canonical_name, row.temp_max) for row in rows] == [("new york", 55.0)]
@@ -0,0 +1,63 @@
+# tests/test_outfit_suggester.py
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, EcommerceProduct, User
+
+# Needs openai and fal_client
+outfit_suggester = pytest.importorskip("outfit_suggester")
+
+
+class NoGenderQuery:
+    def query(self, *columns):
+        raise RuntimeError("no database")
+
+
+def test_lookups_past_the_deadline_are_skipped(monkeypatch):
+    release = threading.Event()
+
+    def lookup(product_name, limit, timeout):
+        if product_name == "Slow Coat":
+            release.wait(5)  # Ignores its timeout, like a stalled DNS lookup
+        return [f"https://ebay.example/{product_name}"]
+
+    monkeypatch.setattr(outfit_suggester, "fetch_similar_ebay_products", lookup)
+    monkeypatch.setattr(outfit_suggester, "SIMILAR_PRODUCTS_TIMEOUT", 0.3)
+    monkeypatch.setattr(outfit_suggester, "determine_product_gender_gpt_cached", lambda name: 'Unisex')
+    outfits = [[{'product_name': "Slow Coat", 'item_id': 1}, {'product_name': "Fast Jeans", 'item_id': 2}]]
+
+    start = time.monotonic()
+    try:
+        result = outfit_suggester.fetch_similar_products_for_outfits(outfits, NoGenderQuery())
+    finally:
+        release.set()
+
+    assert time.monotonic() - start < 2
+    assert result[0][0]['eBay_link'] == []
+    assert result[0][1]['eBay_link'] == ["https://ebay.example/Fast Jeans"]
+
+
+def test_select_relevant_clothing_items_uses_the_stored_category():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(user_id=1, username="user", email="user@example.com", password="x", gender="Female"))
+    for item_id, item_type, gender, category in [
+        ('1', 'jeans', 'Female', 'Bottom'),
+        ('2', 'jeans', 'Male', 'Bottom'),
+        ('3', 'boots', 'Unisex', 'Shoes'),
+        ('4', 'jeans', 'Female', None),  # Not mappable, so never used in an outfit
+    ]:
+        db.add(EcommerceProduct(ebay_item_id=item_id, product_name=f"Item {item_id}", suggested_item_type=item_type,
+                                price=10.0, currency='USD', product_url=f"https://example.com/{item_id}",
+                                gender=gender, category=category))
+    db.commit()
+
+    products = outfit_suggester.select_relevant_clothing_items(db, ["Jeans", "Boots"], 1)
+    assert sorted(product.ebay_item_id for product in products) == ['1', '3']
+    db.close()
@@ -0,0 +1,85 @@
+# tests/test_pagination.py
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import pagination
+from models import Base, FashionTrend
+from pagination import InvalidCursorError, decode_cursor, encode_cursor, paginate
+
+COLUMNS = [FashionTrend.date_added, FashionTrend.trend_id]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    # Several trends share a date, so the primary key has to break ties
+    for trend_id in range(1, 8):
+        session.add(FashionTrend(trend_id=trend_id, trend_name=f"Trend {trend_id}", trend_description="",
+                                 date_added=datetime(2026, 1, 1 + trend_id // 3)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 1, 2, 3, 4, 5), 42]
+    assert decode_cursor(encode_cursor(values), COLUMNS) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    encode_cursor([42]),                      # Wrong number of values
+    encode_cursor([42, 42]),                  # Integer for the timestamp
+    encode_cursor(["2026-01-01", "42"]),      # String for the integer
+    encode_cursor([None, 42]),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, COLUMNS)
+
+
+def test_pages_cover_every_row_once_in_order(db):
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = paginate(db.query(FashionTrend), COLUMNS, 3, cursor, descending=True)
+        seen += [row.trend_id for row in rows]
+        if cursor is None:
+            break
+    expected = [trend.trend_id for trend in
+                db.query(FashionTrend).order_by(FashionTrend.date_added.desc(), FashionTrend.trend_id.desc())]
+    assert seen == expected
+
+
+def test_last_page_has_no_cursor(db):
+    rows, cursor = paginate(db.query(FashionTrend), COLUMNS, 7)
+    assert len(rows) == 7
+    assert cursor is None
+
+
+def test_without_limit_or_cursor_every_row_is_returned(db, monkeypatch):
+    monkeypatch.setattr(pagination, "DEFAULT_PAGE_SIZE", 2)
+    rows, cursor = paginate(db.query(FashionTrend), COLUMNS)
+    assert len(rows) == 7
+    assert cursor is None
+
+
+def test_cursor_without_limit_uses_the_default_page_size(db, monkeypatch):
+    monkeypatch.setattr(pagination, "DEFAULT_PAGE_SIZE", 2)
+    _, cursor = paginate(db.query(FashionTrend), COLUMNS, 1)
+    rows, cursor = paginate(db.query(FashionTrend), COLUMNS, cursor=cursor)
+    assert [row.trend_id for row in rows] == [2, 3]
+    assert cursor is not None
+
+
+def test_limit_is_capped(db, monkeypatch):
+    monkeypatch.setattr(pagination, "MAX_PAGE_SIZE", 4)
+    rows, cursor = paginate(db.query(FashionTrend), COLUMNS, 100)
+    assert len(rows) == 4
+    assert cursor is not None
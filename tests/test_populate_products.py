@@ -0,0 +1,104 @@
+# tests/test_populate_products.py
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import fashion_trends
+from fashion_trends import SeenItemIds, classify_fetched_products, fetch_ebay_products_cached
+from models import Base, EcommerceProduct, FashionTrend
+
+
+def product(item_id: str) -> dict:
+    return {'ebay_item_id': item_id, 'product_name': f"Item {item_id}", 'price': 10.0,
+            'product_url': f"https://example.com/{item_id}", 'category_name': 'Coats'}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    fashion_trends.ebay_cache.clear()
+    yield
+    fashion_trends.ebay_cache.clear()
+
+
+def test_concurrent_misses_fetch_once(monkeypatch):
+    calls = []
+
+    def slow_fetch(search_query, limit, max_pages):
+        calls.append(search_query)
+        time.sleep(0.2)
+        return [product('1')]
+
+    monkeypatch.setattr(fashion_trends, "fetch_ebay_products", slow_fetch)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetch_ebay_products_cached("wool coat")))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ["wool coat"]
+    assert len(results) == 4 and all(result == [product('1')] for result in results)
+
+
+def test_a_failed_fetch_is_not_cached(monkeypatch):
+    outcomes = [RuntimeError("eBay down"), [product('1')]]
+
+    def fetch(search_query, limit, max_pages):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(fashion_trends, "fetch_ebay_products", fetch)
+    with pytest.raises(RuntimeError):
+        fetch_ebay_products_cached("wool coat")
+    assert fetch_ebay_products_cached("wool coat") == [product('1')]
+
+
+def test_callers_cannot_change_the_cache(monkeypatch):
+    monkeypatch.setattr(fashion_trends, "fetch_ebay_products", lambda *args: [product('1')])
+    fetch_ebay_products_cached("wool coat")[0]['gender'] = 'Male'
+    assert 'gender' not in fetch_ebay_products_cached("wool coat")[0]
+
+
+def test_classify_fetched_products_leaves_its_input_unchanged(monkeypatch):
+    monkeypatch.setattr(fashion_trends, "classify_products", lambda names, hints: [
+        {'category': 'Coat', 'gender': 'Male', 'category_source': 'gpt', 'gender_source': 'rules'}
+    ] * len(names))
+    products = [product('1')]
+    (classified,) = classify_fetched_products(products)
+    assert products == [product('1')]
+    assert 'category_name' not in classified
+    assert (classified['suggested_item_type'], classified['gender']) == ('Coat', 'Male')
+
+
+def test_ids_are_only_recorded_after_a_successful_insert(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'populate.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    first = FashionTrend(trend_name="Coats", trend_description="Coats", trend_search_phrase="wool coat")
+    second = FashionTrend(trend_name="Outerwear", trend_description="Outerwear", trend_search_phrase="long coat")
+    db.add_all([first, second])
+    db.commit()
+
+    shared = [{**product('1'), 'category_name': None}]
+    monkeypatch.setattr(fashion_trends, "fetch_ebay_products_cached", lambda *args, **kwargs: [dict(p) for p in shared])
+    real_ingest = fashion_trends.ingest_products
+    failures = [RuntimeError("insert failed")]
+
+    def flaky_ingest(session, products):
+        if failures:
+            raise failures.pop()
+        return real_ingest(session, products)
+
+    monkeypatch.setattr(fashion_trends, "ingest_products", flaky_ingest)
+    seen_ids = SeenItemIds()
+    assert fashion_trends.fetch_and_insert_trend_products(db, first, seen_ids=seen_ids)['inserted'] == 0
+    assert fashion_trends.fetch_and_insert_trend_products(db, second, seen_ids=seen_ids)['inserted'] == 1
+    assert db.query(EcommerceProduct).count() == 1
+    db.close()
+    engine.dispose()
@@ -0,0 +1,53 @@
+# tests/test_product_classifier.py
+
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import product_classifier
+from models import Base, EcommerceProduct
+
+
+def test_rules_resolve_explicit_titles():
+    assert product_classifier.predict('gender', "Men's Wool Coat") == ('Male', 'rules')
+    assert product_classifier.predict('category', "Slim Fit Denim Jacket") == ('Denim Jacket', 'rules')
+
+
+def test_ambiguous_titles_are_left_to_gpt():
+    assert product_classifier.predict('gender', "Men's and Women's Socks") == (None, None)
+    assert product_classifier.predict_category("Vintage Style Thing") is None
+
+
+def test_model_path_is_relative_to_the_project():
+    assert os.path.isabs(product_classifier.PRODUCT_CLASSIFIER_PATH)
+
+
+def test_training_data_only_uses_gpt_and_human_labels(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'products.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    rows = [
+        ("GPT labelled", 'Jacket', 'Male', 'gpt', 'gpt'),
+        ("Human labelled", 'Jeans', 'Female', 'human', 'human'),
+        ("Rule labelled", 'Coat', 'Male', 'rules', 'model'),
+        ("Fallback gender", 'Shirt', 'Unisex', 'gpt', 'fallback'),
+        ("Unknown source", 'Skirt', 'Female', None, None),
+    ]
+    for idx, (name, category, gender, category_source, gender_source) in enumerate(rows):
+        session.add(EcommerceProduct(
+            ebay_item_id=str(idx), product_name=name, suggested_item_type=category, gender=gender,
+            category_source=category_source, gender_source=gender_source,
+            price=1.0, currency='USD', product_url=f"https://example.com/{idx}"
+        ))
+    session.commit()
+    session.close()
+    engine.dispose()
+
+    assert sorted(product_classifier.load_training_data(database_url)) == sorted([
+        ("GPT labelled", 'Jacket', 'Male'),
+        ("Human labelled", 'Jeans', 'Female'),
+        ("Fallback gender", 'Shirt', None),
+    ])
+    assert ("Unknown source", 'Skirt', 'Female') in product_classifier.load_training_data(database_url, include_unknown=True)
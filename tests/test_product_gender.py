@@ -0,0 +1,39 @@
+# tests/test_product_gender.py
+
+import pytest
+
+import product_gender
+from classification_cache import ClassificationCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ClassificationCache(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(product_gender, "classification_cache", cache)
+    return cache
+
+
+def test_local_rules_skip_gpt(cache, monkeypatch):
+    monkeypatch.setattr(product_gender, "determine_product_gender_gpt", pytest.fail)
+    assert product_gender.determine_product_gender_gpt_cached("Women's Linen Blouse") == 'Female'
+
+
+def test_gpt_result_is_cached(cache, monkeypatch):
+    calls = []
+    monkeypatch.setattr(product_gender, "determine_product_gender_gpt", lambda name: calls.append(name) or 'Male')
+    assert product_gender.determine_product_gender_gpt_cached("Plain Crew Tee") == 'Male'
+    assert product_gender.determine_product_gender_gpt_cached("Plain Crew Tee") == 'Male'
+    assert calls == ["Plain Crew Tee"]
+
+
+def test_failed_lookup_falls_back_to_unisex_and_is_retried(cache, monkeypatch):
+    calls = []
+    monkeypatch.setattr(product_gender, "determine_product_gender_gpt", lambda name: calls.append(name))
+    assert product_gender.determine_product_gender_gpt_cached("Plain Crew Tee") == 'Unisex'
+    assert product_gender.determine_product_gender_gpt_cached("Plain Crew Tee") == 'Unisex'
+    assert len(calls) == 2
+
+
+def test_outfit_suggester_shares_the_helper():
+    outfit_suggester = pytest.importorskip("outfit_suggester")
+    assert outfit_suggester.determine_product_gender_gpt_cached is product_gender.determine_product_gender_gpt_cached
@@ -0,0 +1,47 @@
+# tests/test_product_ingest.py
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, EcommerceProduct
+from product_ingest import ingest_products
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def product(item_id: str, **values) -> dict:
+    return {'ebay_item_id': item_id, 'product_name': f"Item {item_id}", 'price': 10.0,
+            'product_url': f"https://example.com/{item_id}", **values}
+
+
+def test_missing_gender_is_stored_as_a_fallback(session):
+    ingest_products(session, [
+        product('1', suggested_item_type='Jacket', gender='Male', category_source='gpt', gender_source='rules'),
+        product('2', suggested_item_type='Jeans'),
+    ])
+    stored = {p.ebay_item_id: p for p in session.query(EcommerceProduct)}
+    assert (stored['1'].gender, stored['1'].category_source, stored['1'].gender_source) == ('Male', 'gpt', 'rules')
+    assert (stored['2'].gender, stored['2'].gender_source) == ('Unisex', 'fallback')
+    assert stored['2'].category_source is None
+
+
+def test_ingest_skips_existing_and_repeated_items(session):
+    assert ingest_products(session, [product('1'), product('2'), product('1')]) == {'inserted': 2, 'skipped': 1}
+    assert ingest_products(session, [product('2'), product('3')]) == {'inserted': 1, 'skipped': 1}
+    assert session.query(EcommerceProduct).count() == 3
+
+
+
+def test_ingest_computes_the_general_category(session):
+    ingest_products(session, [product('1', suggested_item_type='Jeans'), product('2', suggested_item_type='Sundial')])
+    stored = dict(session.query(EcommerceProduct.ebay_item_id, EcommerceProduct.category))
+    assert stored == {'1': 'Bottom', '2': None}
@@ -0,0 +1,127 @@
+# tests/test_query_plans.py
+#
+# Runs EXPLAIN QUERY PLAN on SQLite for the application's hot queries and fails if any of them falls
+# back to a full table scan. The schema is built by the Alembic migrations, so a model index that no
+# migration creates does not hide a missing one. Paginated listings are built with
+# pagination._keyset_query, first page and cursor page, so the plans are those of the real SQL;
+# they also fail if the page has to be sorted instead of read in index order.
+
+import os
+import re
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Query, Session, sessionmaker
+
+from models import (
+    EcommerceProduct,
+    FashionTrend,
+    Location,
+    Outfit,
+    OutfitSuggestion,
+    User,
+    WardrobeItem,
+    WeatherData,
+)
+from pagination import DEFAULT_PAGE_SIZE, _keyset_query, encode_cursor
+from taxonomy import CATEGORIES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 'SCAN wardrobe_items' (or 'SCAN TABLE wardrobe_items' on SQLite < 3.36) without an index
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+# A keyset page should be read in index order; sorting means reading every matching row first
+SORT_PATTERN = re.compile(r"^USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY$")
+
+# Filters used by main.py, outfit_suggester.py and weather_service.py
+HOT_QUERIES = {
+    # Only the key is selected: users.height and users.weight are not created by any migration yet
+    "user by email": lambda db: db.query(User.user_id).filter(User.email == 'user@example.com'),
+    "delete outfit suggestions by user": lambda db: db.query(OutfitSuggestion).filter(OutfitSuggestion.user_id == 1),
+    "products by item type and gender": lambda db: db.query(EcommerceProduct).filter(
+        EcommerceProduct.suggested_item_type.in_(['jacket', 'jeans']),
+        EcommerceProduct.gender.in_(['Female', 'Unisex'])
+    ),
+    "outfit candidate products": lambda db: db.query(EcommerceProduct).filter(
+        EcommerceProduct.category.in_(CATEGORIES),
+        EcommerceProduct.gender.in_(['Female', 'Unisex']),
+        EcommerceProduct.suggested_item_type.in_(['jacket', 'jeans'])
+    ).order_by(EcommerceProduct.category),
+    "stored forecast by location": lambda db: db.query(WeatherData).join(Location).filter(
+        Location.canonical_name == 'new york',
+        WeatherData.date >= datetime(2024, 1, 1)
+    ).order_by(WeatherData.date).limit(5),
+    "latest weather by location id": lambda db: db.query(WeatherData).filter(
+        WeatherData.location_id == 1
+    ).order_by(WeatherData.date.desc()).limit(1),
+}
+
+# Sort keys of the paginated listings in main.py and async_routes.py, with a cursor for their second page
+LISTINGS = {
+    "wardrobe items by user": (lambda db: db.query(WardrobeItem).filter(WardrobeItem.user_id == 1),
+                               [WardrobeItem.item_id], [50], False),
+    "outfits by user": (lambda db: db.query(Outfit).filter(Outfit.user_id == 1),
+                        [Outfit.outfit_id], [50], False),
+    "outfit suggestions by user": (lambda db: db.query(OutfitSuggestion).filter(OutfitSuggestion.user_id == 1),
+                                   [OutfitSuggestion.date_suggested, OutfitSuggestion.suggestion_id],
+                                   [datetime(2024, 1, 1), 50], True),
+    "fashion trends": (lambda db: db.query(FashionTrend),
+                       [FashionTrend.date_added, FashionTrend.trend_id], [datetime(2024, 1, 1), 50], True),
+}
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    database_url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("DATABASE_URL", database_url)
+        config = Config(os.path.join(ROOT, "alembic.ini"))
+        config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+        command.upgrade(config, "head")
+    engine = create_engine(database_url)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def keyset_page(query: Query, columns: Sequence[Any], cursor_values: Optional[Sequence[Any]] = None,
+                descending: bool = False) -> Query:
+    """
+    Builds the query paginate() runs for a page; with cursor_values, the page after that sort key,
+    including the OR-expanded cursor predicate.
+    """
+    cursor = encode_cursor(cursor_values) if cursor_values else None
+    return _keyset_query(query, columns, DEFAULT_PAGE_SIZE, cursor, descending)
+
+
+def explain(db: Session, query: Query) -> List[str]:
+    """
+    Returns the detail column of SQLite's EXPLAIN QUERY PLAN for a query.
+    """
+    sql = str(query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    return [match.group(1) for match in map(FULL_SCAN_PATTERN.match, plan) if match]
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_an_index(db, name):
+    plan = explain(db, HOT_QUERIES[name](db))
+    assert full_scans(plan) == [], plan
+
+
+@pytest.mark.parametrize("page", ["first", "next"])
+@pytest.mark.parametrize("name", LISTINGS)
+def test_listing_page_is_read_in_index_order(db, name, page):
+    build_query, columns, cursor_values, descending = LISTINGS[name]
+    query = keyset_page(build_query(db), columns, cursor_values if page == "next" else None, descending)
+    plan = explain(db, query)
+    assert full_scans(plan) == [], plan
+    assert not any(SORT_PATTERN.match(detail) for detail in plan), plan
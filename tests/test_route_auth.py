@@ -0,0 +1,79 @@
+# tests/test_route_auth.py
+#
+# Routes that read or write a user's rows must reject requests without that user's token, in both the
+# sync routes of main.py and their async versions in async_routes.py.
+
+import pytest
+
+from auth_tokens import create_access_token
+from models import Outfit, OutfitSuggestion, User, WardrobeItem
+
+OWNER, OTHER = 1, 2
+
+# (method, path, JSON body) of every route that loads a user-owned row by its ID, or takes a user ID
+ROUTES = [
+    ("GET", "/wardrobe_item/1", None),
+    ("PUT", "/wardrobe_item/1", {"color": ["red"]}),
+    ("DELETE", "/wardrobe_item/", {"item_ids": [1]}),
+    ("GET", "/outfit/1", None),
+    ("PUT", "/outfit/1", {"occasion": ["formal"]}),
+    ("DELETE", "/outfit/1", None),
+    ("DELETE", f"/outfits/suggestions/all?user_id={OWNER}", None),
+    ("DELETE", "/outfits/suggestions/", {"suggestion_id": [1]}),
+]
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id)[0]}"}
+
+
+def seed(session_factory):
+    db = session_factory()
+    for user_id in (OWNER, OTHER):
+        db.add(User(user_id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com", password="x"))
+    db.add(WardrobeItem(item_id=1, user_id=OWNER, clothing_type="Jeans", for_weather="All Year Around", color=["blue"],
+                        size="M", tags=["casual"]))
+    db.add(WardrobeItem(item_id=2, user_id=OTHER, clothing_type="Coat"))
+    db.add(Outfit(outfit_id=1, user_id=OWNER, occasion=["casual"], clothings=[1]))
+    db.add(OutfitSuggestion(suggestion_id=1, user_id=OWNER, outfit_details=[], gender="Unisex"))
+    db.add(OutfitSuggestion(suggestion_id=2, user_id=OTHER, outfit_details=[], gender="Unisex"))
+    db.commit()
+    db.close()
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request):
+    client, session_factory = request.getfixturevalue("api" if request.param == "sync" else "async_api")
+    seed(session_factory)
+    return client, session_factory
+
+
+@pytest.mark.parametrize("method, path, body", ROUTES)
+def test_route_needs_a_token(client, method, path, body):
+    client, _ = client
+    assert client.request(method, path, json=body).status_code == 401
+
+
+@pytest.mark.parametrize("method, path, body", ROUTES)
+def test_route_rejects_another_users_token(client, method, path, body):
+    client, _ = client
+    assert client.request(method, path, json=body, headers=auth(OTHER)).status_code == 403
+
+
+@pytest.mark.parametrize("method, path, body", ROUTES)
+def test_route_accepts_the_owners_token(client, method, path, body):
+    client, _ = client
+    assert client.request(method, path, json=body, headers=auth(OWNER)).status_code in (200, 204)
+
+
+@pytest.mark.parametrize("path, body, model", [
+    ("/wardrobe_item/", {"item_ids": [1, 2]}, WardrobeItem),
+    ("/outfits/suggestions/", {"suggestion_id": [1, 2]}, OutfitSuggestion),
+])
+def test_bulk_delete_with_another_users_row_deletes_nothing(client, path, body, model):
+    client, session_factory = client
+    assert client.request("DELETE", path, json=body, headers=auth(OWNER)).status_code == 403
+
+    db = session_factory()
+    assert db.query(model).count() == 2
+    db.close()
@@ -0,0 +1,32 @@
+# tests/test_startup.py
+#
+# The API process should not pay for the trend pipeline or the GPT and image clients until a route uses them.
+# Each check runs in a fresh interpreter, since other tests import these modules.
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['fashion_trends', 'outfit_suggester', 'numpy', 'sklearn', 'openai', 'fal_client', 'inflect', 'spacy']
+
+
+def loaded_after_import(statement: str) -> list:
+    check = f"import sys; {statement}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, env=os.environ.copy(),
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    output = result.stdout.strip().splitlines()
+    return output[-1].split(',') if output and output[-1] else []
+
+
+def test_importing_the_app_loads_no_heavy_modules():
+    assert loaded_after_import("import main") == []
+
+
+@pytest.mark.parametrize("module", ["taxonomy", "fashion_trends"])
+def test_heavy_libraries_load_on_first_use(module):
+    loaded = loaded_after_import(f"import {module}")
+    assert not set(loaded) & {'numpy', 'sklearn', 'openai', 'inflect', 'spacy'}, loaded
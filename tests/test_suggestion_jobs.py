@@ -0,0 +1,142 @@
+# tests/test_suggestion_jobs.py
+
+import sys
+import threading
+import types
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, SuggestionJob, User
+from suggestion_jobs import FAILED, PENDING, RUNNING, SUCCEEDED, SuggestionJobLimitError, SuggestionJobManager
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(User(user_id=1, username="user", email="user@example.com", password="x"))
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def release(monkeypatch):
+    """Stands in for outfit_suggester; suggestions block until the event is set."""
+    event = threading.Event()
+
+    def suggest_outfits(user_id, db):
+        event.wait(5)
+        return types.SimpleNamespace(suggestion_id=None)
+
+    monkeypatch.setitem(sys.modules, "outfit_suggester", types.SimpleNamespace(suggest_outfits=suggest_outfits))
+    yield event
+    event.set()
+
+
+def add_job(db, job_id: str, status: str, age: timedelta, finished: bool = False, heartbeat: bool = False):
+    created_at = datetime.utcnow() - age
+    db.add(SuggestionJob(job_id=job_id, user_id=1, status=status, created_at=created_at,
+                         heartbeat_at=created_at if heartbeat else None,
+                         finished_at=created_at if finished else None))
+
+
+def test_jobs_per_user_are_capped(session_factory, release):
+    manager = SuggestionJobManager(session_factory, max_workers=1, max_per_user=2)
+    db = session_factory()
+    manager.submit(db, 1)
+    manager.submit(db, 1)
+    with pytest.raises(SuggestionJobLimitError) as error:
+        manager.submit(db, 1)
+    assert error.value.status_code == 429
+    db.close()
+    release.set()
+    manager.shutdown(wait=True)
+
+
+def test_queue_is_capped_per_worker(session_factory, release):
+    manager = SuggestionJobManager(session_factory, max_workers=1, max_queue=1, max_per_user=10)
+    db = session_factory()
+    manager.submit(db, 1)
+    with pytest.raises(SuggestionJobLimitError) as error:
+        manager.submit(db, 1)
+    assert error.value.status_code == 503
+    release.set()
+    for _ in range(50):
+        if not manager._active:
+            break
+        threading.Event().wait(0.1)
+
+    # The slot is released once the job finishes
+    assert manager.submit(db, 1).status == PENDING
+    db.close()
+    manager.shutdown(wait=True)
+
+
+def test_finished_job_is_recorded(session_factory, release):
+    release.set()
+    manager = SuggestionJobManager(session_factory, max_workers=1)
+    db = session_factory()
+    job_id = manager.submit(db, 1).job_id
+    manager.shutdown(wait=True)
+    db.expire_all()
+    assert manager.get(db, job_id).status == SUCCEEDED
+    db.close()
+
+
+def test_sweep_fails_orphans_and_purges_expired_jobs(session_factory):
+    manager = SuggestionJobManager(session_factory, ttl=3600, sweep_interval=60)
+    db = session_factory()
+    add_job(db, "expired", SUCCEEDED, timedelta(hours=2), finished=True)
+    add_job(db, "recent", SUCCEEDED, timedelta(minutes=5), finished=True)
+    add_job(db, "orphaned", RUNNING, timedelta(minutes=10), heartbeat=True)
+    add_job(db, "alive", PENDING, timedelta(minutes=1), heartbeat=True)
+    db.commit()
+
+    manager.sweep()
+    db.expire_all()
+    jobs = {job.job_id: job for job in db.query(SuggestionJob).all()}
+    assert sorted(jobs) == ["alive", "orphaned", "recent"]
+    assert (jobs["orphaned"].status, jobs["orphaned"].error_status) == (FAILED, 500)
+    assert jobs["alive"].status == PENDING
+    db.close()
+
+
+def test_sweep_keeps_this_workers_jobs_alive(session_factory):
+    manager = SuggestionJobManager(session_factory, sweep_interval=60)
+    db = session_factory()
+    add_job(db, "queued", PENDING, timedelta(minutes=10), heartbeat=True)
+    db.commit()
+    manager._active.add("queued")
+
+    manager.sweep()
+    db.expire_all()
+    job = manager.get(db, "queued")
+    assert job.status == PENDING
+    assert job.heartbeat_at > datetime.utcnow() - timedelta(minutes=1)
+    db.close()
+
+
+def test_start_sweeps_immediately(session_factory):
+    db = session_factory()
+    add_job(db, "orphaned", RUNNING, timedelta(days=1))
+    db.commit()
+
+    manager = SuggestionJobManager(session_factory, sweep_interval=3600)
+    manager.start()
+    try:
+        for _ in range(50):
+            db.rollback()  # Ends the read transaction, so the sweep can write
+            if manager.get(db, "orphaned").status == FAILED:
+                break
+            threading.Event().wait(0.1)
+        assert manager.get(db, "orphaned").status == FAILED
+    finally:
+        manager.shutdown()
+        db.close()
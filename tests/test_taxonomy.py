@@ -0,0 +1,46 @@
+# tests/test_taxonomy.py
+
+import pytest
+
+from taxonomy import KeywordMatcher, extract_clothing_types, map_product_to_category
+
+
+@pytest.mark.parametrize("item_type, expected", [
+    ("Jeans", "Bottom"),
+    ("  T-Shirt ", "Top"),
+    ("Jackets", "Outerwear"),
+    ("Thermal Wear", "Top"),  # Listed under Top and Bottom; the first category wins
+    ("Jumpsuit", "Bottom"),   # Listed under Bottom and Set
+    ("Dress", "Set"),
+    ("Sundial", None),
+])
+def test_map_product_to_category(item_type, expected):
+    assert map_product_to_category(item_type) == expected
+
+
+def test_matcher_finds_whole_words_only():
+    matcher = KeywordMatcher(['set', 'coat'])
+    assert matcher.find("A sunset over the coatroom") == set()
+    assert matcher.find("a matching set and a long coat") == {'set', 'coat'}
+
+
+def test_matcher_finds_plurals_of_single_words():
+    matcher = KeywordMatcher(['jacket', 'tank top', 'jeans'])
+    assert matcher.find("Jackets, tank tops and jeans") == {'jacket', 'tank top', 'jeans'}
+
+
+def test_matcher_finds_overlapping_phrases():
+    matcher = KeywordMatcher(['suit set', 'set', 'complete suit'])
+    assert matcher.find("the complete suit set is back") == {'complete suit', 'suit set', 'set'}
+
+
+def test_matcher_recovers_after_a_partial_match():
+    matcher = KeywordMatcher(['heavy boots', 'boots'])
+    assert matcher.find("heavy rain boots") == {'boots'}
+    assert matcher.find("heavy heavy boots") == {'heavy boots', 'boots'}
+
+
+def test_extract_clothing_types_keeps_keyword_order():
+    description = "Layer a chunky sweater over a slip dress, finished with heavy boots."
+    assert extract_clothing_types(description) == ['Sweater', 'Dress', 'Boots', 'Heavy boots']
+    assert extract_clothing_types(None) == []
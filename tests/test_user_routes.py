@@ -0,0 +1,103 @@
+# tests/test_user_routes.py
+
+import asyncio
+import threading
+
+import pytest
+
+import main
+from auth_tokens import create_access_token
+from models import User
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    """Replaces the bcrypt pool; records the thread each hash was awaited on."""
+    threads = []
+
+    async def hash_password_async(password):
+        asyncio.get_running_loop()  # Raises unless awaited on the event loop
+        threads.append(threading.current_thread().name)
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(main, "hash_password_async", hash_password_async)
+    return threads
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id)[0]}"}
+
+
+def test_create_user_hashes_without_a_request_thread(api, hashes):
+    client, session_factory = api
+    response = client.post("/users/", json={"username": "ada", "email": "ada@example.com",
+                                            "password": "secret", "location": "NYC"})
+    assert response.status_code == 201
+    assert len(hashes) == 1
+    assert not hashes[0].startswith("AnyIO worker")
+
+    db = session_factory()
+    user = db.query(User).filter(User.email == "ada@example.com").one()
+    assert user.password == "hashed:secret"
+    assert user.location_ref.canonical_name == "new york"
+    db.close()
+
+
+def test_create_user_rejects_a_taken_email(api, hashes):
+    client, session_factory = api
+    db = session_factory()
+    db.add(User(username="ada", email="ada@example.com", password="x", location="NYC"))
+    db.commit()
+    db.close()
+
+    response = client.post("/users/", json={"username": "ada", "email": "ada@example.com",
+                                            "password": "secret", "location": "NYC"})
+    assert response.status_code == 400
+    assert hashes == []
+
+
+def test_update_user_hashes_the_new_password(api, hashes):
+    client, session_factory = api
+    db = session_factory()
+    db.add(User(user_id=1, username="ada", email="ada@example.com", password="old", location="NYC"))
+    db.commit()
+    db.close()
+
+    response = client.put("/users/1", json={"password": "new-secret", "gender": "Female"}, headers=auth(1))
+    assert response.status_code == 200
+    assert len(hashes) == 1
+
+    db = session_factory()
+    user = db.get(User, 1)
+    assert (user.password, user.gender) == ("hashed:new-secret", "Female")
+    db.close()
+
+
+def test_update_user_without_a_password_skips_hashing(api, hashes):
+    client, session_factory = api
+    db = session_factory()
+    db.add(User(user_id=1, username="ada", email="ada@example.com", password="old", location="NYC"))
+    db.commit()
+    db.close()
+
+    assert client.put("/users/1", json={"username": "ada l."}, headers=auth(1)).status_code == 200
+    assert hashes == []
+
+
+def test_login_returns_a_token_for_the_users_routes(api, monkeypatch):
+    async def verify_and_update_async(password, stored_hash):
+        return password == "secret", None
+
+    monkeypatch.setattr(main, "verify_and_update_async", verify_and_update_async)
+    client, session_factory = api
+    db = session_factory()
+    db.add(User(user_id=1, username="ada", email="ada@example.com", password="hash", location="NYC"))
+    db.commit()
+    db.close()
+
+    assert client.post("/login", json={"email": "ada@example.com", "password": "wrong"}).status_code == 400
+    response = client.post("/login", json={"email": "ada@example.com", "password": "secret"})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/users/1", headers=headers).status_code == 200
+    assert client.get("/users/2", headers=headers).status_code == 403
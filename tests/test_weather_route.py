@@ -0,0 +1,55 @@
+# tests/test_weather_route.py
+
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import main
+from auth_tokens import create_access_token
+from models import User, WeatherData
+
+
+def forecast(days: int = 3) -> list:
+    return [{'date': date(2026, 1, 1) + timedelta(days=offset), 'location': "NYC", 'temp_max': 50.0,
+             'temp_min': 40.0, 'feels_max': 50.0, 'feels_min': 38.0, 'wind_speed': 5.0, 'humidity': 60.0,
+             'precipitation': 0.0, 'precipitation_probability': 10.0, 'special_condition': 'clear sky',
+             'weather_icon': '01d'} for offset in range(days)]
+
+
+def test_fetched_forecast_is_stored_on_a_session_of_its_own(api, monkeypatch):
+    client, session_factory = api
+    db = session_factory()
+    db.add(User(user_id=1, username="ada", email="ada@example.com", password="x", location="NYC"))
+    db.commit()
+    db.close()
+
+    request_sessions = []
+    task_sessions = []
+
+    def get_forecast(db, location, api_key, on_fetched):
+        request_sessions.append(db)
+        on_fetched(forecast())
+        return forecast()
+
+    @contextmanager
+    def session_scope():
+        session = session_factory()
+        task_sessions.append(session)
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setenv("VISUAL_CROSSING_API_KEY", "test-key")
+    monkeypatch.setattr(main, "get_forecast", get_forecast)
+    monkeypatch.setattr(main, "session_scope", session_scope)
+
+    token = create_access_token(1)[0]
+    response = client.post("/weather/", json={"user_id": 1}, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+    # The background task ran after the request's session was closed, on a new one
+    assert len(task_sessions) == 1 and task_sessions[0] is not request_sessions[0]
+    db = session_factory()
+    assert db.query(WeatherData).count() == 3
+    db.close()
@@ -0,0 +1,65 @@
+# tests/test_weather_service.py
+
+import os
+from datetime import date
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, WeatherData
+from weather_service import save_forecast
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def forecast_day(day: date, temp_max: float, location: str = "Boston") -> dict:
+    return {'date': day, 'location': location, 'temp_max': temp_max, 'temp_min': 40.0,
+            'feels_max': temp_max, 'feels_min': 38.0, 'wind_speed': 5.0, 'humidity': 60.0,
+            'precipitation': 0.0, 'precipitation_probability': 10.0,
+            'special_condition': 'clear sky', 'weather_icon': '01d'}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def alembic_config(database_url: str, monkeypatch) -> Config:
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    return config
+
+
+def test_save_forecast_updates_days_in_place(db):
+    save_forecast(db, [forecast_day(date(2026, 1, 1), 50.0), forecast_day(date(2026, 1, 2), 52.0)])
+    save_forecast(db, [forecast_day(date(2026, 1, 2), 60.0), forecast_day(date(2026, 1, 3), 61.0)])
+
+    rows = db.query(WeatherData).order_by(WeatherData.date).all()
+    assert [(row.date.day, row.temp_max) for row in rows] == [(1, 50.0), (2, 60.0), (3, 61.0)]
+
+
+def test_forecast_day_key_rejects_duplicate_shared_rows(tmp_path, monkeypatch):
+    database_url = f"sqlite:///{tmp_path / 'weather.db'}"
+    command.upgrade(alembic_config(database_url, monkeypatch), "3f2a9c41b7d8")
+
+    insert = text(
+        "INSERT INTO weather_data (location, date, temp_max, temp_min, feels_max, feels_min, wind_speed,"
+        " humidity, precipitation, precipitation_probability) VALUES ('Boston', '2026-01-01', 1, 1, 1, 1, 1, 1, 1, 1)"
+    )
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        conn.execute(insert)
+    # NULL user_id rows are shared forecasts and must still be unique per (location, day)
+    with pytest.raises(IntegrityError):
+        with engine.begin() as conn:
+            conn.execute(insert)
+    engine.dispose()
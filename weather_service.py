@@ -0,0 +1,282 @@
+# weather_service.py
+
+import logging
+import os
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+from cachetools import TTLCache
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from bulk_ops import upsert_rows
+from http_client import http_client
+from locations import get_or_create_location, normalize_location
+from models import Location, WeatherData
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", "1800"))  # Seconds
+
+# Constants
+FORECAST_DAYS = 5
+FORECAST_CACHE_SIZE = 1024
+VISUAL_CROSSING_URL = (
+    "https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/"
+    "{location}/next5days?key={api_key}&unitGroup=us&iconSet=icons2"
+)
+
+
+class WeatherServiceError(Exception):
+    """Raised when a forecast cannot be obtained. Carries the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class _Flight:
+    """An upstream load in progress that concurrent callers wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ForecastCache:
+    """
+    In-process forecast cache keyed by canonical location, with a TTL.
+    Concurrent misses for the same location are coalesced: one caller loads, the others wait for its result.
+    """
+
+    def __init__(self, ttl: int = FORECAST_CACHE_TTL, maxsize: int = FORECAST_CACHE_SIZE):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    @staticmethod
+    def key(location: str) -> str:
+        return normalize_location(location)
+
+    def get(self, location: str) -> Optional[List[dict]]:
+        with self._lock:
+            return self._entries.get(self.key(location))
+
+    def put(self, location: str, entries: List[dict]):
+        if entries:
+            with self._lock:
+                self._entries[self.key(location)] = entries
+
+    def invalidate(self, location: str):
+        with self._lock:
+            self._entries.pop(self.key(location), None)
+
+    def get_or_load(self, location: str, loader: Callable[[], List[dict]]) -> List[dict]:
+        """
+        Returns the cached forecast, or runs `loader` once for all concurrent callers on a miss.
+        Errors raised by the loader are re-raised in every waiting caller; empty results are not cached.
+        """
+        key = self.key(location)
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is not None:
+                self.stats['hits'] += 1
+                return list(entries)
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return list(flight.result)
+
+        try:
+            flight.result = loader()
+            if flight.result:
+                with self._lock:
+                    self._entries[key] = flight.result
+            return list(flight.result)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.event.set()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        return stats
+
+
+forecast_cache = ForecastCache()
+
+
+def weather_to_dict(entry: WeatherData) -> dict:
+    return {
+        'date': entry.date,
+        'location': entry.location,
+        'temp_max': entry.temp_max,
+        'temp_min': entry.temp_min,
+        'feels_max': entry.feels_max,
+        'feels_min': entry.feels_min,
+        'wind_speed': entry.wind_speed,
+        'humidity': entry.humidity,
+        'precipitation': entry.precipitation,
+        'precipitation_probability': entry.precipitation_probability,
+        'special_condition': entry.special_condition,
+        'weather_icon': entry.weather_icon,
+    }
+
+
+def load_forecast_from_db(db: Session, location: str) -> List[dict]:
+    """
+    Loads the stored forecast for a location from today onwards.
+    Returns an empty list unless all FORECAST_DAYS days are present.
+    """
+    today = datetime.utcnow().date()
+    logger.info(f"Fetching data from database for location: {location}")
+    try:
+        # Unique canonical_name, then the (location_id, date) unique key
+        entries = db.query(WeatherData).join(Location).filter(
+            Location.canonical_name == normalize_location(location),
+            WeatherData.date >= today
+        ).order_by(WeatherData.date).limit(FORECAST_DAYS).all()
+    except Exception as e:
+        logger.error(f"Error fetching data from database: {e}")
+        return []
+
+    weather_data = [weather_to_dict(entry) for entry in entries]
+    logger.debug(f"Weather data retrieved: {weather_data}")
+    if len(weather_data) == FORECAST_DAYS:
+        return weather_data
+    return []
+
+
+def fetch_forecast_from_api(api_key: str, location: str) -> List[dict]:
+    """
+    Fetches the next days' forecast for a location from Visual Crossing.
+
+    Raises:
+        WeatherServiceError: If the API call fails or returns no days.
+    """
+    url = VISUAL_CROSSING_URL.format(location=quote(location), api_key=api_key)
+    logger.info("Getting weather data from API")
+    try:
+        response = http_client.get(url)
+    except Exception as e:
+        logger.error(f"Failed to reach the weather API: {e}")
+        raise WeatherServiceError(503, "Weather service unavailable.")
+
+    if response.status_code != 200:
+        error_message = response.text
+        logger.error(f"Failed to fetch weather data. Status Code: {response.status_code}, Message: {error_message}")
+        raise WeatherServiceError(response.status_code, error_message)
+
+    data = response.json()
+    if 'days' not in data or not data['days']:
+        logger.error("No weather data available.")
+        raise WeatherServiceError(500, "No weather data available.")
+
+    weather_entries = []
+    for day in data["days"]:
+        weather_entries.append({
+            'date': datetime.strptime(day['datetime'], "%Y-%m-%d").date(),  # Ensure 'date' is a date object
+            'location': location,
+            'temp_max': day.get('tempmax', 0.0),
+            'temp_min': day.get('tempmin', 0.0),
+            'feels_max': day.get('feelslikemax', 0.0),
+            'feels_min': day.get('feelslikemin', 0.0),
+            'wind_speed': day.get('windspeed', 0.0),
+            'humidity': day.get('humidity', 0.0),
+            'precipitation': day.get('precip', 0.0),
+            'precipitation_probability': day.get('precipprob', 0.0),
+            'special_condition': day.get('conditions', 'Unknown'),
+            'weather_icon': day.get('icon', '')
+        })
+    return weather_entries
+
+
+def save_forecast(db: Session, weather_data: List[dict]) -> int:
+    """
+    Inserts or updates a location's forecast with a single multi-row upsert keyed on (location_id, date).
+    The forecast is stored once per canonical location and shared by every user there.
+
+    Args:
+        db (Session): SQLAlchemy session object.
+        weather_data (List[dict]): Forecast entries for one location, as returned by get_forecast.
+
+    Returns:
+        int: The driver-reported row count.
+    """
+    if not weather_data:
+        return 0
+
+    try:
+        location = get_or_create_location(db, weather_data[0]['location'])
+        rows = []
+        for entry in weather_data:
+            row = {**entry, 'location': location.display_name, 'location_id': location.location_id}
+            # The column is a DateTime; store whole days consistently so the unique key matches
+            if isinstance(row['date'], date) and not isinstance(row['date'], datetime):
+                row['date'] = datetime.combine(row['date'], datetime.min.time())
+            rows.append(row)
+        count = upsert_rows(db, WeatherData.__table__, rows, ['location_id', 'date'])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return count
+
+
+def get_forecast(db: Session, location: str, api_key: Optional[str] = None,
+                 on_fetched: Optional[Callable[[List[dict]], None]] = None) -> List[dict]:
+    """
+    Returns the forecast for a location: from the in-process cache, else the database, else Visual Crossing.
+    Concurrent misses for the same location share a single database read and API call.
+
+    Args:
+        db (Session): SQLAlchemy session used if this caller performs the load.
+        location (str): The location to get the forecast for.
+        api_key (Optional[str]): Visual Crossing API key; defaults to VISUAL_CROSSING_API_KEY.
+        on_fetched (Optional[Callable[[List[dict]], None]]): Called once with the entries when they came from the API,
+            e.g. to persist them.
+
+    Returns:
+        List[dict]: The forecast entries ordered by date.
+
+    Raises:
+        WeatherServiceError: If the forecast is neither stored nor retrievable from the API.
+    """
+    def load() -> List[dict]:
+        weather_data = load_forecast_from_db(db, location)
+        if weather_data:
+            return weather_data
+
+        key = api_key or os.getenv("VISUAL_CROSSING_API_KEY")
+        if not key:
+            logger.error("VISUAL_CROSSING_API_KEY not found in environment variables.")
+            raise WeatherServiceError(500, "VISUAL_CROSSING_API_KEY not found in environment variables.")
+        weather_data = fetch_forecast_from_api(key, location)
+        logger.info("Fetched weather data successfully from API.")
+        if on_fetched:
+            on_fetched(weather_data)
+        return weather_data
+
+    return forecast_cache.get_or_load(location, load)